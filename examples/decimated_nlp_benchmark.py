@@ -0,0 +1,55 @@
+# decimated_nlp_benchmark.py
+# Simon Hulse
+# simon.hulse@chem.ox.ac.uk
+# Last Edited: Sun 18 Oct 2026 12:00:00 BST
+
+# Compares the speed and accuracy of nonlinear programming applied to the uncut
+# filtered signal, the cut (decimated) signal, and the decimated signal followed
+# by a short polishing pass on the uncut signal.
+
+import time
+import numpy as np
+import nmrespy as ne
+
+PTS = 32768
+SW = 10000.
+REGION = (-260., -120.)
+NOISE_REGION = (4800., 4900.)
+POLISH_ITERATIONS = 10
+PARAMS = np.array(
+    [
+        [1., 0., -240., 5.],
+        [2., 0., -200., 5.],
+        [1., 0., -192., 5.],
+        [1.5, 0., -150., 6.],
+        [3., 0., 1500., 4.],
+    ],
+    dtype="float64",
+)
+TRUE = PARAMS[:4]
+
+np.random.seed(0)
+estimator = ne.Estimator1D.new_from_parameters(PARAMS, PTS, SW, 0., snr=40.)
+
+runs = (
+    ("full", {}),
+    ("decimated", {"decimate": True}),
+    (
+        "decimated + polish",
+        {"decimate": True, "polish_iterations": POLISH_ITERATIONS},
+    ),
+)
+
+print(f"{'mode':<20}{'time (s)':>10}{'max |Δf| (Hz)':>16}{'max |Δa|':>12}")
+for i, (name, kwargs) in enumerate(runs):
+    start = time.perf_counter()
+    estimator.estimate(
+        REGION, NOISE_REGION, initial_guess=4, output_mode=None, seed=1,
+        **kwargs,
+    )
+    elapsed = time.perf_counter() - start
+    params = estimator.get_params([i], funit="hz")
+    params = params[np.argsort(params[:, 2])]
+    df = np.abs(params[:, 2] - TRUE[:, 2]).max()
+    da = np.abs(params[:, 0] - TRUE[:, 0]).max()
+    print(f"{name:<20}{elapsed:>10.3f}{df:>16.4f}{da:>12.4f}")
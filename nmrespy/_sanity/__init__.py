@@ -57,10 +57,10 @@ def sanity_check(*param_sets: Iterable[Iterable[Any]]) -> None:
     ValueError
         If an argument does not pass it's sanity check.
     """
-    funcname = get_name(inspect.currentframe())
     for param_set in param_sets:
         check_item = CheckItem(*param_set)
         if isinstance(check_item.msg, str):
+            funcname = get_name(inspect.currentframe())
             errmsg = (
                 f"{RED}{funcname}:\n"
                 f"`{check_item.name}` is invalid:\n"
@@ -71,7 +71,9 @@ def sanity_check(*param_sets: Iterable[Iterable[Any]]) -> None:
 
 def get_name(frame: inspect.types.FrameType) -> Optional[str]:
     # https://stackoverflow.com/questions/2654113/how-to-get-the-callers-method-name-in-the-called-method
-    funcname = inspect.getouterframes(frame, 2)[1][3]
+    # Only the name of the calling function is needed, so avoid
+    # `inspect.getouterframes`, which reads source context for the whole stack.
+    funcname = frame.f_back.f_code.co_name
     try:
         try:
             classname = type(frame.f_back.f_locals["self"]).__name__
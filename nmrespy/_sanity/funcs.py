@@ -34,6 +34,11 @@ def check_bool(obj: Any):
         return "Should be a bool."
 
 
+def check_callable(obj: Any):
+    if not callable(obj):
+        return "Should be callable."
+
+
 def check_float(
     obj: Any,
     greater_than_zero: bool = False,
@@ -66,6 +71,12 @@ def check_int(
         return f"Should be less than or equal to {max_value}."
 
 
+def check_polish_iterations(obj: Any, decimate: bool) -> Optional[str]:
+    if not decimate:
+        return "Should be None unless `decimate` is True."
+    return check_int(obj, min_value=1)
+
+
 def check_list_with_elements_in(obj: Any, allowed: Iterable[Any]) -> Optional[str]:
     if not isiter(obj):
         return "Should be a list of tuple."
@@ -538,6 +549,11 @@ def check_nmrespyplot(obj: Any) -> Optional[str]:
         return "Should be a `nmrespy.plot.NmrespyPlot` object."
 
 
+def check_filter_workspace(obj: Any) -> Optional[str]:
+    if type(obj).__name__ != "FilterWorkspace":
+        return "Should be a `nmrespy.freqfilter.FilterWorkspace` object."
+
+
 def check_stylesheet(obj: Any) -> Optional[str]:
     if not isinstance(obj, str):
         return "Should be a str."
@@ -591,7 +607,7 @@ def check_fn_mode(obj: Any) -> Optional[str]:
         return "Should be one of " + ", ".join([f"\"{x}\"" for x in valids])
 
 
-def check_optimiser_mode(obj: Any) -> Optional[str]:
+def check_optimiser_mode(obj: Any, varpro: bool = False) -> Optional[str]:
     if not isinstance(obj, str):
         return "Should be a str."
     # check if mode is empty or contains and invalid character
@@ -606,6 +622,13 @@ def check_optimiser_mode(obj: Any) -> Optional[str]:
             count[c] = 1
     if not all(map(lambda x: x == 1, count.values())):
         return "Repeated character present."
+    # variable projection eliminates amplitudes and phases, and optimises
+    # frequencies and/or damping factors
+    if varpro and not ("a" in obj and "p" in obj and ("f" in obj or "d" in obj)):
+        return (
+            "Should contain \"a\", \"p\", and at least one of \"f\" and "
+            "\"d\" when using variable projection."
+        )
 
 
 def check_spinach_couplings(obj: Any, nspins: int) -> Optional[str]:
@@ -3,8 +3,6 @@
 # simon.hulse@chem.ox.ac.uk
 # Last Edited: Tue 18 Oct 2022 14:30:21 BST
 
-import copy
-
 import nmrespy as ne
 from nmrespy.app.stup import Setup1DType
 import nmrespy.app.config as cf
@@ -31,8 +29,7 @@ class Setup1D(Setup1DType):
         )
 
     def update_spectrum(self):
-        data = copy.deepcopy(self.estimator.data)
-        data = ne.sig.exp_apodisation(data, self.lb)
+        data = ne.sig.exp_apodisation(self.estimator.data, self.lb)
         data[0] *= 0.5
         self.spec_line.set_ydata(
             ne.sig.phase(
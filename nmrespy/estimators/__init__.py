@@ -4,20 +4,24 @@
 # Last Edited: Sun 11 Jun 2023 19:20:33 BST
 
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 import copy
 import datetime
 import functools
 import io
 import os
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Tuple, Union
+import sys
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple, Union
 
 import numpy as np
 
 import nmrespy as ne
-from nmrespy.freqfilter import Filter
+from nmrespy.freqfilter import Filter, FilterWorkspace
 from nmrespy.mpm import MatrixPencil
 from nmrespy.nlp import nonlinear_programming
+from nmrespy.nlp.optimisers import NLPResult
 from nmrespy._colors import RED, GRE, END, USE_COLORAMA
 from nmrespy._files import (
     cd,
@@ -56,6 +60,42 @@ def logger(f: callable):
     return inner
 
 
+# Estimator used by `_estimate_region` in worker processes. Set once per
+# worker by `_init_worker`, so that the data is not sent with every region.
+_worker_estimator = None
+
+
+def _init_worker(estimator: Estimator) -> None:
+    global _worker_estimator
+    _worker_estimator = estimator
+    # Output from concurrent processes would be interleaved.
+    sys.stdout = open(os.devnull, "w")
+
+
+def _estimate_region(
+    region: Iterable[Tuple[float, float]],
+    noise_region: Iterable[Tuple[float, float]],
+    region_unit: str,
+    seed: int,
+    estimate_kwargs: Dict[str, Any],
+    estimator: Optional[Estimator] = None,
+) -> Result:
+    # Worker used by `Estimator.estimate_regions`. This needs to be defined at
+    # module level so that it can be pickled and sent to worker processes.
+    # If `estimator` is `None`, the estimator set by `_init_worker` is used.
+    if estimator is None:
+        estimator = _worker_estimator
+    estimator.estimate(
+        region,
+        noise_region,
+        region_unit=region_unit,
+        seed=seed,
+        _log=False,
+        **estimate_kwargs,
+    )
+    return estimator._results.pop()
+
+
 class Estimator(ne.ExpInfo):
     """Base estimation class."""
 
@@ -68,6 +108,7 @@ class Estimator(ne.ExpInfo):
     # default_nlp_trim
     # default_max_iterations_exact_hessian
     # default_max_iterations_gn_hessian
+    # default_max_iterations_lbfgs
 
     def __init__(
         self,
@@ -108,6 +149,9 @@ class Estimator(ne.ExpInfo):
         )
 
         self._results = []
+        self._filter_workspace = None
+        self._data_generation = 0
+        self._cache = {}
         now = datetime.datetime.now().strftime('%d-%m-%y %H:%M:%S')
         self._log = (
             "=====================\n"
@@ -116,6 +160,21 @@ class Estimator(ne.ExpInfo):
             f"--> Created @ {now}\n"
         )
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # The filter workspace and cache of derived arrays can be large, and
+        # are rebuilt on demand. Don't pickle them.
+        state = self.__dict__.copy()
+        state["_filter_workspace"] = None
+        state["_cache"] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Caches may also be absent from estimators pickled by older versions.
+        self.__dict__.update(state)
+        self._filter_workspace = None
+        self._cache = {}
+        self._data_generation = state.get("_data_generation", 0)
+
     def __str__(self) -> str:
         writer = ResultWriter(
             self.expinfo,
@@ -238,11 +297,17 @@ class Estimator(ne.ExpInfo):
 
     @property
     def spectrum(self) -> np.ndarray:
-        """Return the spectrum associated with the estimator."""
-        data = copy.deepcopy(self.data)
-        slice_ = tuple([slice(0, 1, None) for _ in range(self.dim)])
-        data[slice_] *= 0.5
-        return ne.sig.ft(data, axes=self.ft_dims)
+        """Return the spectrum associated with the estimator.
+
+        The spectrum is cached until the data is modified, and is read-only.
+        """
+        def make_spectrum():
+            data = copy.deepcopy(self.data)
+            slice_ = tuple([slice(0, 1, None) for _ in range(self.dim)])
+            data[slice_] *= 0.5
+            return ne.sig.ft(data, axes=self.ft_dims)
+
+        return self._cached("spectrum", make_spectrum)
 
     @property
     def data_direct(self) -> np.ndarray:
@@ -254,10 +319,72 @@ class Estimator(ne.ExpInfo):
 
     @property
     def spectrum_direct(self) -> np.ndarray:
-        """Generate a 1D spectrum of the first signal in the direct dimension."""
-        data_direct = self.data_direct
-        data_direct[0] *= 0.5
-        return ne.sig.ft(data_direct)
+        """Generate a 1D spectrum of the first signal in the direct dimension.
+
+        The spectrum is cached until the data is modified, and is read-only.
+        """
+        def make_spectrum():
+            data_direct = self.data_direct
+            data_direct[0] *= 0.5
+            return ne.sig.ft(data_direct)
+
+        return self._cached("spectrum_direct", make_spectrum)
+
+    def get_shifts(
+        self,
+        pts: Optional[Iterable[int]] = None,
+        unit: str = "hz",
+        flip: bool = True,
+        meshgrid: bool = True,
+    ) -> Iterable[np.ndarray]:
+        # Shifts are cached, as they are requested repeatedly when plotting.
+        # The returned arrays are read-only.
+        get_shifts = functools.partial(
+            super().get_shifts, pts=pts, unit=unit, flip=flip, meshgrid=meshgrid,
+        )
+        key = (
+            "shifts",
+            tuple(pts) if isinstance(pts, (list, tuple)) else pts,
+            unit,
+            flip,
+            meshgrid,
+            self.default_pts,
+            self.sw(),
+            self.offset(),
+            self.sfo,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            # Invalid arguments: leave sanity checking to `ExpInfo.get_shifts`
+            return get_shifts()
+        return self._cached(key, get_shifts)
+
+    get_shifts.__doc__ = ne.ExpInfo.get_shifts.__doc__
+
+    def _cached(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        # Arrays derived from the data (spectra, shifts, etc.) are stored along
+        # with the data generation they were computed for. The generation is
+        # incremented whenever the data is modified (see `_data_changed`).
+        # Cached arrays are shared between callers, so are made read-only.
+        generation = getattr(self, "_data_generation", 0)
+        if getattr(self, "_cache", None) is None:
+            self._cache = {}
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        value = func()
+        for array in value if isinstance(value, tuple) else (value,):
+            array.flags.writeable = False
+        self._cache[key] = (generation, value)
+        return value
+
+    def _data_changed(self) -> None:
+        # Should be called whenever `self._data` is modified.
+        self._data_generation = getattr(self, "_data_generation", 0) + 1
+        self._cache = {}
+        self._filter_workspace = None
 
     def get_log(self) -> str:
         """Get the log for the estimator instance."""
@@ -408,6 +535,7 @@ class Estimator(ne.ExpInfo):
 
         for i, lb in zip(self.proc_dims, k):
             self._data = ne.sig.exp_apodisation(self._data, lb, axes=[i])
+        self._data_changed()
 
     def phase_data(self, p0: float = 0., p1: float = 0., pivot: int = 0) -> None:
         """Apply a first-order phase correction in the direct dimension.
@@ -459,6 +587,7 @@ class Estimator(ne.ExpInfo):
             ne.sig.phase(spec, p0=p0s, p1=p1s, pivot=pivots),
             axes=self.proc_dims,
         )
+        self._data_changed()
 
     def manual_phase_data(
         self,
@@ -555,6 +684,7 @@ class Estimator(ne.ExpInfo):
             new_data[i] = ne.sig.ift(spectrum)[:shape[self.proc_dims[0]]]
 
         self._data = new_data[0] if self.data.ndim == 1 else new_data
+        self._data_changed()
 
     @logger
     def estimate(
@@ -569,7 +699,10 @@ class Estimator(ne.ExpInfo):
         cut_ratio: Optional[float] = 1.1,
         mpm_trim: Optional[Iterable[int]] = None,
         nlp_trim: Optional[Iterable[int]] = None,
+        decimate: bool = False,
+        polish_iterations: Optional[int] = None,
         hessian: str = "gauss-newton",
+        method: str = "trust-ncg",
         max_iterations: Optional[int] = None,
         negative_amps: str = "remove",
         output_mode: Optional[int] = 10,
@@ -579,6 +712,11 @@ class Estimator(ne.ExpInfo):
         initial_trust_radius: float = 1.0,
         max_trust_radius: float = 4.0,
         check_neg_amps_every: int = 10,
+        memory_budget: Optional[float] = None,
+        preconditioner: Optional[str] = None,
+        callback: Optional[callable] = None,
+        error_method: Optional[str] = "exact",
+        seed: Optional[int] = None,
         _log: bool = True,
         **optimiser_kwargs,
     ):
@@ -629,6 +767,27 @@ class Estimator(ne.ExpInfo):
               done with the Gauss-Newton method. See the *"Derivation from
               Newton's method"* section of `this article
               <https://en.wikipedia.org/wiki/Gauss%E2%80%93Newton_algorithm>`_.
+            * If ``"matrix-free"``, the Gauss-Newton Hessian will be used, but
+              it is never formed explicitly. Only products of the Hessian with
+              vectors are computed. This is faster for estimates with a large
+              number of oscillators. Not available if ``method`` is
+              ``"varpro"``.
+
+        method
+            The optimisation method.
+
+            * If ``"trust-ncg"``, all parameters specified by ``mode`` are
+              optimised.
+            * If ``"varpro"``, variable projection is used. Amplitudes and
+              phases are determined by linear least squares, and only
+              frequencies and damping factors are optimised. This typically
+              requires fewer iterations for crowded regions. ``mode`` must
+              contain ``"a"`` and ``"p"``, and ``phase_variance`` and
+              ``negative_amps`` have no effect.
+            * If ``"lbfgs"``, the limited-memory BFGS algorithm is used, which
+              only requires the objective and gradient. ``hessian`` is
+              ignored. This is suited to estimates with a very large number of
+              oscillators, for which storing the Hessian is prohibitive.
 
         mode
             A string containing a subset of the characters ``"a"`` (amplitudes),
@@ -666,11 +825,26 @@ class Estimator(ne.ExpInfo):
             the signal. If an int, and the filtered signal has a size greater than
             ``nlp_trim``, this signal will be set as ``signal[:nlp_trim]``.
 
+        decimate
+            If ``True``, nonlinear programming is applied to the cut (and hence
+            decimated) filtered signal, rather than the uncut signal. As the cut
+            signal comprises far fewer points, the optimisation is substantially
+            faster, at the expense of a modest loss of accuracy. Has no effect
+            if ``region`` or ``cut_ratio`` is ``None``.
+
+        polish_iterations
+            Can only be given if ``decimate`` is ``True``. If an int, the result
+            obtained using the decimated signal is used as the initial guess for
+            a further optimisation on the uncut signal, running for at most
+            ``polish_iterations`` iterations. The errors of the result are those
+            of this final optimisation. If ``None``, no polishing is carried
+            out.
+
         max_iterations
             A value specifiying the number of iterations the routine may run
             through before it is terminated. If ``None``, a default number
             of maximum iterations is set, based on the the data dimension and
-            the value of ``hessian``.
+            the values of ``method`` and ``hessian``.
 
         negative_amps
             Indicates how to treat oscillators which have gained negative
@@ -724,9 +898,52 @@ class Estimator(ne.ExpInfo):
             For every iteration that is a multiple of this, negative amplitudes
             will be checked for and dealt with if found.
 
+        memory_budget
+            2D data only. The greatest size (GiB) permitted for the intermediate
+            arrays created during the optimisation. If necessary, the objective,
+            gradient and Hessian are accumulated over tiles of the direct
+            dimension. If ``None``, the whole signal is considered at once.
+
+        preconditioner
+            Preconditioner for the conjugate gradient subproblem of the
+            trust-region algorithm. If ``None``, no preconditioning is applied.
+            If ``"diagonal"``, the diagonal of the Hessian is used. If
+            ``"block-jacobi"``, the diagonal blocks of the Hessian associated
+            with each oscillator are used. Trust region radii are then
+            measured in the norm induced by the preconditioner.
+
+        callback
+            Function called after each iteration of the optimiser, with a
+            :py:class:`nmrespy.nlp.optimisers.IterationInfo` object as its sole
+            argument. This can be used to monitor progress without parsing
+            output. If the callback returns ``True``, the optimiser is
+            terminated.
+
+        error_method
+            Specifies how errors are computed. If ``"exact"``, the exact Hessian
+            at the final estimate is used. If ``"gauss-newton"``, the
+            Gauss-Newton Hessian is used, which is much cheaper to compute
+            (particularly for 2D data), and is a good approximation if the
+            residual is small. If ``None``, errors are not computed, and are set
+            to ``NaN``.
+
+        seed
+            Seed for the random noise which is added to the filtered spectrum
+            outside of the filter bandwidth. If ``None``, NumPy's global random
+            state is used. Set this to ensure the filtered signal, and hence the
+            estimation result, is reproducible.
+
         _log
             Ignore this!
 
+        Notes
+        -----
+        The time spent on each stage of the estimation (``"filter"``, ``"mpm"``,
+        ``"nlp"`` and ``"errors"``), and the numbers of iterations, optimiser
+        restarts following the removal of oscillators, and objective, gradient and
+        Hessian evaluations, are stored in the ``timings`` and ``counters``
+        attributes of the result.
+
         References
         ----------
         .. [#] Yingbo Hua and Tapan K Sarkar. “Matrix pencil method for estimating
@@ -763,7 +980,14 @@ class Estimator(ne.ExpInfo):
                 "initial_guess", initial_guess, sfuncs.check_initial_guess,
                 (len(self.ft_dims),), {}, True,
             ),
-            ("hessian", hessian, sfuncs.check_one_of, ("gauss-newton", "exact")),
+            (
+                "hessian", hessian, sfuncs.check_one_of,
+                ("gauss-newton", "exact", "matrix-free"),
+            ),
+            (
+                "method", method, sfuncs.check_one_of,
+                ("trust-ncg", "varpro", "lbfgs"),
+            ),
             ("phase_variance", phase_variance, sfuncs.check_bool),
             ("mode", mode, sfuncs.check_optimiser_mode),
             (
@@ -782,6 +1006,11 @@ class Estimator(ne.ExpInfo):
                 "cut_ratio", cut_ratio, sfuncs.check_float, (),
                 {"min_value": 1.}, True,
             ),
+            ("decimate", decimate, sfuncs.check_bool),
+            (
+                "polish_iterations", polish_iterations,
+                sfuncs.check_polish_iterations, (decimate,), {}, True,
+            ),
             (
                 "max_iterations", max_iterations, sfuncs.check_int, (),
                 {"min_value": 1}, True,
@@ -813,31 +1042,60 @@ class Estimator(ne.ExpInfo):
                 "check_neg_amps_every", check_neg_amps_every, sfuncs.check_int, (),
                 {"min_value": 1, "max_value": max_iterations},
             ),
+            (
+                "memory_budget", memory_budget, sfuncs.check_float, (),
+                {"greater_than_zero": True}, True,
+            ),
+            (
+                "preconditioner", preconditioner, sfuncs.check_one_of,
+                ("diagonal", "block-jacobi"), {}, True,
+            ),
+            ("callback", callback, sfuncs.check_callable, (), {}, True),
+            (
+                "error_method", error_method, sfuncs.check_one_of,
+                ("exact", "gauss-newton"), {}, True,
+            ),
+            ("seed", seed, sfuncs.check_int, (), {"min_value": 0}, True),
         )
 
         region = self._process_region(region)
         noise_region = self._process_region(noise_region)
 
-        if output_mode != 0:
+        if output_mode not in (0, None):
             print(self._estimate_banner(region, region_unit))
 
+        timings = {"filter": 0., "mpm": 0., "nlp": 0., "errors": 0.}
+        counters = {
+            "iterations": 0,
+            "cg_iterations": 0,
+            "restarts": 0,
+            "objective": 0,
+            "gradient": 0,
+            "hessian": 0,
+        }
+
+        start = time.time()
         (
             region, noise_region, mpm_expinfo, nlp_expinfo, mpm_signal, nlp_signal,
+            decimated_expinfo, decimated_signal,
         ) = self._filter_signal(
-            region, noise_region, region_unit, mpm_trim, nlp_trim, cut_ratio,
+            region, noise_region, region_unit, mpm_trim, nlp_trim, cut_ratio, seed,
         )
+        timings["filter"] = time.time() - start
 
         if isinstance(initial_guess, np.ndarray):
             x0 = initial_guess
         else:
             oscillators = initial_guess if isinstance(initial_guess, int) else 0
 
+            start = time.time()
             x0 = MatrixPencil(
                 mpm_expinfo,
                 mpm_signal,
                 oscillators=oscillators,
                 output_mode=isinstance(output_mode, int),
             ).get_params()
+            timings["mpm"] = time.time() - start
 
             if x0 is None:
                 self._results.append(
@@ -847,19 +1105,24 @@ class Estimator(ne.ExpInfo):
                         self._reduce_region(region),
                         self._reduce_region(noise_region),
                         self.sfo,
+                        timings=timings,
+                        counters=counters,
                     )
                 )
                 return
 
         if max_iterations is None:
-            if hessian == "exact":
+            if method == "lbfgs":
+                max_iterations = self.default_max_iterations_lbfgs
+            elif hessian == "exact":
                 max_iterations = self.default_max_iterations_exact_hessian
-            elif hessian == "gauss-newton":
+            elif hessian in ("gauss-newton", "matrix-free"):
                 max_iterations = self.default_max_iterations_gn_hessian
 
         optimiser_kwargs = {
             "phase_variance": phase_variance,
             "hessian": hessian,
+            "method": method,
             "mode": mode,
             "amp_thold": amp_thold,
             "max_iterations": max_iterations,
@@ -871,14 +1134,39 @@ class Estimator(ne.ExpInfo):
             "initial_trust_radius": initial_trust_radius,
             "max_trust_radius": max_trust_radius,
             "check_neg_amps_every": check_neg_amps_every,
+            "memory_budget": memory_budget,
+            "preconditioner": preconditioner,
+            "callback": callback,
+            "error_method": error_method,
         }
 
+        if decimate:
+            if polish_iterations is None:
+                nlp_expinfo = decimated_expinfo
+                nlp_signal = decimated_signal
+            else:
+                # Errors of the initial pass are not needed
+                result = nonlinear_programming(
+                    decimated_expinfo,
+                    decimated_signal,
+                    x0,
+                    **{**optimiser_kwargs, "error_method": None},
+                )
+                _update_statistics(result, timings, counters)
+                x0 = result.x
+                optimiser_kwargs["max_iterations"] = polish_iterations
+                optimiser_kwargs["check_neg_amps_every"] = min(
+                    check_neg_amps_every, polish_iterations,
+                )
+
         self._run_optimisation(
             nlp_expinfo,
             nlp_signal,
             x0,
             region,
             noise_region,
+            timings=timings,
+            counters=counters,
             **optimiser_kwargs,
         )
 
@@ -890,6 +1178,7 @@ class Estimator(ne.ExpInfo):
         mpm_trim: Optional[Iterable[int]],
         nlp_trim: Optional[Iterable[int]],
         cut_ratio: Optional[float],
+        seed: Optional[int] = None,
     ):
         # This method is uused by `Estimator1D` and `Estimator2DJ`.
         # It is overwritten by `EstimatorSeq1D`.
@@ -897,8 +1186,8 @@ class Estimator(ne.ExpInfo):
             region_unit = "hz"
             region = self._full_region
             noise_region = None
-            mpm_signal = nlp_signal = self.data
-            mpm_expinfo = nlp_expinfo = self.expinfo
+            mpm_signal = nlp_signal = decimated_signal = self.data
+            mpm_expinfo = nlp_expinfo = decimated_expinfo = self.expinfo
 
         else:
             filter_ = Filter(
@@ -908,19 +1197,30 @@ class Estimator(ne.ExpInfo):
                 noise_region,
                 region_unit=region_unit,
                 twodim_dtype=self.twodim_dtype,
+                seed=seed,
+                workspace=self._get_filter_workspace(),
             )
 
-            spec, expinfo = filter_.get_filtered_spectrum(cut_ratio=cut_ratio)
-
             region = filter_.get_region()
             noise_region = filter_.get_noise_region()
-            mpm_signal, mpm_expinfo = filter_.get_filtered_fid(cut_ratio=cut_ratio)
-            nlp_signal, nlp_expinfo = filter_.get_filtered_fid(cut_ratio=None)
+            if cut_ratio is None:
+                nlp_signal, nlp_expinfo = filter_.get_filtered_fid(cut_ratio=None)
+                mpm_signal, mpm_expinfo = nlp_signal, nlp_expinfo
+                decimated_signal, decimated_expinfo = nlp_signal, nlp_expinfo
+            else:
+                (
+                    (mpm_signal, mpm_expinfo), (nlp_signal, nlp_expinfo),
+                ) = filter_.get_filtered_fids(cut_ratio=cut_ratio)
+                decimated_signal, decimated_expinfo = mpm_signal, mpm_expinfo
 
         mpm_slice = self._get_slice("mpm", mpm_trim, mpm_signal.shape)
         mpm_signal = mpm_signal[mpm_slice]
         nlp_slice = self._get_slice("nlp", nlp_trim, nlp_signal.shape)
         nlp_signal = nlp_signal[nlp_slice]
+        # The cut signal is used for nonlinear programming in decimated mode.
+        # Its frequency and offset are accounted for by `decimated_expinfo`.
+        decimated_slice = self._get_slice("nlp", nlp_trim, decimated_signal.shape)
+        decimated_signal = decimated_signal[decimated_slice]
 
         return (
             region,
@@ -929,8 +1229,17 @@ class Estimator(ne.ExpInfo):
             nlp_expinfo,
             mpm_signal,
             nlp_signal,
+            decimated_expinfo,
+            decimated_signal,
         )
 
+    def _get_filter_workspace(self) -> FilterWorkspace:
+        # Workspace shared by all filters applied to the estimator's data. This
+        # is reset whenever the data is modified by a processing method.
+        if getattr(self, "_filter_workspace", None) is None:
+            self._filter_workspace = FilterWorkspace(self.data, self.twodim_dtype)
+        return self._filter_workspace
+
     def _run_optimisation(
         self,
         nlp_expinfo,
@@ -938,6 +1247,8 @@ class Estimator(ne.ExpInfo):
         x0,
         region,
         noise_region,
+        timings: Optional[Dict[str, float]] = None,
+        counters: Optional[Dict[str, int]] = None,
         **optimiser_kwargs,
     ) -> None:
         # This is called by `Estimator1D` and `Estimator2DJ`, `Estimator2D`.
@@ -948,6 +1259,8 @@ class Estimator(ne.ExpInfo):
             x0,
             **optimiser_kwargs,
         )
+        if timings is not None and counters is not None:
+            _update_statistics(result, timings, counters)
 
         self._results.append(
             Result(
@@ -957,9 +1270,166 @@ class Estimator(ne.ExpInfo):
                 noise_region,
                 self.sfo,
                 result.trajectory,
+                timings,
+                counters,
             )
         )
 
+    @logger
+    def estimate_regions(
+        self,
+        regions: Iterable[Iterable[Tuple[float, float]]],
+        noise_region: Iterable[Tuple[float, float]],
+        region_unit: str = "hz",
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        **estimate_kwargs,
+    ) -> Iterable[Result]:
+        """Estimate several regions of the signal, in parallel.
+
+        Each region is filtered, subjected to the MPM and optimised
+        independently in a separate process. The results are appended to the
+        estimator in the same order as ``regions``, regardless of the order in
+        which the worker processes finish.
+
+        Parameters
+        ----------
+        regions
+            An iterable of frequency ranges of interest. Each element should be
+            of the form required for the ``region`` argument of
+            :py:meth:`estimate`.
+
+        noise_region
+            Frequency range where no noticeable signals reside. This is used for
+            every region.
+
+        region_unit
+            One of ``"hz"`` or ``"ppm"`` Specifies the units that ``regions``
+            and ``noise_region`` have been given as.
+
+        workers
+            The number of processes to use. If ``None``, the number of CPUs
+            available is used. If ``1``, the regions are estimated serially
+            in the current process. The estimator is sent to each process once,
+            and each process builds its own filter workspace (see
+            :py:meth:`estimate`). With more than one process, output from the
+            processes is discarded, as it would be interleaved, and
+            ``output_mode`` is set to ``None``.
+
+        seed
+            Seed used to derive an independent seed for the synthetic noise
+            added to each filtered region (see the ``seed`` argument of
+            :py:meth:`estimate`). Running with the same ``seed`` gives the same
+            results irrespective of ``workers``. If ``None``, NumPy's global
+            random state is used: each region draws from it directly if the
+            regions are estimated serially, and otherwise the seeds are derived
+            from it.
+
+        estimate_kwargs
+            Keyword arguments to provide to the call to :py:meth:`estimate` for
+            each region. Note that ``"region"``, ``"noise_region"``,
+            ``"region_unit"``, ``"seed"`` and ``"_log"`` are set internally and
+            will be ignored if given.
+
+        Returns
+        -------
+        results
+            The estimation results, in the same order as ``regions``.
+        """
+        sanity_check(
+            (
+                "region_unit", region_unit, sfuncs.check_frequency_unit,
+                (self.hz_ppm_valid,),
+            ),
+            ("workers", workers, sfuncs.check_int, (), {"min_value": 1}, True),
+            ("seed", seed, sfuncs.check_int, (), {"min_value": 0}, True),
+        )
+        sanity_check(
+            self._region_check(noise_region, region_unit, "noise_region"),
+            *[self._region_check(r, region_unit, "regions") for r in regions],
+        )
+
+        for key in list(estimate_kwargs.keys()):
+            if key in ("region", "noise_region", "region_unit", "seed", "_log"):
+                del estimate_kwargs[key]
+
+        regions = list(regions)
+        results = [
+            result for _, result in self._estimate_regions(
+                regions,
+                [noise_region] * len(regions),
+                region_unit,
+                workers,
+                seed,
+                estimate_kwargs,
+            )
+        ]
+
+        self._results.extend(results)
+        return results
+
+    def _estimate_regions(
+        self,
+        regions: Iterable[Iterable[Tuple[float, float]]],
+        noise_regions: Iterable[Iterable[Tuple[float, float]]],
+        region_unit: str,
+        workers: Optional[int],
+        seed: Optional[int],
+        estimate_kwargs: Dict[str, Any],
+    ) -> Iterable[Tuple[int, Result]]:
+        # Generator which yields `(index, result)` for each region, in the order
+        # of `regions`. Used by `estimate_regions` and `subband_estimate`.
+        nregions = len(regions)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, nregions)
+
+        if seed is None and workers <= 1:
+            # Each region draws from NumPy's global random state, as `estimate`
+            # does with `seed=None`.
+            seeds = nregions * [None]
+        else:
+            if seed is None:
+                # Worker processes have copies of the same global random state,
+                # so derive independent seeds from a single draw from it.
+                seed = int(np.random.randint(np.iinfo(np.int32).max))
+            seeds = [
+                int(s.generate_state(1)[0])
+                for s in np.random.SeedSequence(seed).spawn(nregions)
+            ]
+
+        # Only the data and experiment information are needed by the workers.
+        estimator = copy.copy(self)
+        estimator._results = []
+        estimator._log = ""
+        estimator._filter_workspace = getattr(self, "_filter_workspace", None)
+
+        if workers > 1:
+            # Output is discarded by the worker processes (see `_init_worker`).
+            estimate_kwargs = {**estimate_kwargs, "output_mode": None}
+
+        args = (
+            regions,
+            noise_regions,
+            [region_unit] * nregions,
+            seeds,
+            [estimate_kwargs] * nregions,
+        )
+
+        if workers <= 1:
+            yield from enumerate(
+                _estimate_region(*arg, estimator) for arg in zip(*args)
+            )
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(estimator,),
+        ) as executor:
+            # `map` yields results in the order of submission.
+            yield from enumerate(executor.map(_estimate_region, *args))
+
     def make_fid_from_result(
         self,
         indices: Optional[Iterable[int]] = None,
@@ -1128,6 +1598,23 @@ class Estimator(ne.ExpInfo):
                 pass
         return None
 
+    def _get_osc_locations(self, indices: Optional[Iterable[int]] = None) -> np.ndarray:
+        # Array of shape (M, 2), with rows of the form (result_index, osc_index),
+        # locating each oscillator in `self.get_params(indices)`. `osc_index`
+        # indexes `Result.get_params()`, as used by `edit_result`.
+        indices = self._process_indices(indices)
+        results = self.get_results(indices)
+        params = [result.get_params() for result in results]
+        locations = np.vstack(
+            [
+                np.column_stack((np.full(p.shape[0], i), np.arange(p.shape[0])))
+                for i, p in zip(indices, params)
+            ]
+        )
+        # Same ordering as `_get_arrays` with `merge=True`
+        sort_idx = results[0]._process_sort_by("f-1", self.dim)
+        return locations[np.argsort(np.vstack(params)[:, sort_idx])]
+
     def _get_arrays(
         self,
         name: str,
@@ -1527,6 +2014,21 @@ class Estimator(ne.ExpInfo):
         )
 
 
+def _update_statistics(
+    result: NLPResult,
+    timings: Dict[str, float],
+    counters: Dict[str, int],
+) -> None:
+    # Accumulate the timings and counters of a nonlinear programming run
+    timings["nlp"] += result.time
+    timings["errors"] += result.errors_time
+    counters["iterations"] += result.iterations
+    counters["cg_iterations"] += result.cg_iterations
+    counters["restarts"] += result.restarts
+    for key, value in result.evaluations.items():
+        counters[key] += value
+
+
 class Result(ResultFetcher):
 
     def __init__(
@@ -1537,12 +2039,18 @@ class Result(ResultFetcher):
         noise_region: Iterable[Tuple[float, float]],
         sfo: Iterable[float],
         trajectory: Optional[Iterable[np.ndarray]] = None,
+        timings: Optional[Dict[str, float]] = None,
+        counters: Optional[Dict[str, int]] = None,
     ) -> None:
         self.params = params
         self.errors = errors
         self.region = region
         self.noise_region = noise_region
         self.trajectory = trajectory
+        # Time taken (s) by each stage of the estimation, and numbers of
+        # iterations and function evaluations made by the optimiser
+        self.timings = timings
+        self.counters = counters
         super().__init__(sfo)
 
     def get_region(self, unit: str = "hz"):
@@ -33,11 +33,20 @@ class _Estimator1DProc(Estimator):
         """Generate a 1D spectrum of the first signal in the direct dimension.
 
         Generated by taking the first direct-dimension slice (``self.data[0]``),
-        halving the initial point, and applying FT.
+        halving the initial point, and applying FT. The spectrum is cached until
+        the data is modified, and is read-only.
         """
-        data = copy.deepcopy(self.data[0])
-        data[0] *= 0.5
-        return ne.sig.ft(data)
+        def make_spectrum():
+            data = copy.deepcopy(self.data[0])
+            data[0] *= 0.5
+            return ne.sig.ft(data)
+
+        return self._cached("spectrum_first_direct", make_spectrum)
+
+    @property
+    def _spectrum_1d(self) -> np.ndarray:
+        # The 1D spectrum used for region prediction.
+        return self.spectrum if self.data.ndim == 1 else self.spectrum_first_direct
 
     def predict_regions(
         self,
@@ -47,12 +56,7 @@ class _Estimator1DProc(Estimator):
     ) -> Iterable[Tuple[float, float]]:
         # TODO: docstring
         # TODO: sanity checking
-        if self.data.ndim == 1:
-            data = copy.deepcopy(self.data)
-        else:
-            data = self.data[0]
-        data[0] *= 0.5
-        spectrum = ne.sig.ft(data).real
+        spectrum = self._spectrum_1d.real
         shifts = self.get_shifts(unit=unit)[-1]
         mask = dietrich(
             spectrum,
@@ -91,12 +95,7 @@ class _Estimator1DProc(Estimator):
     ) -> None:
         # TODO docstring
         # TODO sanity checking
-        if self.data.ndim == 1:
-            data = copy.deepcopy(self.data)
-        else:
-            data = self.data[0]
-        data[0] *= 0.5
-        spectrum = ne.sig.ft(data).real
+        spectrum = self._spectrum_1d.real
         shifts = self.get_shifts(unit=unit)[-1]
 
         fig, ax = plt.subplots()
@@ -123,6 +122,8 @@ class _Estimator1DProc(Estimator):
         noise_region: Tuple[float, float],
         noise_region_unit: str = "hz",
         nsubbands: Optional[int] = None,
+        workers: Optional[int] = 1,
+        seed: Optional[int] = None,
         **estimate_kwargs,
     ) -> None:
         r"""Perform estiamtion on the entire signal via estimation of
@@ -130,7 +131,8 @@ class _Estimator1DProc(Estimator):
 
         This method splits the signal up into ``nsubbands`` equally-sized region
         and extracts parameters from each region before finally concatenating all
-        the results together.
+        the results together. The sub-bands are independent of each other, and
+        can be estimated concurrently in a pool of processes (see ``workers``).
 
         .. warning::
 
@@ -152,6 +154,15 @@ class _Estimator1DProc(Estimator):
             The number of sub-bands to break the signal into. If ``None``, the number
             will be set as the nearest integer to the data size divided by 500.
 
+        workers
+            The number of processes to use. If ``None``, the number of CPUs
+            available is used. By default, the sub-bands are estimated serially
+            in the current process.
+
+        seed
+            Seed used to derive the seed for the synthetic noise added to each
+            filtered sub-band. See :py:meth:`estimate_regions`.
+
         estimate_kwargs
             Keyword arguments to give to :py:meth:`estimate`. Note that ``region``
             and ``initial_guess`` will be ignored.
@@ -159,6 +170,8 @@ class _Estimator1DProc(Estimator):
         sanity_check(
             self._funit_check(noise_region_unit, "noise_region_unit"),
             ("nsubbands", nsubbands, sfuncs.check_int, (), {"min_value": 1}, True),
+            ("workers", workers, sfuncs.check_int, (), {"min_value": 1}, True),
+            ("seed", seed, sfuncs.check_int, (), {"min_value": 0}, True),
         )
         sanity_check(
             self._region_check(noise_region, noise_region_unit, "noise_region"),
@@ -175,15 +188,26 @@ class _Estimator1DProc(Estimator):
         if fprint:
             print(f"Starting sub-band estimation using {nsubbands} sub-bands:")
 
-        for string in ("region", "region_unit", "initial_guess", "_log"):
+        for string in ("region", "region_unit", "initial_guess", "seed", "_log"):
             if string in estimate_kwargs:
                 del estimate_kwargs[string]
 
-        params, errors = None, None
-        for i, (region, mid_region) in enumerate(zip(regions, mid_regions), start=1):
+        ncols = 2 * (self.dim + 1)
+        subband_params = [np.empty((0, ncols))]
+        subband_errors = [np.empty((0, ncols))]
+
+        for i, result in self._estimate_regions(
+            regions,
+            nsubbands * [noise_region],
+            "hz",
+            workers,
+            seed,
+            estimate_kwargs,
+        ):
+            mid_region = mid_regions[i]
             if fprint:
                 msg = (
-                    f"--> Estimating region #{i}: "
+                    f"--> Estimated region #{i + 1}: "
                     f"{mid_region[0]:.2f} - {mid_region[1]:.2f}Hz"
                 )
                 if self.hz_ppm_valid:
@@ -194,23 +218,18 @@ class _Estimator1DProc(Estimator):
                     msg += f" ({mid_region_ppm[0]:.3f} - {mid_region_ppm[1]:.3f}ppm)"
                 print(msg)
 
-            self.estimate(
-                region, noise_region, region_unit="hz", _log=False,
-                **estimate_kwargs,
-            )
-            p, e = self._keep_middle_freqs(self._results.pop(), mid_region)
-
+            p, e = self._keep_middle_freqs(result, mid_region)
             if p is None:
                 continue
-            if params is None:
-                params = p
-                errors = e
-            else:
-                params = np.vstack((params, p))
-                errors = np.vstack((errors, e))
+
+            subband_params.append(p)
+            subband_errors.append(e)
+
+        params = np.vstack(subband_params)
+        errors = np.vstack(subband_errors)
 
         # Sort in order of direct-dimension freqs.
-        sort_idx = np.argsort(params[:, self.dim + 1])
+        sort_idx = np.argsort(params[:, self.dim + 1], kind="stable")
         params = params[sort_idx]
         errors = errors[sort_idx]
 
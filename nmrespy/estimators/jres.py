@@ -17,6 +17,7 @@ from nmrespy.contour_app import ContourApp
 from nmrespy.load import load_bruker
 from nmrespy.estimators import logger
 from nmrespy.estimators._proc_onedim import _Estimator1DProc
+from nmrespy.expinfo import _pole_matrix
 from nmrespy.plot import make_color_cycle
 from nmrespy._colors import RED, GRE, END, USE_COLORAMA
 from nmrespy._files import check_existent_dir, check_saveable_dir
@@ -54,6 +55,26 @@ class Estimator2DJ(_Estimator1DProc):
     default_nlp_trim = [1024]
     default_max_iterations_exact_hessian = 40
     default_max_iterations_gn_hessian = 80
+    default_max_iterations_lbfgs = 400
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        expinfo: ExpInfo,
+        datapath: Optional[Path] = None,
+    ) -> None:
+        super().__init__(data, expinfo, datapath)
+        # Multiplet assignments, memoised by `_get_multiplets`
+        self._multiplet_cache = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state["_multiplet_cache"] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._multiplet_cache = {}
 
     @classmethod
     def new_bruker(
@@ -257,29 +278,79 @@ class Estimator2DJ(_Estimator1DProc):
 
     @property
     def spectrum_tilt(self) -> np.ndarray:
-        """Generate the spectrum of the data with a 45° tilt."""
-        spectrum = np.abs(self.spectrum_sinebell).real
-        sw1, sw2 = self.sw()
-        n1, n2 = self.default_pts
-        tilt_factor = (sw1 * n2) / (sw2 * n1)
-        for i, row in enumerate(spectrum):
-            spectrum[i] = np.roll(
-                row,
-                shift=int(tilt_factor * (n1 // 2 - i)),
-            )
+        """Generate the spectrum of the data with a 45° tilt.
+
+        Equivalent to :py:meth:`get_spectrum_tilt` with ``mode="integer"``.
+        """
+        return self.get_spectrum_tilt()
+
+    def get_spectrum_tilt(self, mode: str = "integer") -> np.ndarray:
+        r"""Generate the absolute-value sine-bell spectrum of the data with a 45°
+        tilt.
+
+        Row :math:`i` of the spectrum is shifted in the direct dimension by
 
-        return spectrum
+        .. math::
+
+            \frac{f_{\text{sw}}^{(1)} N^{(2)}}{f_{\text{sw}}^{(2)} N^{(1)}}
+            \left(\left\lfloor \frac{N^{(1)} - 1}{2} \right\rfloor - i\right)
+
+        points, such that the components of each multiplet are aligned at the
+        multiplet's chemical shift (row
+        :math:`\lfloor (N^{(1)} - 1) / 2 \rfloor` corresponds to
+        :math:`f^{(1)} = 0`). The spectrum is cached until the data is
+        modified, and is read-only.
+
+        Parameters
+        ----------
+        mode
+            How to apply the shifts:
+
+            * ``"integer"`` - Shifts are truncated to an integer number of points,
+              and applied by rolling each row of the spectrum.
+            * ``"exact"`` - Shifts are applied by multiplying the data in the
+              direct-dimension time domain with a linear phase ramp, prior to
+              Fourier transformation. This avoids rounding errors in the shifts.
+        """
+        sanity_check(("mode", mode, sfuncs.check_one_of, ("integer", "exact")))
+
+        def make_spectrum():
+            sw1, sw2 = self.sw()
+            n1, n2 = self.default_pts
+            tilt_factor = (sw1 * n2) / (sw2 * n1)
+            # The spectrum is flipped, so f1 = 0 is at row (n1 - 1) // 2
+            shifts = tilt_factor * ((n1 - 1) // 2 - np.arange(n1))
+
+            if mode == "integer":
+                spectrum = np.abs(self.spectrum_sinebell).real
+                for i, (row, shift) in enumerate(zip(spectrum, shifts.astype(int))):
+                    spectrum[i] = np.roll(row, shift=shift)
+                return spectrum
+
+            data = copy.deepcopy(self.data)
+            data[0, 0] *= 0.5
+            data = sig.ft(sig.sinebell_apodisation(data), axes=[0])
+            # Spectra are flipped by `sig.ft`, so a positive shift in the
+            # direct dimension corresponds to a decrease in frequency.
+            data *= _pole_matrix(-2j * np.pi * shifts / n2, n2)
+            return np.abs(sig.ft(data, axes=[1])).real
+
+        return self._cached(("spectrum_tilt", mode), make_spectrum)
 
     @property
     def spectrum_sinebell(self) -> np.ndarray:
         """Spectrum with sine-bell apodisation.
 
         Generated applying sine-bell apodisation to the FID, and applying FT.
+        The spectrum is cached until the data is modified, and is read-only.
         """
-        data = copy.deepcopy(self.data)
-        data[0, 0] *= 0.5
-        data = sig.sinebell_apodisation(data)
-        return sig.ft(data)
+        def make_spectrum():
+            data = copy.deepcopy(self.data)
+            data[0, 0] *= 0.5
+            data = sig.sinebell_apodisation(data)
+            return sig.ft(data)
+
+        return self._cached("spectrum_sinebell", make_spectrum)
 
     @property
     def default_multiplet_thold(self) -> float:
@@ -442,49 +513,45 @@ class Estimator2DJ(_Estimator1DProc):
             thold = self.default_multiplet_thold
 
         params = self.get_params(indices)
-        multiplets = {}
-        in_range = lambda f, g: (g - thold < f < g + thold)
-        for i, osc in enumerate(params):
-            centre_freq = osc[3] - osc[2]
-            assigned = False
-            for freq in multiplets:
-                if in_range(centre_freq, freq):
-                    multiplets[freq].append(i)
-                    assigned = True
-                    break
-            if not assigned:
-                multiplets[centre_freq] = [i]
-
-        # Set center freqs to average f2 - f1 in the multiplet
-        for old_freq, mp_indices in list(multiplets.items()):
-            new_freq = np.mean(params[mp_indices, 3] - params[mp_indices, 2])
-            multiplets[new_freq] = multiplets.pop(old_freq)
+        multiplets = self._get_multiplets(indices, thold, params)
 
         # Remove spurious opscillators, if requested
         if rm_spurious:
-            spurious = {}
-            for oscs in multiplets.values():
-                if len(oscs) == 1:
-                    osc = oscs[0]
-                    f1 = params[osc, 2]
-                    if abs(f1) > thold:
-                        # osc_loc is a tuple of the form (result_index, osc_index)
-                        osc_loc = self.find_osc(params[osc])
-                        if osc_loc[0] in spurious:
-                            spurious[osc_loc[0]].append(osc_loc[1])
-                        else:
-                            spurious[osc_loc[0]] = [osc_loc[1]]
-
-            for res_idx, osc_idx in spurious.items():
-                self.edit_result(index=res_idx, rm_oscs=osc_idx, **estimate_kwargs)
+            singlets = np.array(
+                [oscs[0] for _, oscs in multiplets if len(oscs) == 1],
+                dtype=int,
+            )
+            spurious = singlets[np.abs(params[singlets, 2]) > thold]
+            # Rows of the form (result_index, osc_index)
+            locations = self._get_osc_locations(indices)[spurious]
+            for res_idx in np.unique(locations[:, 0]):
+                osc_idx = locations[locations[:, 0] == res_idx, 1]
+                self.edit_result(
+                    index=int(res_idx), rm_oscs=osc_idx.tolist(), **estimate_kwargs,
+                )
 
         factor = 1. if freq_unit == "hz" else self.sfo[-1]
-        multiplets = {
-            freq / factor: indices
-            for freq, indices in sorted(multiplets.items(), key=lambda item: item[0])
-        }
+        return {freq / factor: list(oscs) for freq, oscs in multiplets}
 
-        return multiplets
+    def _get_multiplets(
+        self,
+        indices: Optional[Iterable[int]],
+        thold: float,
+        params: np.ndarray,
+    ) -> Iterable[Tuple[float, Iterable[int]]]:
+        # Multiplet assignments are memoised for each `(indices, thold)`, and
+        # recomputed if the parameters of the relevant results have changed.
+        # `params` should be `self.get_params(indices)`.
+        key = (tuple(self._process_indices(indices)), thold)
+        fingerprint = hash(params.tobytes())
+        entry = self._multiplet_cache.get(key)
+        if entry is None or entry[0] != fingerprint:
+            entry = (
+                fingerprint,
+                _cluster_multiplets(params[:, 3] - params[:, 2], thold),
+            )
+            self._multiplet_cache[key] = entry
+        return entry[1]
 
     def get_multiplet_integrals(
         self,
@@ -507,8 +574,10 @@ class Estimator2DJ(_Estimator1DProc):
         multiplets = self.predict_multiplets(**kwargs)
         indices = self._process_indices(kwargs.get("indices", None))
         params = self.get_params(indices)
+        # Integrate all oscillators at once, and sum over each multiplet
+        osc_integrals = np.array(self.oscillator_integrals(params))
         integrals = {
-            freq: sum(self.oscillator_integrals(params[mp]))
+            freq: np.sum(osc_integrals[mp])
             for freq, mp in list(multiplets.items())
         }
 
@@ -661,19 +730,12 @@ class Estimator2DJ(_Estimator1DProc):
         # Sort by frequency
         multiplets = sorted(list(multiplets.items()), key=lambda item: item[0])
         full_params = self.get_params(indices=indices)[:, [0, 1, 3, 5]]
-        expinfo_direct = self.expinfo_direct
-
-        fids = []
-        for (_, idx) in multiplets:
-            params = full_params[idx]
-            fids.append(
-                expinfo_direct.make_fid(
-                    params=params,
-                    pts=pts,
-                )
-            )
 
-        return fids
+        return list(
+            self.expinfo_direct.make_fids_per_oscillator(
+                full_params, pts=pts, groups=[idx for (_, idx) in multiplets],
+            )
+        )
 
     def write_multiplets_to_bruker(
         self,
@@ -1192,12 +1254,13 @@ class Estimator2DJ(_Estimator1DProc):
                 center_freq.append(cf)
                 f1_f2_region.append((f1, f2))
 
-                multiplet = expinfo_1d.make_fid(
-                    multiplet_param[:, [0, 1, 3, 5]],
+            multiplet_spectra.extend(
+                expinfo_1d.oscillator_spectra(
+                    params[:, [0, 1, 3, 5]],
                     pts=high_resolution_pts,
-                )
-                multiplet[0] *= 0.5
-                multiplet_spectra.append(sig.ft(multiplet).real)
+                    groups=multiplet_indices[-1],
+                ).real
+            )
 
             f1_f2.append(f1_f2_region)
             center_freqs.append(center_freq)
@@ -1485,3 +1548,39 @@ class Estimator2DJ(_Estimator1DProc):
         super().edit_result(
             index, add_oscs, rm_oscs, merge_oscs, split_oscs, **estimate_kwargs,
         )
+
+
+def _cluster_multiplets(
+    centre_freqs: np.ndarray,
+    thold: float,
+) -> Iterable[Tuple[float, Iterable[int]]]:
+    """Group oscillators by their values of :math:`f^{(2)} - f^{(1)}`.
+
+    The frequencies are sorted, and a new multiplet is started whenever a
+    frequency is at least ``thold`` greater than the first (smallest) frequency
+    of the current multiplet, so that every member is within ``thold`` of it.
+    The result does not depend on the order of the oscillators.
+
+    Returns
+    -------
+    A list of ``(freq, indices)`` tuples, ordered by increasing ``freq``, which
+    is the mean frequency of the multiplet. The indices of each multiplet are
+    in ascending order.
+    """
+    if centre_freqs.size == 0:
+        return []
+    order = np.argsort(centre_freqs, kind="stable")
+    sorted_freqs = centre_freqs[order]
+    # Multiplets are seeded by their first frequency, rather than chained
+    # through neighbouring frequencies, which would let them grow without limit
+    starts = [0]
+    for i, freq in enumerate(sorted_freqs):
+        if freq - sorted_freqs[starts[-1]] >= thold:
+            starts.append(i)
+    starts = np.array(starts)
+    sizes = np.diff(np.append(starts, sorted_freqs.size))
+    means = np.add.reduceat(sorted_freqs, starts) / sizes
+    return [
+        (float(freq), np.sort(group).tolist())
+        for freq, group in zip(means, np.split(order, starts[1:]))
+    ]
@@ -4,7 +4,6 @@
 # Last Edited: Wed 24 May 2023 10:59:32 BST
 
 from __future__ import annotations
-import copy
 from pathlib import Path
 from typing import Any, Dict, Iterable, Optional, Tuple, Union
 
@@ -56,6 +55,7 @@ class Estimator1D(_Estimator1DProc):
     default_nlp_trim = [None]
     default_max_iterations_exact_hessian = 100
     default_max_iterations_gn_hessian = 200
+    default_max_iterations_lbfgs = 500
 
     @classmethod
     def new_bruker(
@@ -311,7 +311,7 @@ class Estimator1D(_Estimator1DProc):
 
         fig = plt.figure()
         ax = fig.add_subplot()
-        y = copy.deepcopy(self._data)
+        y = self.data
 
         if domain == "freq":
             x = self.get_shifts(unit=freq_unit)[0]
@@ -708,12 +708,12 @@ class Estimator1D(_Estimator1DProc):
                 models.append(ax.plot(shifts, model, **model_line_kwargs)[0])
 
             colorcycle = make_color_cycle(oscillator_colors, n_oscs)
-            for i, p in enumerate(params):
+            # Oscillator spectra are only evaluated over the region of the axis
+            osc_spectra = self.oscillator_spectra(
+                params, pts=high_resolution_pts, slices=(highres_slice,),
+            ).real
+            for i, spec in enumerate(osc_spectra):
                 color = next(colorcycle)
-                p = np.expand_dims(p, axis=0)
-                osc = self.make_fid(p, pts=high_resolution_pts)
-                osc[0] *= 0.5
-                spec = ne.sig.ft(osc).real[highres_slice]
                 oscs.append(ax.plot(shifts_highres, spec, color=color, **oscillator_line_kwargs)[0])  # noqa: E501
 
                 if label_peaks and (i in ax_labels):
@@ -13,6 +13,7 @@ from typing import Any, Iterable, Optional, Tuple, Union
 import numpy as np
 import numpy.random as nrandom
 import scipy.integrate as integrate
+import scipy.special as special
 
 from nmrespy._files import check_saveable_dir
 from nmrespy._freqconverter import FrequencyConverter
@@ -612,6 +613,111 @@ class ExpInfo(FrequencyConverter):
 
         return fid
 
+    def make_fids_per_oscillator(
+        self,
+        params: np.ndarray,
+        pts: Optional[Iterable[int]] = None,
+        groups: Optional[Iterable[Iterable[int]]] = None,
+        chunk_size: Optional[int] = None,
+        spectra: bool = False,
+    ) -> np.ndarray:
+        """Construct the FID of each oscillator, or of each group of oscillators.
+
+        The signal poles of all oscillators are computed at once, and if
+        ``spectra`` is ``True``, a single batched Fourier transform is applied.
+        As the signal poles of each oscillator form a geometric sequence, far
+        fewer complex exponentials are evaluated than by :py:meth:`make_fid`.
+
+        Parameters
+        ----------
+        params
+            Parameter array. See :py:meth:`make_fid`.
+
+        pts
+            The number of points to construct the signals with in each dimension.
+            If ``None``, and ``self.default_pts`` is a tuple of ints, it will be
+            used.
+
+        groups
+            Indices of oscillators to sum together to form each signal, such as
+            the oscillators in each multiplet. If ``None``, a signal is created
+            for each oscillator.
+
+        chunk_size
+            The greatest number of signals to construct at once. Set this to
+            bound the size of intermediate arrays. If ``None``, all signals are
+            constructed at once.
+
+        spectra
+            If ``True``, the spectrum of each signal is returned instead, with the
+            first point of the signal halved prior to Fourier transformation.
+
+        Returns
+        -------
+        signals
+            Array of shape ``(M, *pts)``, where ``M`` is the number of
+            oscillators, or ``(G, *pts)``, where ``G`` is the number of groups.
+        """
+        sanity_check(
+            self._params_check(params),
+            self._pts_check(pts),
+            ("chunk_size", chunk_size, sfuncs.check_int, (), {"min_value": 1}, True),
+            ("spectra", spectra, sfuncs.check_bool),
+        )
+        sanity_check(
+            (
+                "groups", groups, sfuncs.check_int_list_list, (),
+                {"min_value": 0, "max_value": params.shape[0] - 1}, True,
+            ),
+        )
+
+        pts = self._process_pts(pts)
+        offset = self.offset()
+        alpha = params[:, 0] * np.exp(1j * params[:, 1])
+        # Signal pole matrices in each dimension, of shape (M, N_d). The complex
+        # amplitudes are absorbed into that of the final dimension.
+        poles = [
+            _pole_matrix(
+                (
+                    2j * np.pi * (params[:, 2 + i] - offset[i]) -
+                    params[:, 2 + self.dim + i]
+                ) / sw,
+                pt,
+            )
+            for i, (sw, pt) in enumerate(zip(self.sw(), pts))
+        ]
+        poles[-1] = poles[-1] * alpha[:, None]
+
+        nsignals = params.shape[0] if groups is None else len(groups)
+        if chunk_size is None:
+            chunk_size = max(nsignals, 1)
+        signals = np.empty((nsignals, *pts), dtype="complex128")
+        first_point = (slice(None), *(self.dim * [0]))
+        for start in range(0, nsignals, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            if groups is None:
+                if self.dim == 1:
+                    signals[chunk] = poles[0][chunk]
+                else:
+                    signals[chunk] = np.einsum(
+                        "mi,mj->mij", poles[0][chunk], poles[1][chunk],
+                    )
+            else:
+                for i, group in enumerate(groups[chunk], start=start):
+                    group = list(group)
+                    if self.dim == 1:
+                        signals[i] = np.einsum("mi->i", poles[0][group])
+                    else:
+                        signals[i] = poles[0][group].T @ poles[1][group]
+
+            if spectra:
+                signals[chunk][first_point] *= 0.5
+                signals[chunk] = sig.ft(
+                    signals[chunk], axes=list(range(1, self.dim + 1)),
+                )
+
+        return signals
+
     def generate_random_signal(
         self,
         oscillators: int,
@@ -679,14 +785,114 @@ class ExpInfo(FrequencyConverter):
 
         return (self.make_fid(params, pts, snr=snr, decibels=decibels), params)
 
+    def oscillator_spectra(
+        self,
+        params: np.ndarray,
+        pts: Optional[Iterable[int]] = None,
+        slices: Optional[Iterable[slice]] = None,
+        groups: Optional[Iterable[Iterable[int]]] = None,
+    ) -> np.ndarray:
+        r"""Compute the spectrum of each oscillator, or of each group of
+        oscillators, in closed form.
+
+        The spectra are equivalent to those given by
+        :py:meth:`make_fids_per_oscillator` with ``spectra=True`` (i.e. the first
+        point of each FID is halved prior to Fourier transformation), but only
+        the points specified by ``slices`` are evaluated, and no FIDs are
+        constructed. The discrete-time Fourier transform of :math:`\alpha z^n`,
+        :math:`n \in \{0, \cdots, N - 1\}` at frequency index :math:`k` is
+
+        .. math::
+
+            \alpha \frac{1 - z^N}{1 - z \mathrm{e}^{-2 \pi \mathrm{i} k / N}}
+
+        The spectra of 2D signals are the products of those in each dimension.
+
+        Parameters
+        ----------
+        params
+            Parameter array. See :py:meth:`make_fid`.
+
+        pts
+            The number of points in the spectra in each dimension. Setting these
+            larger than the number of points in the data gives spectra with a
+            higher resolution. If ``None``, and ``self.default_pts`` is a tuple of
+            ints, it will be used.
+
+        slices
+            The points to evaluate the spectra at in each dimension. These are
+            indices of the spectra given by :py:func:`nmrespy.sig.ft`, such
+            that ``slices`` can be used to slice the array of chemical shifts
+            given by :py:meth:`get_shifts`. If ``None``, all points are
+            evaluated.
+
+        groups
+            Indices of oscillators to sum together to form each spectrum. If
+            ``None``, a spectrum is created for each oscillator.
+
+        Returns
+        -------
+        spectra
+            Complex array of shape ``(M, ...)``, where ``M`` is the number of
+            oscillators, or ``(G, ...)``, where ``G`` is the number of groups.
+        """
+        sanity_check(
+            self._params_check(params),
+            self._pts_check(pts),
+            (
+                "groups", groups, sfuncs.check_int_list_list, (),
+                {"min_value": 0, "max_value": params.shape[0] - 1}, True,
+            ),
+        )
+        pts = self._process_pts(pts)
+        if slices is None:
+            slices = self.dim * [slice(None)]
+
+        alpha = params[:, 0] * np.exp(1j * params[:, 1])
+        spectra = alpha.reshape((-1, *(self.dim * [1])))
+        for i, (sw, offset, n, slice_) in enumerate(
+            zip(self.sw(), self.offset(), pts, slices)
+        ):
+            pole = np.exp(
+                (
+                    2j * np.pi * (params[:, 2 + i] - offset) -
+                    params[:, 2 + self.dim + i]
+                ) / sw
+            )
+            # Spectra produced by `sig.ft` are shifted and flipped: index j
+            # corresponds to frequency index (n - 1 - j) - n // 2
+            k = (n - 1 - np.arange(n)[slice_]) - n // 2
+            denominator = 1 - np.outer(pole, np.exp(-2j * np.pi * k / n))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                factor = (1 - pole ** n)[:, None] / denominator
+            # Undamped oscillators with frequencies on the grid have spectra
+            # which are zero except at one point.
+            bins = (params[:, 2 + i] - offset) * n / sw
+            on_grid = (params[:, 2 + self.dim + i] == 0.) & np.isclose(
+                bins, np.round(bins), rtol=0., atol=1e-8,
+            )
+            factor[on_grid] = n * (
+                np.mod(k - np.round(bins[on_grid])[:, None], n) == 0
+            )
+            shape = [-1] + self.dim * [1]
+            shape[i + 1] = factor.shape[1]
+            spectra = spectra * factor.reshape(shape)
+
+        # Halve the first point of each FID
+        spectra = spectra - 0.5 * alpha.reshape((-1, *(self.dim * [1])))
+        if groups is not None:
+            spectra = np.array([np.einsum("m...->...", spectra[g]) for g in groups])
+        return spectra
+
     def oscillator_integrals(
         self,
         params: np.ndarray,
         pts: Optional[Iterable[int]] = None,
         absolute: bool = True,
         scale_relative_to: Optional[int] = None,
-    ) -> float:
-        """Determine the integral of the FT of oscillators.
+        method: str = "analytic",
+    ) -> Iterable[float]:
+        r"""Determine the integral of the FT of oscillators.
 
         Parameters
         ----------
@@ -728,13 +934,40 @@ class ExpInfo(FrequencyConverter):
             If an int, the integral corresponding to the assigned oscillator is
             set to ``1``, and other integrals are scaled accordingly.
 
+        method
+            * ``"analytic"`` The integrals are given in closed form, for all
+              oscillators at once. No signals are constructed.
+            * ``"numeric"`` The spectrum of each oscillator is constructed, and
+              integrated using the composite Simpson's rule, provided by
+              `scipy.integrate.simpson <https://docs.scipy.org/doc/scipy/\
+              reference/generated/scipy.integrate.simpson.html>`_.
+
         Notes
         -----
-        The integration is performed using the composite Simpsons rule, provided
-        by `scipy.integrate.simps <https://docs.scipy.org/doc/scipy-1.5.4/\
-        reference/generated/scipy.integrate.simps.html>`_
-
         Spacing of points along the frequency axes is set as ``1`` (i.e. ``dx = 1``).
+
+        With ``method="analytic"``, the integral is the sum of the spectrum over
+        all points. The DFT of the signal :math:`\alpha z^n`,
+        :math:`z = \exp((2 \pi \mathrm{i} f - \eta) / f_{\mathrm{sw}})` is
+
+        .. math::
+
+            S_k = \alpha \frac{1 - z^N}{1 - z \mathrm{e}^{-2 \pi \mathrm{i} k / N}}
+
+        The sum of :math:`S_k` is simply :math:`N \alpha`. The sum of
+        :math:`\lvert S_k \rvert` for an oscillator whose signal has decayed
+        fully is given by
+
+        .. math::
+
+            \frac{2 N \lvert \alpha \rvert}{\pi} K \left(\lvert z \rvert^2\right)
+
+        where :math:`K` is the complete elliptic integral of the first kind.
+        Otherwise, :math:`\lvert S_k \rvert` is summed explicitly. For
+        multidimensional data, the spectrum is the product of the spectra in
+        each dimension. The analytic and numeric integrals agree closely for
+        well-resolved peaks. For peaks spanning very few points, the Simpson's
+        rule weights are inaccurate, while the analytic integral is exact.
         """
         sanity_check(
             self._params_check(params),
@@ -747,25 +980,51 @@ class ExpInfo(FrequencyConverter):
                     "max_value": params.shape[0] - 1,
                 },
                 True,
-            )
+            ),
+            ("method", method, sfuncs.check_one_of, ("analytic", "numeric")),
         )
 
-        # Integrals are the spectra initally. They are mutated and converted
-        # into the integrals during the for loop.
-        integrals = [
-            sig.ft(
-                self.make_fid(np.expand_dims(p, axis=0), pts),
+        if method == "analytic":
+            integrals = self._analytic_integrals(
+                params, self._process_pts(pts), absolute,
             )
-            for p in params
-        ]
-        integrals = [np.absolute(x) if absolute else x for x in integrals]
+            if isinstance(scale_relative_to, int):
+                integrals = integrals / integrals[scale_relative_to]
+            return list(integrals)
+
+        # Integrals are the spectra initally. They are converted into the
+        # integrals by integrating over each frequency axis.
+        integrals = sig.ft(
+            self.make_fids_per_oscillator(params, pts),
+            axes=list(range(1, self.dim + 1)),
+        )
+        if absolute:
+            integrals = np.absolute(integrals)
 
-        for axis in reversed(range(integrals[0].ndim)):
-            integrals = [integrate.simps(x, axis=axis) for x in integrals]
+        for axis in reversed(range(1, self.dim + 1)):
+            integrals = integrate.simpson(integrals, dx=1, axis=axis)
 
         if isinstance(scale_relative_to, int):
-            integrals = [x / integrals[scale_relative_to] for x in integrals]
+            integrals = integrals / integrals[scale_relative_to]
+
+        return list(integrals)
 
+    def _analytic_integrals(
+        self,
+        params: np.ndarray,
+        pts: Iterable[int],
+        absolute: bool,
+    ) -> np.ndarray:
+        # See the notes of `oscillator_integrals`
+        alpha = params[:, 0] * np.exp(1j * params[:, 1])
+        if not absolute:
+            return np.prod(pts) * alpha
+
+        integrals = np.abs(alpha)
+        for i, (sw, offset, n) in enumerate(zip(self.sw(), self.offset(), pts)):
+            freq = params[:, 2 + i] - offset
+            damp = params[:, 2 + self.dim + i]
+            integrals = integrals * _magnitude_sums(freq, damp, sw, n)
         return integrals
 
     @staticmethod
@@ -990,3 +1249,80 @@ class ExpInfo(FrequencyConverter):
             },
             self.default_pts is not None,
         )
+
+
+def _pole_matrix(exponents: np.ndarray, pts: int) -> np.ndarray:
+    """Compute the ``(M, pts)`` matrix with elements ``exp(n * exponents[m])``.
+
+    Writing ``n = q * B + r``, where ``B`` is roughly ``sqrt(pts)``, each element
+    is the product of ``exp(q * B * exponents[m])`` and ``exp(r *
+    exponents[m])``, such that only ``2 * B * M`` exponentials are computed.
+    """
+    block = max(1, int(np.ceil(np.sqrt(pts))))
+    fine = np.exp(np.outer(exponents, np.arange(block)))
+    coarse = np.exp(np.outer(exponents, np.arange(0, pts, block)))
+    return (coarse[:, :, None] * fine[:, None, :]).reshape(exponents.size, -1)[:, :pts]
+
+
+def _magnitude_sums(
+    freq: np.ndarray,
+    damp: np.ndarray,
+    sw: float,
+    pts: int,
+    chunk_size: int = 2 ** 22,
+) -> np.ndarray:
+    """Sum the magnitude of the DFT of unit-amplitude damped complex exponentials
+    in closed form.
+
+    Parameters
+    ----------
+    freq
+        Frequencies, relative to the offset.
+
+    damp
+        Damping factors.
+
+    sw
+        Sweep width.
+
+    pts
+        Number of points.
+
+    chunk_size
+        The largest number of elements in the intermediate arrays created when
+        summing the spectra of oscillators that have not fully decayed.
+    """
+    pole = np.exp((2j * np.pi * freq - damp) / sw)
+    r = np.abs(pole)
+    numerator = np.abs(1 - pole ** pts)
+    sums = np.empty(freq.shape, dtype="float64")
+
+    # Sum of 1 / |1 - z exp(-2πik/N)| over k. For fully decayed signals, this
+    # equals N times its mean over a period, (2 / π) K(|z|^2), to within a
+    # relative error of order |z|^N.
+    # For |z| > 1, 1 / |1 - z e^(iθ)| = (1 / |z|) / |1 - e^(iθ) / z|
+    inv_r = np.minimum(r, 1 / r)
+    decayed = inv_r ** pts < 1e-12
+    with np.errstate(divide="ignore"):
+        sums[decayed] = (
+            (2 * pts / np.pi) * special.ellipk(inv_r[decayed] ** 2) *
+            np.where(r[decayed] > 1, 1 / r[decayed], 1.)
+        )
+
+    idx = np.nonzero(~decayed)[0]
+    if idx.size > 0:
+        roots = np.exp(-2j * np.pi * np.arange(pts) / pts)
+        step = max(1, chunk_size // pts)
+        for start in range(0, idx.size, step):
+            chunk = idx[start : start + step]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sums[chunk] = np.einsum(
+                    "ij->i", 1 / np.abs(1 - np.outer(pole[chunk], roots)),
+                )
+
+    sums *= numerator
+    # Undamped oscillators with frequencies on the grid have spectra which are
+    # zero except at one point.
+    bins = freq * pts / sw
+    sums[(damp == 0.) & np.isclose(bins, np.round(bins), rtol=0., atol=1e-8)] = pts
+    return sums
@@ -19,13 +19,13 @@ MWE
 # SH, 16-3-22
 
 from __future__ import annotations
-import copy
 import functools
 from typing import Iterable, Optional, Tuple, Union
 
 import numpy as np
 import numpy.linalg as nlinalg
 import numpy.random as nrandom
+import scipy.fft as sfft
 # from scipy.optimize import minimize
 
 from nmrespy import ExpInfo
@@ -39,6 +39,93 @@ RegionInt = Union[Iterable[Optional[Tuple[int, int]]], Tuple[int, int]]
 Region = Union[RegionInt, RegionFloat]
 
 
+class FilterWorkspace:
+    """Quantities shared by all filters applied to the same FID.
+
+    The virtual echo, its Fourier transform, and the noise variance in a given
+    noise region do not depend on the region being filtered. Sharing a
+    workspace between :py:class:`Filter` instances means these are only
+    computed once.
+
+    .. note::
+
+        A workspace is only valid for the FID it was created with. It should
+        be discarded if the data is modified.
+    """
+
+    def __init__(self, fid: np.ndarray, twodim_dtype: Optional[str] = None) -> None:
+        """Initialise an instance of the class.
+
+        Parameters
+        ----------
+        fid
+            Time-domain data that filters will be applied to.
+
+        twodim_dtype
+            The type of 2D data. See :py:class:`Filter`.
+        """
+        self._fid = fid
+        self._twodim_dtype = twodim_dtype
+        self._virtual_echo = None
+        self._spectra = {}
+        self._noise_variances = {}
+
+    @property
+    def fid(self) -> np.ndarray:
+        """Get the time-domain data associated with the workspace."""
+        return self._fid
+
+    @property
+    def virtual_echo(self) -> np.ndarray:
+        """Get the virtual echo of the FID."""
+        if self._virtual_echo is None:
+            self._virtual_echo = sig.make_virtual_echo(self._fid, self._twodim_dtype)
+        return self._virtual_echo
+
+    def spectrum(self, axes: Iterable[int]) -> np.ndarray:
+        """Get the Fourier transform of the virtual echo.
+
+        Parameters
+        ----------
+        axes
+            The axes to Fourier transform along.
+
+        Returns
+        -------
+        spectrum
+            Read-only spectrum.
+        """
+        key = tuple(axes)
+        if key not in self._spectra:
+            spectrum = sig.ft(self.virtual_echo, axes=list(key))
+            spectrum.flags.writeable = False
+            self._spectra[key] = spectrum
+        return self._spectra[key]
+
+    def noise_variance(self, axes: Iterable[int], noise_slice: Tuple[slice]) -> float:
+        """Get the variance of the real part of the spectrum in a noise region.
+
+        A linear term is removed from the noise before the variance is computed
+        to prevent a non-flat baseline from contributing.
+
+        Parameters
+        ----------
+        axes
+            The axes the spectrum is Fourier transformed along.
+
+        noise_slice
+            Slice of the spectrum corresponding to the noise region.
+        """
+        key = (tuple(axes), tuple((s.start, s.stop) for s in noise_slice))
+        if key not in self._noise_variances:
+            noise = np.array(self.spectrum(axes)[noise_slice].real)
+            # Remove linear term from noise. Goal is to remove non-flat baseline
+            # shape from contributing to the noise variance determination.
+            noise -= Filter._linear_correction(noise)
+            self._noise_variances[key] = np.var(noise)
+        return self._noise_variances[key]
+
+
 class Filter(ExpInfo):
     """Object with tools to generate frequency-filtered NMR data."""
 
@@ -52,6 +139,8 @@ class Filter(ExpInfo):
         region_unit: str = "hz",
         sg_power: float = 40.0,
         twodim_dtype: Optional[str] = None,
+        seed: Optional[int] = None,
+        workspace: Optional[FilterWorkspace] = None,
     ) -> None:
         """Initialise an instance of the class.
 
@@ -78,6 +167,16 @@ class Filter(ExpInfo):
             Power of the super-Gaussian. The greater the value, the more box-like
             the filter.
 
+        seed
+            Seed for the random number generator used to construct the synthetic
+            noise added to the filtered spectrum. If ``None``, NumPy's global
+            random state is used. Providing a seed makes the filtered signal
+            reproducible.
+
+        workspace
+            A workspace created from ``fid``, which may be shared with other
+            filters. If ``None``, a new workspace is created.
+
         Notes
         -----
         **Region specification**
@@ -101,9 +200,12 @@ class Filter(ExpInfo):
             ("expinfo", expinfo, sfuncs.check_expinfo),
             ("sg_power", sg_power, sfuncs.check_float, (), {"greater_than_one": True}),
             ("fid", fid, sfuncs.check_ndarray),
+            ("seed", seed, sfuncs.check_int, (), {"min_value": 0}, True),
+            ("workspace", workspace, sfuncs.check_filter_workspace, (), {}, True),
         )
         self._fid = fid
         self._sg_power = sg_power
+        self._seed = seed
 
         if expinfo.dim == 1:
             sanity_check(("fid", fid, sfuncs.check_ndarray, (), {"dim": 1}))
@@ -146,14 +248,17 @@ class Filter(ExpInfo):
             ("noise_region", noise_region, sfuncs.check_region, region_check_args),
         )
 
-        ve = sig.make_virtual_echo(self._fid, twodim_dtype)
+        if workspace is None:
+            workspace = FilterWorkspace(self._fid, twodim_dtype)
+        self._workspace = workspace
+
         # Need to set default points before using the frequency converter
         # to convert to array indices
-        self.default_pts = ve.shape
+        self.default_pts = workspace.virtual_echo.shape
 
         self._region = self._process_region(region, region_unit, strict_region_order)
         self._noise_region = self._process_region(noise_region, region_unit, strict_region_order)  # noqa: E501
-        self._spectrum = sig.ft(ve, axes=self.axes)
+        self._spectrum = workspace.spectrum(self.axes)
 
     @property
     def axes(self):
@@ -213,7 +318,9 @@ class Filter(ExpInfo):
     @property
     def _filtered_unfixed_spectrum(self):
         """Filtered spectrum without any baseline fix."""
-        return (self.spectrum * self.sg) + self.sg_noise
+        filtered_spectrum = self.spectrum * self.sg
+        filtered_spectrum += self.sg_noise
+        return filtered_spectrum
 
     def get_filtered_spectrum(
         self,
@@ -253,25 +360,7 @@ class Filter(ExpInfo):
         #     filtered_spectrum += self._baseline_fix(filtered_spectrum)
 
         if isinstance(cut_ratio, float):
-            filtered_spectrum = filtered_spectrum[self._cut_slice(cut_ratio)]
-            scaling_factor = self._cut_scaling_factor(cut_ratio)
-            filtered_spectrum *= scaling_factor
-
-            cut_hz = self.convert(
-                self._cut_indices(cut_ratio), "idx->hz"
-            )
-            sw = tuple([abs(lft - rgt) for lft, rgt in cut_hz])
-            offset = tuple([(lft + rgt) / 2 for lft, rgt in cut_hz])
-            sfo, nuclei = self.sfo, self.nuclei
-
-            expinfo = ExpInfo(
-                dim=self.dim,
-                sw=sw,
-                offset=offset,
-                sfo=sfo,
-                nuceli=nuclei,
-                default_pts=filtered_spectrum.shape,
-            )
+            filtered_spectrum, expinfo = self._cut(filtered_spectrum, cut_ratio)
 
         else:
             expinfo = ExpInfo(
@@ -285,6 +374,38 @@ class Filter(ExpInfo):
 
         return filtered_spectrum, expinfo
 
+    def _cut(
+        self,
+        filtered_spectrum: np.ndarray,
+        cut_ratio: float,
+        fast_len: bool = False,
+    ) -> Tuple[np.ndarray, ExpInfo]:
+        """Truncate and scale a filtered spectrum.
+
+        Returns the cut spectrum (a new array) and the corresponding experiment
+        information.
+        """
+        cut_indices = self._cut_indices(cut_ratio, fast_len)
+        filtered_spectrum = filtered_spectrum[self._cut_slice(cut_ratio, fast_len)]
+        filtered_spectrum = filtered_spectrum * self._cut_scaling_factor(
+            cut_ratio, fast_len,
+        )
+
+        cut_hz = self.convert(cut_indices, "idx->hz")
+        sw = tuple([abs(lft - rgt) for lft, rgt in cut_hz])
+        offset = tuple([(lft + rgt) / 2 for lft, rgt in cut_hz])
+        sfo, nuclei = self.sfo, self.nuclei
+
+        expinfo = ExpInfo(
+            dim=self.dim,
+            sw=sw,
+            offset=offset,
+            sfo=sfo,
+            nuceli=nuclei,
+            default_pts=filtered_spectrum.shape,
+        )
+        return filtered_spectrum, expinfo
+
     def get_filtered_fid(
         self,
         cut_ratio: Optional[float] = 1.1,
@@ -308,6 +429,63 @@ class Filter(ExpInfo):
         expinfo._default_pts = filtered_fid.shape
         return filtered_fid, expinfo
 
+    def get_filtered_fids(
+        self,
+        cut_ratio: float = 1.1,
+    ) -> Tuple[Tuple[np.ndarray, ExpInfo], Tuple[np.ndarray, ExpInfo]]:
+        """Get both cut and uncut filtered FIDs.
+
+        The spectrum is filtered once, and both FIDs are derived from it. This is
+        cheaper than calling :py:meth:`get_filtered_fid` twice. In each filtered
+        dimension, the cut spectrum is widened slightly so that its size is
+        efficient for FFTs (see `scipy.fft.next_fast_len
+        <https://docs.scipy.org/doc/scipy/reference/generated/
+        scipy.fft.next_fast_len.html>`_).
+
+        Parameters
+        ----------
+        cut_ratio
+            The ratio of the cut spectrum's bandwidth and the filter bandwidth
+            (before widening). This must be greater than ``1.0``.
+
+        Returns
+        -------
+        cut
+            The cut filtered FID and its experiment information.
+
+        uncut
+            The uncut filtered FID and its experiment information.
+        """
+        sanity_check(
+            (
+                "cut_ratio", cut_ratio, sfuncs.check_float, (),
+                {"greater_than_one": True},
+            ),
+        )
+
+        filtered_spectrum = self._filtered_unfixed_spectrum
+        cut_spectrum, cut_expinfo = self._cut(
+            filtered_spectrum, cut_ratio, fast_len=True,
+        )
+        uncut_expinfo = ExpInfo(
+            dim=self.dim,
+            sw=self.sw("hz"),
+            offset=self.offset("hz"),
+            sfo=self.sfo,
+            nuceli=self.nuclei,
+            default_pts=self.default_pts,
+        )
+
+        fids = []
+        for spectrum, expinfo in (
+            (cut_spectrum, cut_expinfo), (filtered_spectrum, uncut_expinfo),
+        ):
+            fid = self._ift_and_slice(spectrum)
+            expinfo._default_pts = fid.shape
+            fids.append((fid, expinfo))
+
+        return tuple(fids)
+
     def _superg(self) -> np.ndarray:
         r"""Super-Gaussian for filtration of frequency-domian data.
 
@@ -336,7 +514,7 @@ class Filter(ExpInfo):
             else:
                 sg = sg[..., None] * s
 
-        return sg + (1j * np.zeros(sg.shape))
+        return sg
 
     def _superg_noise(self) -> np.ndarray:
         """Construct a synthetic noise sequence to add to the filtered spectrum."""
@@ -344,16 +522,15 @@ class Filter(ExpInfo):
             slice(r[0], r[1] + 1) if r is not None else slice(0, s)
             for r, s in zip(self.get_noise_region(unit="idx"), self.shape)
         )
-        noise = copy.deepcopy(self._spectrum)[noise_slice].real
-        # Remove linear term from noise. Goal is to remove non-flat baseline shape
-        # from contributing to the noise variance determination.
-        noise -= self._linear_correction(noise)
-
-        variance = np.var(noise)
-        sg_noise = nrandom.normal(0, np.sqrt(variance), size=self.shape)
+        variance = self._workspace.noise_variance(self.axes, noise_slice)
+        if self._seed is None:
+            sg_noise = nrandom.normal(0, np.sqrt(variance), size=self.shape)
+        else:
+            rng = nrandom.default_rng(self._seed)
+            sg_noise = rng.normal(0, np.sqrt(variance), size=self.shape)
         # Scale noise elements according to corresponding value of the
         # super-Gaussian filter
-        sg_noise *= (1 - self.sg.real)
+        sg_noise *= (1 - self.sg)
 
         return sg_noise
 
@@ -379,8 +556,14 @@ class Filter(ExpInfo):
         y = noise.reshape(-1, 1)
         return (X @ (nlinalg.pinv(X.T @ X) @ X.T @ y)).reshape(noise.shape)
 
-    def _cut_indices(self, cut_ratio: float) -> Iterable[Tuple[int, int]]:
-        """L and R bounds of cut spectrum in relation to the full spectrum."""
+    def _cut_indices(
+        self, cut_ratio: float, fast_len: bool = False,
+    ) -> Iterable[Tuple[int, int]]:
+        """L and R bounds of cut spectrum in relation to the full spectrum.
+
+        If ``fast_len`` is ``True``, the bounds of filtered dimensions are
+        widened such that the size of the cut spectrum is efficient for FFTs.
+        """
         center = self.get_center(unit="idx")
         bw = self.get_bw(unit="idx")
         pts = self.spectrum.shape
@@ -398,25 +581,37 @@ class Filter(ExpInfo):
                     mn = 0
                 if mx >= n:
                     mx = n - 1
+                if fast_len:
+                    # Widen evenly on both sides, as far as the bounds permit
+                    extra = min(sfft.next_fast_len(mx - mn + 1), n) - (mx - mn + 1)
+                    left = min(extra // 2, mn)
+                    right = min(extra - left, n - 1 - mx)
+                    mn -= extra - right
+                    mx += right
             cut_idx.append((mn, mx))
         return tuple(cut_idx)
 
-    def _cut_slice(self, cut_ratio: float) -> Iterable[slice]:
+    def _cut_slice(self, cut_ratio: float, fast_len: bool = False) -> Iterable[slice]:
         """Slice to extract cut spectrum."""
         return tuple(
-            [slice(lft, rgt + 1) for lft, rgt in self._cut_indices(cut_ratio)]
+            [
+                slice(lft, rgt + 1)
+                for lft, rgt in self._cut_indices(cut_ratio, fast_len)
+            ]
         )
 
-    def _cut_shape(self, cut_ratio: float) -> Iterable[int]:
+    def _cut_shape(self, cut_ratio: float, fast_len: bool = False) -> Iterable[int]:
         """Shape of a cut spectrum."""
-        return tuple([rgt - lft for lft, rgt in self._cut_indices(cut_ratio)])
+        return tuple(
+            [rgt - lft for lft, rgt in self._cut_indices(cut_ratio, fast_len)]
+        )
 
-    def _cut_scaling_factor(self, cut_ratio: float) -> float:
+    def _cut_scaling_factor(self, cut_ratio: float, fast_len: bool = False) -> float:
         """Ratio of size of cut spectrum and full spectrum in each dimension."""
         return functools.reduce(
             lambda x, y: x * y,
             [cut / uncut for cut, uncut in
-             zip(self._cut_shape(cut_ratio), self.shape)],
+             zip(self._cut_shape(cut_ratio, fast_len), self.shape)],
         )
 
     def get_center(self, unit: str = "hz") -> Iterable[Optional[Union[int, float]]]:
@@ -482,6 +677,9 @@ class Filter(ExpInfo):
 
         Any dimension that has been filtered and IFTed is sliced in half to remove the
         second half of the virtual echo obtained from the IFT of a real spectrum.
+        This is equivalent to :py:func:`nmrespy.sig.ift` (up to rounding error, as
+        ``scipy.fft`` is used), but avoids making needless full-size copies of the
+        spectrum.
         """
         fid_slice = []
         factor = 2 ** (len(self.axes) - 1)
@@ -491,7 +689,14 @@ class Filter(ExpInfo):
              for i in range(self.dim)]
         )
 
-        return factor * sig.ift(filtered_spectrum, axes=self.axes)[fid_slice]
+        fid = np.flip(filtered_spectrum, axis=self.axes)
+        for axis in self.axes:
+            # `ifftshift` creates a new array, which can be overwritten
+            fid = sfft.ifft(
+                sfft.ifftshift(fid, axes=axis), axis=axis, overwrite_x=True,
+            )
+
+        return factor * fid[fid_slice]
 
     # ================
     # Commented stuff below is related to baseline fixing.
@@ -13,12 +13,12 @@ MWE
 
 import copy
 import itertools
-from typing import Iterable, Union
+from typing import Iterable, Optional, Tuple, Union
 
 import numpy as np
 import numpy.linalg as nlinalg
+import scipy.fft as sfft
 import scipy.linalg as slinalg
-from scipy import sparse
 import scipy.sparse.linalg as splinalg
 from scipy.signal import argrelextrema
 
@@ -35,6 +35,192 @@ if USE_COLORAMA:
     colorama.init()
 
 
+class HankelOperator(splinalg.LinearOperator):
+    r"""Hankel matrix of a signal, represented as a linear operator.
+
+    The matrix :math:`\boldsymbol{H} \in \mathbb{C}^{R \times (N - R + 1)}`,
+    with :math:`H_{ij} = x_{i + j}`, is never formed. Products with
+    :math:`\boldsymbol{H}` and :math:`\boldsymbol{H}^{\mathrm{H}}` are computed
+    as correlations using the FFT, requiring :math:`\mathcal{O}(N \log N)`
+    operations and :math:`\mathcal{O}(N)` memory. This makes it suitable for use
+    with iterative solvers such as :py:func:`scipy.sparse.linalg.svds`.
+    """
+
+    def __init__(self, x: np.ndarray, rows: int) -> None:
+        """
+        Parameters
+        ----------
+        x
+            The 1D signal defining the matrix.
+
+        rows
+            The number of rows, :math:`R`. The matrix is equivalent to
+            ``scipy.linalg.hankel(x[:rows], x[rows - 1:])``.
+        """
+        sanity_check(
+            ("x", x, sfuncs.check_ndarray, (1,)),
+            ("rows", rows, sfuncs.check_int, (), {"min_value": 1, "max_value": x.size}),
+        )
+        self.x = x
+        shape = (rows, x.size - rows + 1)
+        super().__init__(dtype=np.result_type(x.dtype, "complex"), shape=shape)
+        self._fft_size = sfft.next_fast_len(x.size + max(shape) - 1)
+        self._x_fft = sfft.fft(x, self._fft_size)
+        self._xc_fft = sfft.fft(x.conj(), self._fft_size)
+
+    def _correlate(self, x_fft: np.ndarray, v: np.ndarray, start: int, size: int):
+        # Columns of `v` are treated independently.
+        conv = sfft.ifft(
+            x_fft.reshape(-1, 1) * sfft.fft(v[::-1], self._fft_size, axis=0),
+            axis=0,
+        )
+        return conv[start : start + size]
+
+    def _matmat(self, V: np.ndarray) -> np.ndarray:
+        # (H @ v)[i] = sum_j x[i + j] v[j]
+        rows, cols = self.shape
+        return self._correlate(self._x_fft, V, cols - 1, rows)
+
+    def _rmatmat(self, U: np.ndarray) -> np.ndarray:
+        # (H^H @ u)[j] = sum_i conj(x[i + j]) u[i]
+        rows, cols = self.shape
+        return self._correlate(self._xc_fft, U, rows - 1, cols)
+
+    def _matvec(self, v: np.ndarray) -> np.ndarray:
+        return self._matmat(v.reshape(-1, 1)).ravel()
+
+    def _rmatvec(self, u: np.ndarray) -> np.ndarray:
+        return self._rmatmat(u.reshape(-1, 1)).ravel()
+
+    def _adjoint(self) -> splinalg.LinearOperator:
+        return splinalg.LinearOperator(
+            (self.shape[1], self.shape[0]),
+            matvec=self._rmatvec,
+            rmatvec=self._matvec,
+            matmat=self._rmatmat,
+            rmatmat=self._matmat,
+            dtype=self.dtype,
+        )
+
+    @property
+    def squared_norm(self) -> float:
+        """Squared Frobenius norm of the matrix.
+
+        Each element of the signal appears once for every antidiagonal it
+        lies on.
+        """
+        rows, cols = self.shape
+        n = np.arange(self.x.size)
+        counts = np.minimum(n, cols - 1) - np.maximum(0, n - rows + 1) + 1
+        return float(np.sum(counts * np.abs(self.x) ** 2))
+
+    def todense(self) -> np.ndarray:
+        """Construct the dense Hankel matrix."""
+        rows = self.shape[0]
+        return slinalg.hankel(self.x[:rows], self.x[rows - 1:])
+
+
+class BlockHankelOperator(splinalg.LinearOperator):
+    r"""Enhanced (block Hankel) matrix of a 2D signal, represented as a linear
+    operator.
+
+    The matrix has :math:`L_1 \times (N_1 - L_1 + 1)` blocks, with block
+    :math:`(r, c)` being the :math:`L_2 \times (N_2 - L_2 + 1)` Hankel matrix of
+    the :math:`(r + c)`-th row of the signal, i.e.
+
+    .. math::
+
+        E_{r L_2 + l_2, c (N_2 - L_2 + 1) + k_2} = x_{r + c, l_2 + k_2}.
+
+    The matrix is never formed. Products with it and its adjoint are computed
+    as 2D correlations using the FFT.
+    """
+
+    def __init__(self, x: np.ndarray, rows: Tuple[int, int]) -> None:
+        """
+        Parameters
+        ----------
+        x
+            The 2D signal defining the matrix.
+
+        rows
+            The pencil parameters :math:`(L_1, L_2)`.
+        """
+        sanity_check(("x", x, sfuncs.check_ndarray, (2,)))
+        sanity_check(
+            (
+                "rows", rows, sfuncs.check_int_list, (),
+                {"length": 2, "min_value": 1},
+            ),
+        )
+        self.x = x
+        self.rows = tuple(rows)
+        self.cols = tuple([n - r + 1 for n, r in zip(x.shape, self.rows)])
+        shape = (self.rows[0] * self.rows[1], self.cols[0] * self.cols[1])
+        super().__init__(dtype=np.result_type(x.dtype, "complex"), shape=shape)
+        self._fft_shape = tuple(
+            [
+                sfft.next_fast_len(n + max(r, c) - 1)
+                for n, r, c in zip(x.shape, self.rows, self.cols)
+            ]
+        )
+        self._x_fft = sfft.fft2(x, self._fft_shape)
+        self._xc_fft = sfft.fft2(x.conj(), self._fft_shape)
+
+    def _correlate(
+        self,
+        x_fft: np.ndarray,
+        V: np.ndarray,
+        in_shape: Tuple[int, int],
+        out_shape: Tuple[int, int],
+    ) -> np.ndarray:
+        # Each column of `V` is reshaped into a 2D array of shape `in_shape`.
+        k = V.shape[1]
+        V = V.reshape(*in_shape, k)[::-1, ::-1]
+        conv = sfft.ifft2(
+            x_fft[..., None] * sfft.fft2(V, self._fft_shape, axes=(0, 1)),
+            axes=(0, 1),
+        )
+        start = [i - 1 for i in in_shape]
+        return conv[
+            start[0] : start[0] + out_shape[0],
+            start[1] : start[1] + out_shape[1],
+        ].reshape(-1, k)
+
+    def _matmat(self, V: np.ndarray) -> np.ndarray:
+        return self._correlate(self._x_fft, V, self.cols, self.rows)
+
+    def _rmatmat(self, U: np.ndarray) -> np.ndarray:
+        return self._correlate(self._xc_fft, U, self.rows, self.cols)
+
+    def _matvec(self, v: np.ndarray) -> np.ndarray:
+        return self._matmat(v.reshape(-1, 1)).ravel()
+
+    def _rmatvec(self, u: np.ndarray) -> np.ndarray:
+        return self._rmatmat(u.reshape(-1, 1)).ravel()
+
+    def _adjoint(self) -> splinalg.LinearOperator:
+        return splinalg.LinearOperator(
+            (self.shape[1], self.shape[0]),
+            matvec=self._rmatvec,
+            rmatvec=self._matvec,
+            matmat=self._rmatmat,
+            rmatmat=self._matmat,
+            dtype=self.dtype,
+        )
+
+    def todense(self) -> np.ndarray:
+        """Construct the dense block Hankel matrix."""
+        (L1, L2), (C1, C2) = self.rows, self.cols
+        EY = np.zeros(self.shape, dtype=self.dtype)
+        for r in range(L1):
+            for c in range(C1):
+                EY[r * L2 : (r + 1) * L2, c * C2 : (c + 1) * C2] = slinalg.hankel(
+                    self.x[r + c, :L2], self.x[r + c, L2 - 1 :],
+                )
+        return EY
+
+
 class MatrixPencil(ResultFetcher):
     """Matrix Pencil Method with model order selection.
 
@@ -73,6 +259,8 @@ class MatrixPencil(ResultFetcher):
         oscillators: int = 0,
         start_point: Union[Iterable[int], None] = None,
         output_mode: bool = True,
+        svd_method: str = "full",
+        max_oscillators: Optional[int] = None,
     ) -> None:
         """
         Parameters
@@ -97,12 +285,41 @@ class MatrixPencil(ResultFetcher):
         output_mode
             Flag specifiying whether to print infomation to the terminal as
             the method runs.
+
+        svd_method
+            How the singular value decomposition of the Hankel data matrix is
+            computed. For 2D data, this applies to the MDL estimate of the
+            number of oscillators.
+
+            * ``"full"`` (default): A full SVD of the dense Hankel matrix.
+            * ``"partial"``: A Lanczos partial SVD, computing only the leading
+              singular triplets. The Hankel matrix is represented by a
+              :py:class:`HankelOperator`, so it is never formed. Either
+              ``oscillators`` or ``max_oscillators`` must be given.
+
+        max_oscillators
+            An upper bound on the number of oscillators. Only used when
+            ``svd_method`` is ``"partial"`` and ``oscillators`` is ``0``. The
+            leading ``max_oscillators`` singular values are computed, and the
+            remaining singular values are assumed to be equal, with their total
+            energy determined from the Frobenius norm of the Hankel matrix. The
+            MDL is then applied to the resulting singular values.
         """
         sanity_check(
             ("expinfo", expinfo, sfuncs.check_expinfo),
             ("oscillators", oscillators, sfuncs.check_int, (), {"min_value": 0}),
             ("output_mode", output_mode, sfuncs.check_bool),
+            ("svd_method", svd_method, sfuncs.check_one_of, ("full", "partial")),
+            (
+                "max_oscillators", max_oscillators, sfuncs.check_int, (),
+                {"min_value": 1}, True,
+            ),
         )
+        if svd_method == "partial" and oscillators == 0 and max_oscillators is None:
+            raise ValueError(
+                f"{RED}`oscillators` or `max_oscillators` must be specified when "
+                f"`svd_method` is \"partial\".{END}"
+            )
         sanity_check(
             ("data", data, sfuncs.check_ndarray, (expinfo.dim,)),
             (
@@ -125,6 +342,8 @@ class MatrixPencil(ResultFetcher):
         if self.start_point is None:
             self.start_point = [0] * self.dim
         self.output_mode = output_mode
+        self.svd_method = svd_method
+        self.max_oscillators = max_oscillators
 
         # Init ResultFetcher
         super().__init__(sfo)
@@ -176,25 +395,13 @@ class MatrixPencil(ResultFetcher):
         if self.output_mode:
             print(f"--> Pencil Parameter: {L}")
 
-        # Construct Hankel matrix
-        Y = slinalg.hankel(normed_data[: N - L], normed_data[N - L - 1 :])
-
-        if self.output_mode:
-            print("--> Hankel data matrix constructed:")
-            print(f"\tSize:   {Y.shape[0]} x {Y.shape[1]}")
-            gibibytes = Y.nbytes / (2 ** 30)
-            if gibibytes >= 0.1:
-                print(f"\tMemory: {round(gibibytes, 4)}GiB")
-            else:
-                print(f"\tMemory: {round(gibibytes * (2**10), 4)}MiB")
-
-        # Singular value decomposition of Y
-        # returns singular values: min(N-L, L)-length vector
-        # and right singular vectors (LxL size matrix)
-        if self.output_mode:
-            print("--> Performing Singular Value Decomposition...")
-        _, sigma, Vh = nlinalg.svd(Y)
-        V = Vh.T
+        if self.svd_method == "full":
+            sigma, V = self._full_svd_1d(normed_data, L)
+        elif self.svd_method == "partial":
+            sigma, V = self._partial_svd(
+                HankelOperator(normed_data, N - L),
+                self.oscillators if self.oscillators > 0 else self.max_oscillators,
+            )
 
         # Compute the MDL in order to estimate the number of oscillators
         if self.output_mode:
@@ -203,7 +410,8 @@ class MatrixPencil(ResultFetcher):
         if self.oscillators == 0:
             if self.output_mode:
                 print("\tNumber of oscillators will be estimated using MDL")
-            self.oscillators = self._mdl_1d(sigma, N)
+            # With a partial SVD, only `V.shape[1]` singular vectors are known
+            self.oscillators = min(self._mdl_1d(sigma, N), V.shape[1])
 
         else:
             if self.output_mode:
@@ -246,6 +454,85 @@ class MatrixPencil(ResultFetcher):
         params[:, 0] *= norm
         self.params, self.oscillators = self._remove_negative_damping(params)
 
+    def _full_svd_1d(
+        self,
+        normed_data: np.ndarray,
+        L: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """SVD of the dense Hankel data matrix.
+
+        Returns the singular values and the (unconjugated) right singular
+        vectors as columns.
+        """
+        N = normed_data.size
+        # Construct Hankel matrix
+        Y = slinalg.hankel(normed_data[: N - L], normed_data[N - L - 1 :])
+
+        if self.output_mode:
+            print("--> Hankel data matrix constructed:")
+            print(f"\tSize:   {Y.shape[0]} x {Y.shape[1]}")
+            gibibytes = Y.nbytes / (2 ** 30)
+            if gibibytes >= 0.1:
+                print(f"\tMemory: {round(gibibytes, 4)}GiB")
+            else:
+                print(f"\tMemory: {round(gibibytes * (2**10), 4)}MiB")
+
+        # Singular value decomposition of Y
+        # returns singular values: min(N-L, L)-length vector
+        # and right singular vectors (LxL size matrix)
+        if self.output_mode:
+            print("--> Performing Singular Value Decomposition...")
+        _, sigma, Vh = nlinalg.svd(Y)
+        return sigma, Vh.T
+
+    def _partial_svd(
+        self,
+        Y: HankelOperator,
+        k: int,
+        compute_vectors: bool = True,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Partial SVD of a Hankel data matrix, without forming it.
+
+        Returns the singular values and the (unconjugated) right singular
+        vectors as columns. If the number of oscillators is unknown, the
+        singular values beyond the ``k`` computed are approximated as being equal.
+        """
+        size = min(Y.shape)
+        if self.output_mode:
+            print("--> Hankel data matrix represented implicitly:")
+            print(f"\tSize:   {Y.shape[0]} x {Y.shape[1]}")
+
+        if k >= size - 1:
+            # ARPACK requires k < min(shape): nothing to gain here anyway.
+            if self.output_mode:
+                print("--> Performing Singular Value Decomposition...")
+            _, sigma, Vh = nlinalg.svd(Y.todense())
+            return sigma, Vh.T
+
+        if self.output_mode:
+            print(
+                "--> Performing partial Singular Value Decomposition "
+                f"({k} singular values)..."
+            )
+        v0 = np.random.default_rng(0).standard_normal(size).astype("complex")
+        if compute_vectors:
+            _, sigma, Vh = splinalg.svds(Y, k=k, v0=v0)
+        else:
+            sigma = splinalg.svds(Y, k=k, v0=v0, return_singular_vectors=False)
+            Vh = None
+        # svds does not guarantee any particular order
+        order = np.argsort(sigma)[::-1]
+        sigma = sigma[order]
+
+        if self.oscillators == 0:
+            # The total energy of the singular values is the squared Frobenius
+            # norm of Y.
+            tail_energy = max(Y.squared_norm - np.sum(sigma ** 2), 0.)
+            sigma_tail = np.sqrt(tail_energy / (size - k))
+            sigma = np.hstack((sigma, np.full(size - k, sigma_tail)))
+
+        return sigma, None if Vh is None else Vh[order].T
+
     @timer
     @start_end_wrapper("MMEMP STARTED", "MMEMP COMPLETE")
     def _mpm_2d(self):
@@ -267,15 +554,23 @@ class MatrixPencil(ResultFetcher):
                 )
             # Construct Hankel matrix of first t1 increment, and perform MDL.
             L_mdl = int(np.floor(N2 / 3))
-            self.oscillators = self._mdl_1d(
-                nlinalg.svd(
+            if self.svd_method == "full":
+                sigma = nlinalg.svd(
                     slinalg.hankel(
                         normed_data[0, : N2 - L_mdl],
                         normed_data[0, N2 - L_mdl - 1 :],
                     )
-                )[1],
-                N2,
-            )
+                )[1]
+                self.oscillators = self._mdl_1d(sigma, N2)
+            elif self.svd_method == "partial":
+                sigma, _ = self._partial_svd(
+                    HankelOperator(normed_data[0], N2 - L_mdl),
+                    self.max_oscillators,
+                    compute_vectors=False,
+                )
+                self.oscillators = min(
+                    self._mdl_1d(sigma, N2), self.max_oscillators,
+                )
 
         else:
             if self.output_mode:
@@ -298,51 +593,24 @@ class MatrixPencil(ResultFetcher):
         # === Construct block Hankel EY ===
         row_size = L2
         col_size = N2 - L2 + 1
-        EY = np.zeros(
-            (L1 * L2, (N1 - L1 + 1) * (N2 - L2 + 1)),
-            dtype="complex",
-        )
-        for n1 in range(N1):
-            col = normed_data[n1, :L2]
-            row = normed_data[n1, L2 - 1:]
-            HYn1 = slinalg.hankel(col, row)
-            for n in range(n1 + 1):
-                r, c = n, n1 - n
-                if r < L1 and c < N1 - L1 + 1:
-                    EY[
-                        r * row_size : (r + 1) * row_size,
-                        c * col_size : (c + 1) * col_size
-                    ] = HYn1
+        EY = BlockHankelOperator(normed_data, (L1, L2))
 
         if self.output_mode:
-            print("--> Enhanced Block Hankel matrix constructed:")
+            print("--> Enhanced Block Hankel matrix represented implicitly:")
             print(f"\tSize: {EY.shape[0]} x {EY.shape[1]}")
-            gibibytes = EY.nbytes / (2 ** 30)
-            if gibibytes >= 0.1:
-                print(f"\tMemory: {round(gibibytes, 4)}GiB")
-            else:
-                print(f"\tMemory: {round(gibibytes * (2**10), 4)}MiB")
-
-
-        sparse_EY = sparse.csr_array(EY)
 
         if self.output_mode:
             print("--> Performing Singular Value Decomposition...")
-        UM, *_ = sparse.linalg.svds(EY, k=self.oscillators)
-
-        # === Construct permutation matrix ===
-        P = np.zeros((L1 * L2, L1 * L2))
-        r = 0
-        for l2 in range(L2):
-            for l1 in range(L1):
-                c = l1 * L2 + l2
-                P[r, c] = 1
-                r += 1
+        UM, *_ = splinalg.svds(EY, k=self.oscillators)
+
+        # === Permutation of rows of UM ===
+        # Row `l2 * L1 + l1` of the permuted matrix is row `l1 * L2 + l2` of UM.
+        perm = np.arange(L1 * L2).reshape(L1, L2).T.ravel()
         UM1 = UM[: (L1 - 1) * L2]
         UM2 = UM[L2:]
         z1, W1 = nlinalg.eig(nlinalg.pinv(UM1) @ UM2)
 
-        UMP = P @ UM
+        UMP = UM[perm]
         UMP1 = UMP[: L1 * (L2 - 1)]
         UMP2 = UMP[L1:]
         G = nlinalg.inv(W1) @ nlinalg.pinv(UMP1) @ UMP2 @ W1
@@ -397,7 +665,7 @@ class MatrixPencil(ResultFetcher):
         for i in range(N1 - L1 + 1):
             ER[:, i * col_size : (i + 1) * col_size] = Z1DZ2R
             Z1DZ2R = Z1D @ Z1DZ2R
-        alpha = np.diag(np.linalg.pinv(EL) @ EY @ np.linalg.pinv(ER))
+        alpha = np.diag(np.linalg.pinv(EL) @ (EY @ np.linalg.pinv(ER)))
         poles = np.hstack((z1, z2)).reshape((2, self.oscillators))
         params = self._generate_params(alpha, poles)
         params[:, 0] *= norm
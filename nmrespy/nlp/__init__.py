@@ -14,6 +14,7 @@ MWE
 import copy
 import functools
 import operator
+import time
 from typing import Iterable, Optional, Tuple, Union
 
 import numpy as np
@@ -42,8 +43,9 @@ def nonlinear_programming(
     start_time: Optional[Iterable[int]] = None,
     phase_variance: bool = True,
     hessian: str = "gauss-newton",
+    method: str = "trust-ncg",
     bound: bool = False,
-    max_iterations: int = 100,
+    max_iterations: Optional[int] = None,
     mode: str = "apfd",
     amp_thold: Optional[float] = None,
     freq_thold: Optional[float] = None,
@@ -55,6 +57,11 @@ def nonlinear_programming(
     initial_trust_radius: float = 1.0,
     max_trust_radius: float = 4.0,
     check_neg_amps_every: int = 10,
+    memory_budget: Optional[float] = None,
+    preconditioner: Optional[str] = None,
+    callback: Optional[callable] = None,
+    error_method: Optional[str] = "exact",
+    warm_start: bool = True,
 ):
     r"""
     Parameters
@@ -110,28 +117,59 @@ def nonlinear_programming(
         * ``"gauss-newton"`` The Hessian will be approximated as is done with
           the `Gauss-Newton method <https://en.wikipedia.org/wiki/
           Gauss%E2%80%93Newton_algorithm>`_
+        * ``"matrix-free"`` The Gauss-Newton Hessian will be used, but it is
+          never formed. The products with the Hessian needed by the optimiser
+          are computed as :math:`\boldsymbol{J}^{\mathrm{H}} (\boldsymbol{J}
+          \boldsymbol{d})`. This is recommended for estimates with a large
+          number of oscillators. Not available if ``method`` is ``"varpro"``.
+
+        Ignored if ``method`` is ``"lbfgs"``.
+
+    method
+        The optimisation method.
+
+        * ``"trust-ncg"`` All parameters specified by ``mode`` are optimised
+          using the trust-region Newton-CG algorithm.
+        * ``"varpro"`` Variable projection. The amplitudes and phases are
+          linear parameters of the model (via the complex amplitudes
+          :math:`a_m e^{\mathrm{i} \phi_m}`), and are determined by linear
+          least squares for each set of frequencies and damping factors. Only
+          the frequencies and damping factors specified by ``mode`` are
+          optimised with the trust-region Newton-CG algorithm, halving the
+          dimension of the Hessian. This typically reduces the number of
+          iterations needed for crowded regions. ``mode`` must contain
+          ``"a"``, ``"p"``, and at least one of ``"f"`` and ``"d"``.
+          ``phase_variance`` is ignored, and as amplitudes are always
+          non-negative, ``negative_amps`` has no effect.
+        * ``"lbfgs"`` The limited-memory BFGS algorithm (L-BFGS-B). Only the
+          objective and gradient are computed, and the Hessian is approximated
+          from recent updates. Memory requirements therefore scale linearly
+          with the number of oscillators, rather than quadratically, making
+          this suitable for estimates with hundreds of oscillators. Supports
+          ``bound``.
 
     bound
         .. warning::
 
-            Not yet supported. Hard-coded to ``False``.
+            Only supported if ``method`` is ``"lbfgs"``. Otherwise hard-coded
+            to ``False``.
 
         Specifies whether or not to bound the parameters during
         optimisation. Bounds are given by:
 
         * :math:`0 \leq a_m \leq \infty`
-        * :math:`-\pi < \phi_m \leq \pi`
         * :math:`-f_{\mathrm{sw}} / 2 + f_{\mathrm{off}} \leq f_m \leq\
           f_{\mathrm{sw}} / 2 + f_{\mathrm{off}}`
         * :math:`0 \leq \eta_m \leq \infty`
 
-        :math:`(\forall m \in \{1, \cdots, M\})`
+        :math:`(\forall m \in \{1, \cdots, M\})`. Phases are periodic,
+        and are not bounded.
 
     max_iterations
         A value specifiying the number of iterations the routine may run
         through before it is terminated. If ``None``, the default number
         of maximum iterations is set (``100`` if ``method`` is
-        ``"exact"`` or ``"gauss-newton"``, and ``500`` if ``"method"`` is
+        ``"trust-ncg"`` or ``"varpro"``, and ``500`` if ``method`` is
         ``"lbfgs"``).
 
     mode
@@ -210,17 +248,80 @@ def nonlinear_programming(
     check_neg_amps_every
         For every iteration that is a multiple of this, negative amplitudes
         will be checked for and dealt with if found.
+
+    memory_budget
+        2D data only. The greatest size (GiB) permitted for the intermediate
+        arrays used to compute the objective, gradient and exact Hessian. If
+        necessary, these are computed by accumulating over tiles of the direct
+        dimension. If ``None``, the whole signal is considered at once. The
+        Gauss-Newton Hessian, and the objective and gradient used by
+        ``"lbfgs"``, are computed from separable t1 and t2 factors, and never
+        require large intermediate arrays.
+
+    preconditioner
+        Preconditioner for the conjugate gradient subproblem solved at each
+        iteration. The parameters have very different scales, such that
+        preconditioning can reduce the number of conjugate gradient iterations
+        and trust-region iterations. Ignored if ``method`` is ``"lbfgs"``.
+
+        * ``None`` No preconditioning.
+        * ``"diagonal"`` The diagonal of the Hessian.
+        * ``"block-jacobi"`` The diagonal blocks of the Hessian associated
+          with each oscillator.
+
+        The trust region radii (``initial_trust_radius`` and
+        ``max_trust_radius``) are then measured in the norm induced by the
+        preconditioner. The total number of conjugate gradient iterations is
+        given by the ``cg_iterations`` attribute of the result.
+
+    callback
+        Function called after each iteration of the optimiser, with a
+        :py:class:`nmrespy.nlp.optimisers.IterationInfo` object as its sole
+        argument. This provides the iteration number, the current parameters
+        being optimised (with amplitudes normalised and frequencies centred
+        about the offset), the objective, the gradient norm, the trust radius, the
+        ratio of actual to predicted reduction ``rho``, the number of conjugate
+        gradient iterations, and whether the step was accepted. If the callback
+        returns ``True``, the optimiser is terminated, and oscillators are
+        not purged and re-optimised.
+
+        The numbers of objective, gradient and Hessian evaluations made are
+        given by the ``evaluations`` attribute of the result, and the time
+        taken to compute the errors by ``errors_time``.
+
+    error_method
+        Specifies how the errors of the parameters are computed. Errors are
+        derived from the diagonal of the inverse of the Hessian at the final
+        parameters, which is obtained using its Cholesky factorisation where
+        possible.
+
+        * ``"exact"`` The exact Hessian is used.
+        * ``"gauss-newton"`` The Gauss-Newton Hessian is used. This is far
+          cheaper to compute than the exact Hessian, particularly for 2D data,
+          and is a good approximation when the residual is small.
+        * ``None`` Errors are not computed, and are all set to ``NaN``.
+
+    warm_start
+        If ``True``, when the optimiser is re-run after oscillators with
+        negative or negligible amplitudes have been removed, it is
+        warm-started. The trust radius following the last accepted step is
+        retained, rather than being reset to ``initial_trust_radius``, and the
+        model and residual are updated by subtracting the contributions of the
+        removed oscillators, rather than being recomputed. Ignored if
+        ``method`` is ``"lbfgs"``. The number of re-runs is given by the
+        ``restarts`` attribute of the result, and all other statistics
+        (``iterations``, ``cg_iterations``, ``evaluations``, ``time``) are
+        cumulative over re-runs.
     """
     sanity_check(
         ("expinfo", expinfo, sfuncs.check_expinfo),
         ("phase_variance", phase_variance, sfuncs.check_bool),
-        ("hessian", hessian, sfuncs.check_one_of, ("exact", "gauss-newton")),
+        ("method", method, sfuncs.check_one_of, ("trust-ncg", "varpro", "lbfgs")),
         ("bound", bound, sfuncs.check_bool),
         (
             "max_iterations", max_iterations, sfuncs.check_int, (),
-            {"min_value": 1},
+            {"min_value": 1}, True,
         ),
-        ("mode", mode, sfuncs.check_optimiser_mode),
         (
             "amp_thold", amp_thold, sfuncs.check_float, (),
             {"greater_than_zero": True}, True,
@@ -235,6 +336,12 @@ def nonlinear_programming(
         ),
         ("output_mode", output_mode, sfuncs.check_int, (), {"min_value": 0}, True),
         ("save_trajectory", save_trajectory, sfuncs.check_bool),
+        ("warm_start", warm_start, sfuncs.check_bool),
+        ("callback", callback, sfuncs.check_callable, (), {}, True),
+        (
+            "error_method", error_method, sfuncs.check_one_of,
+            ("exact", "gauss-newton"), {}, True,
+        ),
         (
             "epsilon", epsilon, sfuncs.check_float, (),
             {"min_value": np.finfo(float).eps},
@@ -247,11 +354,24 @@ def nonlinear_programming(
             "initial_trust_radius", initial_trust_radius, sfuncs.check_float, (),
             {"greater_than_zero": True},
         ),
+        (
+            "preconditioner", preconditioner, sfuncs.check_one_of,
+            ("diagonal", "block-jacobi"), {}, True,
+        ),
     )
 
+    varpro = method == "varpro"
     dim = expinfo.dim
+    if max_iterations is None:
+        max_iterations = 500 if method == "lbfgs" else 100
 
     sanity_check(
+        (
+            "hessian", hessian, sfuncs.check_one_of,
+            ("exact", "gauss-newton") if varpro
+            else ("exact", "gauss-newton", "matrix-free"),
+        ),
+        ("mode", mode, sfuncs.check_optimiser_mode, (), {"varpro": varpro}),
         ("data", data, sfuncs.check_ndarray, (dim,)),
         ("theta0", theta0, sfuncs.check_parameter_array, (dim,)),
         (
@@ -266,10 +386,15 @@ def nonlinear_programming(
             "check_neg_amps_every", check_neg_amps_every, sfuncs.check_int, (),
             {"min_value": 1, "max_value": max_iterations},
         ),
+        (
+            "memory_budget", memory_budget, sfuncs.check_float, (),
+            {"greater_than_zero": True}, True,
+        ),
     )
 
     # Hard-code features that have not yet been implemented
-    bound = False
+    if method != "lbfgs":
+        bound = False
     freq_thold = None
 
     # Normalise the data
@@ -283,7 +408,7 @@ def nonlinear_programming(
         amp_thold = 0.0
     # TODO: Frequency threshold processing
 
-    if "p" not in mode:
+    if "p" not in mode or varpro:
         phase_variance = False
 
     active_idx, passive_idx = _get_active_passive_indices(mode, dim)
@@ -297,7 +422,22 @@ def nonlinear_programming(
     # Split parameter array into active and passive components
     active, passive = _split_parameters(theta0_proc, m, active_idx, passive_idx)
     # Get function factory
-    function_factory = _get_function_factory(dim, hessian)
+    function_factory = _get_function_factory(dim, hessian, method)
+    func_kwargs = {}
+    if dim == 2 and memory_budget is not None:
+        func_kwargs["memory_budget"] = memory_budget
+        # The 2D Gauss-Newton kernel is separable, and doesn't need tiling
+        if hessian == "exact":
+            function_factory = functools.partial(function_factory, **func_kwargs)
+    if varpro:
+        function_factory = functools.partial(function_factory, hessian=hessian)
+        # Amplitudes and phases are eliminated by linear least squares, so
+        # only the nonlinear parameters are optimised.
+        opt_idx = active_idx[2:]
+    else:
+        opt_idx = active_idx
+    if method == "lbfgs":
+        obj_grad = funcs.obj_grad_1d if dim == 1 else funcs.obj_grad_separable_2d
 
     # Extra arguments needed for the objective, grad, and Hessian, which are not
     # the parameters being optimised (`active`)
@@ -308,7 +448,7 @@ def nonlinear_programming(
         ),
         m,
         passive,
-        active_idx,
+        opt_idx,
         phase_variance,
     ]
 
@@ -316,37 +456,73 @@ def nonlinear_programming(
     trajectory = [] if save_trajectory else None
     opt_messages = []
     iterations = 0
+    cg_iterations = 0
+    evaluations = optimisers.new_evaluations()
     opt_time = 0.
+    restarts = 0
+    x0 = active[2 * m :] if varpro else active
+    trust_radius = initial_trust_radius
 
     while True:
-        result = optimisers.trust_ncg(
-            x0=active,
-            function_factory=function_factory,
-            args=tuple(opt_args),
-            eta=eta,
-            initial_trust_radius=initial_trust_radius,
-            max_trust_radius=max_trust_radius,
-            epsilon=epsilon,
-            output_mode=output_mode,
-            max_iterations=max_iterations,
-            save_trajectory=save_trajectory,
-            monitor_negative_amps=negative_amps == "remove",
-            check_neg_amps_every=check_neg_amps_every,
-        )
+        if method == "lbfgs":
+            # Scale parameters by the square root of the Gauss-Newton Hessian
+            # diagonal, as their sensitivities differ by orders of magnitude.
+            scale = np.sqrt(funcs.gauss_newton_diagonal(active, *opt_args))
+            scale[scale == 0.] = 1.
+            result = optimisers.lbfgs(
+                x0=active,
+                function=obj_grad,
+                args=tuple(opt_args),
+                bounds=_get_bounds(m, active_idx, expinfo.sw()) if bound else None,
+                epsilon=epsilon,
+                output_mode=output_mode,
+                max_iterations=max_iterations,
+                save_trajectory=save_trajectory,
+                scale=scale,
+                callback=callback,
+            )
+        else:
+            result = optimisers.trust_ncg(
+                x0=x0,
+                function_factory=function_factory,
+                args=tuple(opt_args),
+                eta=eta,
+                initial_trust_radius=trust_radius,
+                max_trust_radius=max_trust_radius,
+                epsilon=epsilon,
+                output_mode=output_mode,
+                max_iterations=max_iterations,
+                save_trajectory=save_trajectory,
+                monitor_negative_amps=negative_amps == "remove" and not varpro,
+                check_neg_amps_every=check_neg_amps_every,
+                preconditioner=preconditioner,
+                callback=callback,
+                compute_errors=False,
+            )
 
         active = result.x
+        trajs = result.trajectory
+        if varpro:
+            active = funcs.varpro_full_active(active, *opt_args)
+            if save_trajectory:
+                trajs = [funcs.varpro_full_active(x, *opt_args) for x in trajs]
         if save_trajectory:
             # Need to know the passive params associated with trajectory to
             # reconstruct later on
-            trajectory.append([result.trajectory, passive])
+            trajectory.append([trajs, passive])
         opt_messages.append(result.result_message)
         iterations += result.iterations
+        cg_iterations += result.cg_iterations
+        for key, value in result.evaluations.items():
+            evaluations[key] += value
         opt_time += result.time
 
         # --- Tackle negative and negligible amplitudes ---
         # `rerun` flag specifies whether or not to rerun the optimiser as some
         # oscillators have been purged.
         rerun = False
+        # Indices of oscillators which have not been purged
+        oscillators = kept = np.arange(m)
         if negative_amps == "ignore":
             pass
 
@@ -370,6 +546,7 @@ def nonlinear_programming(
                     passive = np.delete(
                         passive, _get_slice(m, passive_idx, osc_idx=negative_idx),
                     )
+                    kept = np.delete(kept, negative_idx)
                     m -= len(negative_idx)
 
                     if output_mode is not None:
@@ -408,28 +585,48 @@ def nonlinear_programming(
                 passive = np.delete(
                     passive, _get_slice(m, passive_idx, osc_idx=negligible_idx),
                 )
+                kept = np.delete(kept, negligible_idx)
                 m -= len(negligible_idx)
 
                 if output_mode is not None:
                     print(f"{ORA}Updated number of oscillators: {m}{END}")
 
-        if not rerun:
+        opt_args[2] = m
+        opt_args[3] = passive
+        terminated = result.result_message == optimisers.result_messages["callback"]
+        if not rerun or terminated:
             break
 
-        else:
-            opt_args[2] = m
-            opt_args[3] = passive
+        restarts += 1
+        x0 = active[2 * m :] if varpro else active
+        if warm_start and method != "lbfgs":
+            removed = np.setdiff1d(oscillators, kept)
+            x0 = result.function_factory.remove_oscillators(removed, x0, *opt_args)
+            trust_radius = result.trust_radius
 
     # --- Generate the errors ---
+    errors_start = time.time()
     # Switch off phase variance for objective and Hessian computation
     opt_args[-1] = False
-    if dim == 1:
-        func = funcs.obj_grad_true_hess_1d
-    elif dim == 2:
-        func = funcs.obj_grad_true_hess_2d
-
-    obj, _, hess = func(active, *opt_args)
-    errors = np.sqrt(obj * np.abs(np.diag(np.linalg.inv(hess))) / np.prod(data.shape))
+    # Errors are given for all parameters specified by `mode`
+    opt_args[-2] = active_idx
+    if error_method is None:
+        errors = np.full(active.shape, np.nan)
+    else:
+        if error_method == "gauss-newton":
+            func = (
+                funcs.obj_grad_gauss_newton_hess_1d if dim == 1
+                else funcs.obj_grad_gauss_newton_hess_separable_2d
+            )
+            obj, _, hess = func(active, *opt_args)
+        else:
+            func = (
+                funcs.obj_grad_true_hess_1d if dim == 1
+                else funcs.obj_grad_true_hess_2d
+            )
+            obj, _, hess = func(active, *opt_args, **func_kwargs)
+        errors = np.sqrt(obj * funcs.inverse_diagonal(hess) / np.prod(data.shape))
+    errors_time = time.time() - errors_start
 
     # --- Format the result array ---
     active_slice = _get_slice(m, active_idx)
@@ -480,6 +677,7 @@ def nonlinear_programming(
 
     return optimisers.NLPResult(
         theta, proc_errors, proc_trajectories, opt_messages, iterations, opt_time,
+        cg_iterations, evaluations, errors_time, restarts,
     )
 
 
@@ -542,8 +740,32 @@ def _shift_offset(
     return params
 
 
-def _get_function_factory(dim: int, hessian: str) -> funcs.FunctionFactory:
-    if dim == 1 and hessian == "exact":
+def _get_bounds(
+    m: int, active_idx: Iterable[int], sw: Iterable[float],
+) -> Iterable[Tuple[Optional[float], Optional[float]]]:
+    # Frequencies are centered at 0 during optimisation
+    dim = len(sw)
+    bounds = []
+    for i in active_idx:
+        if i == 0 or i >= 2 + dim:
+            # Amplitudes and damping factors
+            bounds.extend(m * [(0., None)])
+        elif i == 1:
+            # Phases are periodic
+            bounds.extend(m * [(None, None)])
+        else:
+            bounds.extend(m * [(-sw[i - 2] / 2, sw[i - 2] / 2)])
+    return bounds
+
+
+def _get_function_factory(
+    dim: int, hessian: str, method: str = "trust-ncg",
+) -> funcs.FunctionFactory:
+    if dim == 1 and method == "varpro":
+        return funcs.FunctionFactory1DVarPro
+    elif dim == 2 and method == "varpro":
+        return funcs.FunctionFactory2DVarPro
+    elif dim == 1 and hessian == "exact":
         return funcs.FunctionFactory1DExact
     elif dim == 1 and hessian == "gauss-newton":
         return funcs.FunctionFactory1DGaussNewton
@@ -551,3 +773,7 @@ def _get_function_factory(dim: int, hessian: str) -> funcs.FunctionFactory:
         return funcs.FunctionFactory2DExact
     elif dim == 2 and hessian == "gauss-newton":
         return funcs.FunctionFactory2DGaussNewton
+    elif dim == 1 and hessian == "matrix-free":
+        return funcs.FunctionFactory1DMatrixFree
+    elif dim == 2 and hessian == "matrix-free":
+        return funcs.FunctionFactory2DMatrixFree
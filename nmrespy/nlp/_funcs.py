@@ -5,9 +5,11 @@
 
 """Definitions of fidelities, gradients, and Hessians."""
 
-from typing import Dict, Tuple
+import copy
+from typing import Dict, Iterable, Optional, Tuple
 import numpy as np
 import scipy as sp
+import scipy.sparse.linalg as splinalg
 
 
 args_type = Tuple[np.ndarray, np.ndarray, int, np.ndarray, list, bool]
@@ -16,32 +18,85 @@ args_type = Tuple[np.ndarray, np.ndarray, int, np.ndarray, list, bool]
 class FunctionFactory:
     """Object which computes and memoises the objective gradient and hessian for
     a given set of parameters.
+
+    Quantities are computed lazily. If ``obj_fun`` is provided, accessing the
+    objective only evaluates ``obj_fun``, which should return the objective
+    along with any intermediate quantities (signal poles, model, residual) that
+    ``fun`` can reuse via its ``intermediates`` argument. The gradient and
+    Hessian are only computed when they are accessed. This means that trial
+    steps which are rejected never incur the cost of derivative computation.
+
+    The number of times the objective, gradient and Hessian have been
+    evaluated is recorded in ``evaluations``.
+
+    If ``purge_fun`` is provided, :py:meth:`remove_oscillators` can derive the
+    objective and intermediates with certain oscillators removed from those
+    already computed, by subtracting the contributions of the removed
+    oscillators.
     """
 
-    def __init__(self, theta: np.ndarray, fun: callable, *args) -> None:
+    def __init__(
+        self,
+        theta: np.ndarray,
+        fun: callable,
+        *args,
+        obj_fun: Optional[callable] = None,
+        purge_fun: Optional[callable] = None,
+        **kwargs,
+    ) -> None:
         self.theta = theta
         self.fun = fun
+        self.obj_fun = obj_fun
+        self.purge_fun = purge_fun
         self.obj = None
         self.grad = None
         self.hess = None
+        self.intermediates = None
         self.args = args
+        self.kwargs = kwargs
+        self.evaluations = {"objective": 0, "gradient": 0, "hessian": 0}
+
+    def _compute_obj_if_needed(self):
+        """Compute the objective if it has not been computed yet."""
+        if self.obj is None:
+            if self.obj_fun is None:
+                self._compute_if_needed()
+            else:
+                self.obj, self.intermediates = self.obj_fun(self.theta, *self.args)
+                self.evaluations["objective"] += 1
 
     def _compute_if_needed(self):
         """Determine if quantities need to be computed.
 
-        Determines whether parameters array has changed, or the objective has not
-        been computed yet. If either of these are so, obj and grad are
-        computed.
+        Determines whether the gradient and Hessian have not been computed yet. If
+        so, they are computed, reusing any intermediates from the computation of
+        the objective.
         """
-        if self.obj is None:
-            self.obj, self.grad, self.hess = self.fun(self.theta, *self.args)
+        if self.grad is None:
+            kwargs = self.kwargs
+            if self.intermediates is not None:
+                kwargs = {**kwargs, "intermediates": self.intermediates}
+            obj, self.grad, self.hess = self.fun(self.theta, *self.args, **kwargs)
+            self.evaluations["gradient"] += 1
+            self.evaluations["hessian"] += 1
+            if self.obj is None:
+                self.obj = obj
+                self.evaluations["objective"] += 1
 
     def model(self, p) -> float:
-        return self.objective + self.gradient @ p + 0.5 * (p.T @ self.hessian @ p)
+        return self.objective + self.gradient @ p + 0.5 * (p.T @ self.hessp(p))
+
+    def hessp(self, d: np.ndarray) -> np.ndarray:
+        """Compute the product of the Hessian with a vector ``d``.
+
+        If the Hessian is a :py:class:`scipy.sparse.linalg.LinearOperator`, this
+        is computed without the Hessian being formed.
+        """
+        return self.hessian @ d
 
     @property
     def objective(self) -> float:
-        self._compute_if_needed()
+        self._compute_obj_if_needed()
         return self.obj
 
     @property
@@ -58,25 +113,122 @@ class FunctionFactory:
         self._compute_if_needed()
         return self.hess
 
+    def hessian_blocks(self) -> np.ndarray:
+        """Diagonal blocks of the Hessian associated with each oscillator, with
+        shape ``(M, p, p)``.
+
+        If the Hessian is not formed, the Gauss-Newton blocks are computed
+        using :py:func:`gauss_newton_blocks`.
+        """
+        m = self.args[2]
+        if not isinstance(self.hessian, np.ndarray):
+            return gauss_newton_blocks(self.theta, *self.args)
+        p = self.hessian.shape[0] // m
+        idx = np.arange(m)[:, None] + m * np.arange(p)
+        return self.hessian[idx[:, :, None], idx[:, None, :]]
+
+    def remove_oscillators(
+        self, osc_idx: Iterable[int], theta: np.ndarray, *args,
+    ) -> "FunctionFactory":
+        """Create a function factory for the parameters with certain oscillators
+        removed, for warm-starting an optimiser.
+
+        Parameters
+        ----------
+        osc_idx
+            Indices of the oscillators removed.
+
+        theta
+            The parameters with the oscillators removed.
+
+        args
+            The arguments associated with ``theta``.
+
+        Returns
+        -------
+        A new function factory. If ``purge_fun`` was given and the objective
+        has been computed, the objective and intermediates of the new factory
+        are obtained from those of this one. Otherwise, they are computed
+        from scratch when required.
+        """
+        factory = copy.copy(self)
+        factory.theta = theta
+        factory.args = args
+        factory.obj = factory.grad = factory.hess = factory.intermediates = None
+        factory.evaluations = {"objective": 0, "gradient": 0, "hessian": 0}
+        if self.purge_fun is not None and self.intermediates is not None:
+            factory.obj, factory.intermediates = self.purge_fun(
+                self.intermediates, list(osc_idx), theta, *args,
+            )
+        return factory
+
 
 class FunctionFactory1DExact(FunctionFactory):
     def __init__(self, theta: np.ndarray, *args) -> None:
-        super().__init__(theta, obj_grad_true_hess_1d, *args)
+        super().__init__(
+            theta, obj_grad_true_hess_1d, *args, obj_fun=_intermediates_1d,
+            purge_fun=_purge_intermediates_1d,
+        )
 
 
 class FunctionFactory1DGaussNewton(FunctionFactory):
     def __init__(self, theta: np.ndarray, *args) -> None:
-        super().__init__(theta, obj_grad_gauss_newton_hess_1d, *args)
+        super().__init__(
+            theta, obj_grad_gauss_newton_hess_1d, *args, obj_fun=_intermediates_1d,
+            purge_fun=_purge_intermediates_1d,
+        )
 
 
 class FunctionFactory2DExact(FunctionFactory):
-    def __init__(self, theta: np.ndarray, *args) -> None:
-        super().__init__(theta, obj_grad_true_hess_2d, *args)
+    def __init__(self, theta: np.ndarray, *args, **kwargs) -> None:
+        # The exact Hessian is accumulated over tiles, so there are no
+        # intermediates to share.
+        super().__init__(
+            theta, obj_grad_true_hess_2d, *args, obj_fun=_obj_no_intermediates_2d,
+            **kwargs,
+        )
 
 
 class FunctionFactory2DGaussNewton(FunctionFactory):
     def __init__(self, theta: np.ndarray, *args) -> None:
-        super().__init__(theta, obj_grad_gauss_newton_hess_2d, *args)
+        super().__init__(
+            theta, obj_grad_gauss_newton_hess_separable_2d, *args,
+            obj_fun=_intermediates_separable_2d,
+            purge_fun=_purge_intermediates_separable_2d,
+        )
+
+
+class FunctionFactory1DMatrixFree(FunctionFactory):
+    def __init__(self, theta: np.ndarray, *args) -> None:
+        super().__init__(
+            theta, obj_grad_gauss_newton_hessp_1d, *args, obj_fun=_intermediates_1d,
+            purge_fun=_purge_intermediates_1d,
+        )
+
+
+class FunctionFactory2DMatrixFree(FunctionFactory):
+    def __init__(self, theta: np.ndarray, *args) -> None:
+        super().__init__(
+            theta, obj_grad_gauss_newton_hessp_separable_2d, *args,
+            obj_fun=_intermediates_separable_2d,
+            purge_fun=_purge_intermediates_separable_2d,
+        )
+
+
+class FunctionFactory1DVarPro(FunctionFactory):
+    def __init__(self, theta: np.ndarray, *args, **kwargs) -> None:
+        super().__init__(
+            theta, obj_grad_varpro_hess_1d, *args,
+            obj_fun=_intermediates_varpro_1d, **kwargs,
+        )
+
+
+class FunctionFactory2DVarPro(FunctionFactory):
+    def __init__(self, theta: np.ndarray, *args, **kwargs) -> None:
+        super().__init__(
+            theta, obj_grad_varpro_hess_2d, *args,
+            obj_fun=_intermediates_varpro_2d, **kwargs,
+        )
 
 
 def first_derivatives_1d(
@@ -308,6 +460,88 @@ def second_derivatives_1d(
     return d2
 
 
+def _intermediates_1d(
+    active: np.ndarray, *args: args_type,
+) -> Tuple[float, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Compute the objective for 1D data, along with intermediates which are
+    shared with the gradient and Hessian.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    intermediates: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        The full parameter vector, the ``(N, M)`` model per oscillator, and the
+        residual.
+    """
+    data, tp, m, passive, idx, phasevar = args
+
+    # reconstruct correctly ordered parameter vector from
+    # active and passive parameters.
+    theta = _construct_parameters(active, passive, m, idx)
+
+    # N x M array comprising M N-length vectors.
+    # Each vector is the model produced by a single oscillator.
+    # Broadcasting of signal pole matrix and complex amplitude vector
+    model_per_osc = np.exp(
+        np.outer(tp[0], (1j * 2 * np.pi * theta[2 * m : 3 * m] - theta[3 * m :]))
+    ) * (theta[:m] * np.exp(1j * theta[m : 2 * m]))
+
+    model = np.einsum("ij->i", model_per_osc)
+    diff = data - model
+
+    obj = np.real(diff.conj().T @ diff)
+
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        obj += pv_obj(theta[i * m : (i + 1) * m])
+
+    return obj, (theta, model_per_osc, diff)
+
+
+def _purge_intermediates_1d(
+    intermediates: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    osc_idx: Iterable[int],
+    active: np.ndarray,
+    *args: args_type,
+) -> Tuple[float, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Update the output of :py:func:`_intermediates_1d` after removing
+    oscillators.
+
+    The contributions of the removed oscillators are subtracted from the model
+    (added to the residual), such that no signal poles need to be recomputed.
+
+    Parameters
+    ----------
+    intermediates
+        Intermediates associated with the parameters before removal.
+
+    osc_idx
+        Indices of the oscillators removed.
+
+    active
+        Active parameters after removal.
+
+    args
+        See :py:func:`obj_grad_gauss_newton_hess_1d`. These should be associated
+        with the parameters after removal.
+    """
+    data, tp, m, passive, idx, phasevar = args
+    _, model_per_osc, diff = intermediates
+    theta = _construct_parameters(active, passive, m, idx)
+
+    diff = diff + np.einsum("ij->i", model_per_osc[:, osc_idx])
+    model_per_osc = np.delete(model_per_osc, osc_idx, axis=1)
+    obj = np.real(diff.conj().T @ diff)
+
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        obj += pv_obj(theta[i * m : (i + 1) * m])
+
+    return obj, (theta, model_per_osc, diff)
+
+
 def obj_1d(active: np.ndarray, *args: args_type) -> float:
     """Compute the objective for 1D data.
 
@@ -402,30 +636,15 @@ def obj_grad_1d(active: np.ndarray, *args: args_type) -> Tuple[float, np.ndarray
     # active and passive parameters.
     theta = _construct_parameters(active, passive, m, idx)
 
-    # N x M array comprising M N-length vectors.
-    # Each vector is the model produced by a single oscillator.
-    # Broadcasting of signal pole matrix and complex amplitude vector
-    model_per_osc = np.exp(
-        np.outer(tp[0], (1j * 2 * np.pi * theta[2 * m : 3 * m] - theta[3 * m :]))
-    ) * (theta[:m] * np.exp(1j * theta[m : 2 * m]))
-
-    deriv_functions = {
-        "a": lambda x: x / theta[:m],
-        "p": lambda x: 1j * x,
-        "f": lambda x: np.einsum("ij,i->ij", x, (1j * 2 * np.pi * tp[0])),
-        "d": lambda x: np.einsum("ij,i->ij", x, -tp[0])
-    }
-
-    # ∂x/∂θᵢ
-    d1 = first_derivatives_1d(model_per_osc, idx, deriv_functions)
-
-    model = np.einsum("ij->i", model_per_osc)
-    diff = data - model
+    Z, alpha, terms = _terms_1d(theta, tp, m, idx)
+    diff = data - Z @ alpha
 
     # --- ℱ(θ) ---
     obj = np.real(diff.conj().T @ diff)
     # --- ∇ℱ(θ) ---
-    grad = -2 * np.real(d1.conj().T @ diff)
+    # The Jacobian is never formed, and only (conj(D) Tᵉ) Z is needed.
+    W = (diff.conj() @ Z, (tp[0] * diff.conj()) @ Z)
+    grad = np.hstack([-2 * np.real(c * W[e]) for c, e in terms])
 
     if phasevar:
         # If 0 in idx, phases will be between m and 2m, as amps
@@ -439,6 +658,38 @@ def obj_grad_1d(active: np.ndarray, *args: args_type) -> Tuple[float, np.ndarray
     return obj, grad
 
 
+def _terms_1d(
+    theta: np.ndarray, tp: Iterable[np.ndarray], m: int, idx: list,
+) -> Tuple[np.ndarray, np.ndarray, Iterable[Tuple[np.ndarray, int]]]:
+    """Factors of the 1D model and its first derivatives.
+
+    Returns
+    -------
+    Z
+        The ``(N, M)`` signal pole matrix.
+
+    alpha
+        Complex amplitudes.
+
+    terms
+        For each active parameter type, ``(c, e)`` such that the derivative
+        of the model with respect to the parameter of oscillator ``k`` is
+        ``c[k] * tp[0] ** e * Z[:, k]``.
+    """
+    Z = np.exp(np.outer(tp[0], 2j * np.pi * theta[2 * m : 3 * m] - theta[3 * m :]))
+    # Amplitude derivatives are not computed as model / a, as bounded
+    # optimisers may set amplitudes to 0.
+    phase_factor = np.exp(1j * theta[m : 2 * m])
+    alpha = theta[:m] * phase_factor
+    all_terms = {
+        0: (phase_factor, 0),  # a
+        1: (1j * alpha, 0),  # φ
+        2: (2j * np.pi * alpha, 1),  # f
+        3: (-alpha, 1),  # η
+    }
+    return Z, alpha, [all_terms[i] for i in idx]
+
+
 def hess_1d(active: np.ndarray, *args: args_type) -> np.ndarray:
     """Hessian of cost function for 1D data.
 
@@ -502,24 +753,13 @@ def hess_1d(active: np.ndarray, *args: args_type) -> np.ndarray:
     # Non-trivially zero values of the second Hessian term:
     # (y - x)† ∂²x/∂θᵢ∂θⱼ
     diagonals = -2 * np.real(np.einsum("ji,j->i", d2.conj(), diff))
-    # Determine indices of elements withn non-trivially zero second Hessian term
-    # (specfically, those in upper triangle).
     p = len(idx)
-    hess_shape = (p * m, p * m)
-    hess = np.zeros(hess_shape)
-    diag_indices = _generate_diagonal_indices(p, m)
-    hess[diag_indices] = diagonals
-
-    main_diagonals = _diagonal_indices(hess_shape[0], k=0)
-    # Division by 2 to ensure elements on main diagonal aren't doubled
-    # after transposition
-    hess[main_diagonals] = hess[main_diagonals] / 2
-
-    # Transpose (hessian is symmetric)
-    hess += hess.T
 
-    # Add component containing first derivatives
-    hess += 2 * np.real(np.einsum("ki,kj->ij", d1.conj(), d1))
+    # Component containing first derivatives
+    hess = 2 * np.real(d1.conj().T @ d1)
+    # Add the (block-sparse) second derivative component
+    rows, cols, values = _second_derivative_term(diagonals, p, m)
+    hess[rows, cols] += values
 
     if phasevar:
         # If 0 in idx, phases will be between m and 2m, as amps
@@ -579,7 +819,9 @@ def obj_finite_diff_grad_hess_1d(
 
 
 def obj_grad_gauss_newton_hess_1d(
-    active: np.ndarray, *args: args_type
+    active: np.ndarray,
+    *args: args_type,
+    intermediates: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
 ) -> Tuple[float, np.ndarray, np.ndarray]:
     """Compute the objective, gradient and hessian for 1D data.
 
@@ -608,6 +850,10 @@ def obj_grad_gauss_newton_hess_1d(
         * **phase_variance:** If ``True``, include the oscillator phase
           variance to the cost function.
 
+    intermediates
+        The parameter vector, model per oscillator and residual, as returned
+        by :py:func:`_intermediates_1d`. If ``None``, these are computed.
+
     Returns
     -------
     obj: float
@@ -621,16 +867,9 @@ def obj_grad_gauss_newton_hess_1d(
     """
     data, tp, m, passive, idx, phasevar = args
 
-    # reconstruct correctly ordered parameter vector from
-    # active and passive parameters.
-    theta = _construct_parameters(active, passive, m, idx)
-
-    # N x M array comprising M N-length vectors.
-    # Each vector is the model produced by a single oscillator.
-    # Broadcasting of signal pole matrix and complex amplitude vector
-    model_per_osc = np.exp(
-        np.outer(tp[0], (1j * 2 * np.pi * theta[2 * m : 3 * m] - theta[3 * m :]))
-    ) * (theta[:m] * np.exp(1j * theta[m : 2 * m]))
+    if intermediates is None:
+        _, intermediates = _intermediates_1d(active, *args)
+    theta, model_per_osc, diff = intermediates
 
     deriv_functions = {
         "a": lambda x: x / theta[:m],
@@ -642,9 +881,6 @@ def obj_grad_gauss_newton_hess_1d(
     # Jacobian: -∂x/∂θᵢ
     jac = first_derivatives_1d(model_per_osc, idx, deriv_functions)
 
-    model = np.einsum("ij->i", model_per_osc)
-    diff = data - model
-
     # --- ℱ(θ) ---
     obj = np.real(diff.conj().T @ diff)
     # --- ∇ℱ(θ) ---
@@ -665,7 +901,92 @@ def obj_grad_gauss_newton_hess_1d(
     return obj, grad, hess
 
 
-def obj_grad_true_hess_1d(active: np.ndarray, *args):
+def obj_grad_gauss_newton_hessp_1d(
+    active: np.ndarray,
+    *args: args_type,
+    intermediates: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+) -> Tuple[float, np.ndarray, splinalg.LinearOperator]:
+    r"""Compute the objective, gradient and a matrix-free Gauss-Newton Hessian
+    for 1D data.
+
+    The Hessian is not formed. Instead, products with a vector
+    :math:`\boldsymbol{d}` are computed as
+    :math:`2 \Re(\boldsymbol{J}^{\mathrm{H}} (\boldsymbol{J} \boldsymbol{d}))`,
+    which costs :math:`\mathcal{O}(NM)` rather than the
+    :math:`\mathcal{O}(NM^2)` needed to form the Hessian.
+
+    Parameters
+    ----------
+    active
+        Array of active parameters (parameters to be optimised).
+
+    args : list_iterator
+        See :py:func:`obj_grad_gauss_newton_hess_1d`.
+
+    intermediates
+        The parameter vector, model per oscillator and residual, as returned
+        by :py:func:`_intermediates_1d`. If ``None``, these are computed.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    grad: numpy.ndarray
+        Gradient of the objective.
+
+    hess: scipy.sparse.linalg.LinearOperator
+        Operator representing the Gauss-Newton Hessian of the objective.
+    """
+    data, tp, m, passive, idx, phasevar = args
+
+    if intermediates is None:
+        _, intermediates = _intermediates_1d(active, *args)
+    theta, model_per_osc, diff = intermediates
+
+    deriv_functions = {
+        "a": lambda x: x / theta[:m],
+        "p": lambda x: 1j * x,
+        "f": lambda x: np.einsum("ij,i->ij", x, (1j * 2 * np.pi * tp[0])),
+        "d": lambda x: np.einsum("ij,i->ij", x, -tp[0])
+    }
+
+    # Jacobian: -∂x/∂θᵢ
+    jac = first_derivatives_1d(model_per_osc, idx, deriv_functions)
+
+    # --- ℱ(θ) ---
+    obj = np.real(diff.conj().T @ diff)
+    # --- ∇ℱ(θ) ---
+    grad = -2 * np.real(diff.conj().T @ jac)
+
+    # --- ∇²ℱ(θ) d ---
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        phases = theta[i * m : (i + 1) * m]
+        pv_obj, pv_grad, pv_hess = pv_obj_grad_hess(phases)
+        obj += pv_obj
+        grad[i * m : (i + 1) * m] += pv_grad
+
+    def hessp(d: np.ndarray) -> np.ndarray:
+        d = d.ravel()
+        # Re(Jᴴ x) = Re((xᴴ J)ᵀ), avoiding a conjugated copy of J
+        hd = 2 * np.real((jac @ d).conj() @ jac)
+        if phasevar:
+            hd[i * m : (i + 1) * m] += pv_hess @ d[i * m : (i + 1) * m]
+        return hd
+
+    hess = splinalg.LinearOperator(
+        (grad.size, grad.size), matvec=hessp, rmatvec=hessp, dtype="float64",
+    )
+
+    return obj, grad, hess
+
+
+def obj_grad_true_hess_1d(
+    active: np.ndarray,
+    *args: args_type,
+    intermediates: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+) -> Tuple[float, np.ndarray, np.ndarray]:
     """Compute the objective, gradient and hessian for 1D data.
 
     The Hessian is computed exactly.
@@ -693,6 +1014,10 @@ def obj_grad_true_hess_1d(active: np.ndarray, *args):
         * **phase_variance:** If ``True``, include the oscillator phase
           variance to the cost function.
 
+    intermediates
+        The parameter vector, model per oscillator and residual, as returned
+        by :py:func:`_intermediates_1d`. If ``None``, these are computed.
+
     Returns
     -------
     obj: float
@@ -706,16 +1031,9 @@ def obj_grad_true_hess_1d(active: np.ndarray, *args):
     """
     data, tp, m, passive, idx, phasevar = args
 
-    # reconstruct correctly ordered parameter vector from
-    # active and passive parameters.
-    theta = _construct_parameters(active, passive, m, idx)
-
-    # N x M array comprising M N-length vectors.
-    # Each vector is the model produced by a single oscillator.
-    # Broadcasting of signal pole matrix and complex amplitude vector
-    model_per_osc = np.exp(
-        np.outer(tp[0], (1j * 2 * np.pi * theta[2 * m : 3 * m] - theta[3 * m :]))
-    ) * (theta[:m] * np.exp(1j * theta[m : 2 * m]))
+    if intermediates is None:
+        _, intermediates = _intermediates_1d(active, *args)
+    theta, model_per_osc, diff = intermediates
 
     deriv_functions = {
         "a": lambda x: x / theta[:m],
@@ -730,9 +1048,6 @@ def obj_grad_true_hess_1d(active: np.ndarray, *args):
     # will always be zero.
     d2 = second_derivatives_1d(d1, idx, deriv_functions)
 
-    model = np.einsum("ij->i", model_per_osc)
-    diff = data - model
-
     # --- ℱ(θ) ---
     obj = np.real(diff.conj().T @ diff)
     # --- ∇ℱ(θ) ---
@@ -741,25 +1056,14 @@ def obj_grad_true_hess_1d(active: np.ndarray, *args):
     # Non-trivially zero values of the second Hessian term:
     # (y - x)† ∂²x/∂θᵢ∂θⱼ
     diagonals = -2 * np.real(np.einsum("ji,j->i", d2.conj(), diff))
-    # Determine indices of elements withn non-trivially zero second Hessian term
-    # (specfically, those in upper triangle).
     p = len(idx)
-    hess_shape = (p * m, p * m)
-    hess = np.zeros(hess_shape)
-    diag_indices = _generate_diagonal_indices(p, m)
-    hess[diag_indices] = diagonals
 
-    main_diagonals = _diagonal_indices(hess_shape[0], k=0)
-    # Division by 2 to ensure elements on main diagonal aren't doubled
-    # after transposition
-    hess[main_diagonals] = hess[main_diagonals] / 2
-
-    # Transpose (hessian is symmetric)
-    hess += hess.T
-
-    # Add component containing first derivatives
+    # Component containing first derivatives
     # ∂x†/∂θᵢ ∂x/∂θⱼ
-    hess += 2 * np.real(np.einsum("ki,kj->ij", d1.conj(), d1))
+    hess = 2 * np.real(d1.conj().T @ d1)
+    # Add the (block-sparse) second derivative component
+    rows, cols, values = _second_derivative_term(diagonals, p, m)
+    hess[rows, cols] += values
     if phasevar:
         # If 0 in idx, phases will be between m and 2m, as amps
         # also present if not, phases will be between 0 and m
@@ -1143,7 +1447,11 @@ def obj_2d(active: np.ndarray, *args: args_type) -> float:
     return obj
 
 
-def obj_grad_2d(active: np.ndarray, *args: args_type) -> Tuple[float, np.ndarray]:
+def obj_grad_2d(
+    active: np.ndarray,
+    *args: args_type,
+    memory_budget: Optional[float] = None,
+) -> Tuple[float, np.ndarray]:
     """Compute the objective and gradient for 2D data.
 
     Parameters
@@ -1169,6 +1477,12 @@ def obj_grad_2d(active: np.ndarray, *args: args_type) -> Tuple[float, np.ndarray
         * **phase_variance:** If ``True``, include the oscillator phase
           variance to the cost function.
 
+    memory_budget
+        The greatest size (GiB) permitted for the intermediate arrays of model
+        derivatives. If these would exceed ``memory_budget``, the quantities are
+        accumulated over tiles of the direct dimension (t2). If ``None``, the
+        whole signal is treated at once.
+
     Returns
     -------
     obj: float
@@ -1183,48 +1497,14 @@ def obj_grad_2d(active: np.ndarray, *args: args_type) -> Tuple[float, np.ndarray
     # active and passive parameters.
     theta = _construct_parameters(active, passive, m, idx)
 
-    model_per_osc = np.einsum(
-        "ik,kj->ijk",
-        # Y
-        np.exp(
-            np.outer(
-                tp[0],
-                2j * np.pi * theta[2 * m : 3 * m] - theta[4 * m : 5 * m]
-            ),
-        ),
-        np.einsum(
-            "ij,i->ij",
-            # Z
-            np.exp(
-                np.outer(
-                    2j * np.pi * theta[3 * m : 4 * m] - theta[5 * m : 6 * m],
-                    tp[1],
-                )
-            ),
-            # α
-            theta[:m] * np.exp(1j * theta[m : 2 * m])
-        ),
-    )
-
-    deriv_functions = {
-        "a": lambda x: x / theta[:m],
-        "p": lambda x: 1j * x,
-        "f1": lambda x: np.einsum("ijk,i->ijk", x, 2j * np.pi * tp[0]),
-        "f2": lambda x: np.einsum("ijk,j->ijk", x, 2j * np.pi * tp[1]),
-        "d1": lambda x: np.einsum("ijk,i->ijk", x, -tp[0]),
-        "d2": lambda x: np.einsum("ijk,j->ijk", x, -tp[1]),
-    }
-
-    d1 = first_derivatives_2d(model_per_osc, idx, deriv_functions)
-
-    model = np.einsum("ijk->ij", model_per_osc)
-    diff = data - model
-
-    # --- ℱ(θ) ---
-    # Tr(AB) = Σᵢⱼ aᵢⱼbⱼᵢ
-    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
-    # --- ∇ℱ(θ) ---
-    grad = -2 * np.real(np.einsum("ij,ijk->k", diff.conj(), d1))
+    obj = 0.
+    grad = np.zeros(len(idx) * m)
+    for diff, d1, _ in _tiles_2d(theta, data, tp, m, idx, memory_budget):
+        # --- ℱ(θ) ---
+        # Tr(AB) = Σᵢⱼ aᵢⱼbⱼᵢ
+        obj += np.real(np.einsum("ij,ij->", diff.conj(), diff))
+        # --- ∇ℱ(θ) ---
+        grad += -2 * np.real(np.einsum("ij,ijk->k", diff.conj(), d1))
 
     if phasevar:
         # If 0 in idx, phases will be between m and 2m, as amps
@@ -1238,7 +1518,11 @@ def obj_grad_2d(active: np.ndarray, *args: args_type) -> Tuple[float, np.ndarray
     return obj, grad
 
 
-def hess_2d(active: np.ndarray, *args: args_type) -> np.ndarray:
+def hess_2d(
+    active: np.ndarray,
+    *args: args_type,
+    memory_budget: Optional[float] = None,
+) -> np.ndarray:
     """Hessian of cost function for 2D data.
 
     Parameters
@@ -1264,6 +1548,12 @@ def hess_2d(active: np.ndarray, *args: args_type) -> np.ndarray:
         * **phase_variance:** If ``True``, include the oscillator phase
           variance to the cost function.
 
+    memory_budget
+        The greatest size (GiB) permitted for the intermediate arrays of model
+        derivatives. If these would exceed ``memory_budget``, the quantities are
+        accumulated over tiles of the direct dimension (t2). If ``None``, the
+        whole signal is treated at once.
+
     Returns
     -------
     hess
@@ -1275,60 +1565,23 @@ def hess_2d(active: np.ndarray, *args: args_type) -> np.ndarray:
     # active and passive parameters.
     theta = _construct_parameters(active, passive, m, idx)
 
-    model_per_osc = np.einsum(
-        "ik,kj->ijk",
-        # Y
-        np.exp(
-            np.outer(
-                tp[0],
-                2j * np.pi * theta[2 * m : 3 * m] - theta[4 * m : 5 * m]
-            ),
-        ),
-        np.einsum(
-            "ij,i->ij",
-            # Z
-            np.exp(
-                np.outer(
-                    2j * np.pi * theta[3 * m : 4 * m] - theta[5 * m : 6 * m],
-                    tp[1],
-                )
-            ),
-            # α
-            theta[:m] * np.exp(1j * theta[m : 2 * m])
-        ),
-    )
-
-    deriv_functions = {
-        "a": lambda x: x / theta[:m],
-        "p": lambda x: 1j * x,
-        "f1": lambda x: np.einsum("ijk,i->ijk", x, 2j * np.pi * tp[0]),
-        "f2": lambda x: np.einsum("ijk,j->ijk", x, 2j * np.pi * tp[1]),
-        "d1": lambda x: np.einsum("ijk,i->ijk", x, -tp[0]),
-        "d2": lambda x: np.einsum("ijk,j->ijk", x, -tp[1]),
-    }
-
-    d1 = first_derivatives_2d(model_per_osc, idx, deriv_functions)
-    d2 = second_derivatives_2d(d1, idx, deriv_functions)
-
-    diagonals = -2 * np.real(
-        np.einsum(
-            "ijk,ij->k",
-            d2.conj(),
-            data - np.einsum("ijk->ij", model_per_osc),
-        )
-    )
-
+    path = ["einsum_path", (0, 1)]
     p = len(idx)
     hess_shape = (p * m, p * m)
-    hess = np.zeros(hess_shape)
-    diag_indices = _generate_diagonal_indices(p, m)
-    hess[diag_indices] = diagonals
-    main_diag_indices = _diagonal_indices(hess_shape[0], k=0)
-    # Division by 2 to ensure elements on main diagonal aren't doubled
-    # after transposition.
-    hess[main_diag_indices] /= 2
-    hess += hess.T
-    hess += 2 * np.real(np.einsum("ijk,ijl->kl", d1.conj(), d1))
+    diagonals = np.zeros(m * (p * (p + 1) // 2))
+    gn_hess = np.zeros(hess_shape)
+    for diff, d1, d2 in _tiles_2d(
+        theta, data, tp, m, idx, memory_budget, second_derivatives=True,
+    ):
+        diagonals += -2 * np.real(np.einsum("ijk,ij->k", d2.conj(), diff))
+        gn_hess += 2 * np.real(
+            np.einsum("ijk,ijl->kl", d1.conj(), d1, optimize=path)
+        )
+
+    hess = gn_hess
+    # Add the (block-sparse) second derivative component
+    rows, cols, values = _second_derivative_term(diagonals, p, m)
+    hess[rows, cols] += values
 
     if phasevar:
         # If 0 in idx, phases will be between m and 2m, as amps
@@ -1388,7 +1641,9 @@ def obj_finite_diff_grad_hess_2d(
 
 
 def obj_grad_gauss_newton_hess_2d(
-    active: np.ndarray, *args: args_type
+    active: np.ndarray,
+    *args: args_type,
+    memory_budget: Optional[float] = None,
 ) -> Tuple[float, np.ndarray, np.ndarray]:
     """Compute the objective, gradient and hessian for 2D data.
 
@@ -1417,6 +1672,12 @@ def obj_grad_gauss_newton_hess_2d(
         * **phase_variance:** If ``True``, include the oscillator phase
           variance to the cost function.
 
+    memory_budget
+        The greatest size (GiB) permitted for the intermediate arrays of model
+        derivatives. If these would exceed ``memory_budget``, the quantities are
+        accumulated over tiles of the direct dimension (t2). If ``None``, the
+        whole signal is treated at once.
+
     Returns
     -------
     obj: float
@@ -1434,51 +1695,19 @@ def obj_grad_gauss_newton_hess_2d(
     # active and passive parameters.
     theta = _construct_parameters(active, passive, m, idx)
 
-    model_per_osc = np.einsum(
-        "ik,kj->ijk",
-        # Y
-        np.exp(
-            np.outer(
-                tp[0],
-                2j * np.pi * theta[2 * m : 3 * m] - theta[4 * m : 5 * m]
-            ),
-        ),
-        np.einsum(
-            "ij,i->ij",
-            # Z
-            np.exp(
-                np.outer(
-                    2j * np.pi * theta[3 * m : 4 * m] - theta[5 * m : 6 * m],
-                    tp[1],
-                )
-            ),
-            # α
-            theta[:m] * np.exp(1j * theta[m : 2 * m])
-        ),
-    )
-
-    deriv_functions = {
-        "a": lambda x: x / theta[:m],
-        "p": lambda x: 1j * x,
-        "f1": lambda x: np.einsum("ijk,i->ijk", x, 2j * np.pi * tp[0]),
-        "f2": lambda x: np.einsum("ijk,j->ijk", x, 2j * np.pi * tp[1]),
-        "d1": lambda x: np.einsum("ijk,i->ijk", x, -tp[0]),
-        "d2": lambda x: np.einsum("ijk,j->ijk", x, -tp[1]),
-    }
-
-    d1 = first_derivatives_2d(model_per_osc, idx, deriv_functions)
-
-    model = np.einsum("ijk->ij", model_per_osc)
-    diff = data - model
-
     path = ["einsum_path", (0, 1)]
-    # --- ℱ(θ) ---
-    # Tr(AB) = Σᵢⱼ aᵢⱼbⱼᵢ
-    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
-    # --- ∇ℱ(θ) ---
-    grad = -2 * np.real(np.einsum("ij,ijk->k", diff.conj(), d1, optimize=path))
-    # --- ∇²ℱ(θ) ---
-    hess = 2 * np.real(np.einsum("ijk,ijl->kl", d1.conj(), d1, optimize=path))
+    p = len(idx)
+    obj = 0.
+    grad = np.zeros(p * m)
+    hess = np.zeros((p * m, p * m))
+    for diff, d1, _ in _tiles_2d(theta, data, tp, m, idx, memory_budget):
+        # --- ℱ(θ) ---
+        # Tr(AB) = Σᵢⱼ aᵢⱼbⱼᵢ
+        obj += np.real(np.einsum("ij,ij->", diff.conj(), diff))
+        # --- ∇ℱ(θ) ---
+        grad += -2 * np.real(np.einsum("ij,ijk->k", diff.conj(), d1, optimize=path))
+        # --- ∇²ℱ(θ) ---
+        hess += 2 * np.real(np.einsum("ijk,ijl->kl", d1.conj(), d1, optimize=path))
 
     if phasevar:
         # If 0 in idx, phases will be between m and 2m, as amps
@@ -1493,7 +1722,11 @@ def obj_grad_gauss_newton_hess_2d(
     return obj, grad, hess
 
 
-def obj_grad_true_hess_2d(active: np.ndarray, *args):
+def obj_grad_true_hess_2d(
+    active: np.ndarray,
+    *args: args_type,
+    memory_budget: Optional[float] = None,
+) -> Tuple[float, np.ndarray, np.ndarray]:
     """Compute the objective, gradient and hessian for 2D data.
 
     The Hessian is computed exactly.
@@ -1521,6 +1754,12 @@ def obj_grad_true_hess_2d(active: np.ndarray, *args):
         * **phase_variance:** If ``True``, include the oscillator phase
           variance to the cost function.
 
+    memory_budget
+        The greatest size (GiB) permitted for the intermediate arrays of model
+        derivatives. If these would exceed ``memory_budget``, the quantities are
+        accumulated over tiles of the direct dimension (t2). If ``None``, the
+        whole signal is treated at once.
+
     Returns
     -------
     obj: float
@@ -1538,67 +1777,161 @@ def obj_grad_true_hess_2d(active: np.ndarray, *args):
     # active and passive parameters.
     theta = _construct_parameters(active, passive, m, idx)
 
-    model_per_osc = np.einsum(
-        "ik,kj->ijk",
-        # Y
-        np.exp(
-            np.outer(
-                tp[0],
-                2j * np.pi * theta[2 * m : 3 * m] - theta[4 * m : 5 * m]
-            ),
-        ),
-        np.einsum(
-            "ij,i->ij",
-            # Z
-            np.exp(
-                np.outer(
-                    2j * np.pi * theta[3 * m : 4 * m] - theta[5 * m : 6 * m],
-                    tp[1],
-                )
-            ),
-            # α
-            theta[:m] * np.exp(1j * theta[m : 2 * m])
-        ),
-    )
+    path = ["einsum_path", (0, 1)]
+    p = len(idx)
+    hess_shape = (p * m, p * m)
+    obj = 0.
+    grad = np.zeros(p * m)
+    diagonals = np.zeros(m * (p * (p + 1) // 2))
+    gn_hess = np.zeros(hess_shape)
+    for diff, d1, d2 in _tiles_2d(
+        theta, data, tp, m, idx, memory_budget, second_derivatives=True,
+    ):
+        # --- ℱ(θ) ---
+        # Tr(AB) = Σᵢⱼ aᵢⱼbⱼᵢ
+        obj += np.real(np.einsum("ij,ij->", diff.conj(), diff))
+        # --- ∇ℱ(θ) ---
+        grad += -2 * np.real(np.einsum("ij,ijk->k", diff.conj(), d1, optimize=path))
+        # --- ∇²ℱ(θ) ---
+        diagonals += -2 * np.real(np.einsum("ijk,ij->k", d2.conj(), diff))
+        gn_hess += 2 * np.real(
+            np.einsum("ijk,ijl->kl", d1.conj(), d1, optimize=path)
+        )
 
-    deriv_functions = {
-        "a": lambda x: x / theta[:m],
-        "p": lambda x: 1j * x,
-        "f1": lambda x: np.einsum("ijk,i->ijk", x, 2j * np.pi * tp[0]),
-        "f2": lambda x: np.einsum("ijk,j->ijk", x, 2j * np.pi * tp[1]),
-        "d1": lambda x: np.einsum("ijk,i->ijk", x, -tp[0]),
-        "d2": lambda x: np.einsum("ijk,j->ijk", x, -tp[1]),
-    }
+    hess = gn_hess
+    # Add the (block-sparse) second derivative component
+    rows, cols, values = _second_derivative_term(diagonals, p, m)
+    hess[rows, cols] += values
 
-    d1 = first_derivatives_2d(model_per_osc, idx, deriv_functions)
-    d2 = second_derivatives_2d(d1, idx, deriv_functions)
+    if phasevar:
+        # If 0 in idx, phases will be between m and 2m, as amps
+        # also present if not, phases will be between 0 and m
+        i = 1 if 0 in idx else 0
+        phases = theta[i * m : (i + 1) * m]
+        pv_obj, pv_grad, pv_hess = pv_obj_grad_hess(phases)
+        obj += pv_obj
+        grad[i * m : (i + 1) * m] += pv_grad
+        hess[i * m : (i + 1) * m, i * m : (i + 1) * m] += pv_hess
 
-    model = np.einsum("ijk->ij", model_per_osc)
-    diff = data - model
+    return obj, grad, hess
+
+
+def obj_grad_separable_2d(
+    active: np.ndarray, *args: args_type, intermediates: Optional[tuple] = None,
+) -> Tuple[float, np.ndarray]:
+    r"""Compute the objective and gradient for 2D data, exploiting separability.
+
+    Equivalent to :py:func:`obj_grad_2d`, but each oscillator's contribution to
+    the model, and its derivatives, are treated as outer products of a t1
+    vector and a t2 vector. The ``(N1, N2, M)`` arrays of
+    :py:func:`obj_grad_2d` are never formed, and the cost is
+    :math:`\mathcal{O}(N_1 N_2 M)`.
+
+    Parameters
+    ----------
+    active
+        Array of active parameters (parameters to be optimised).
+
+    args : list_iterator
+        See :py:func:`obj_grad_2d`.
+
+    intermediates
+        As returned by :py:func:`_intermediates_separable_2d`. If ``None``,
+        these are computed.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    grad: numpy.ndarray
+        Gradient of the objective.
+    """
+    data, tp, m, passive, idx, phasevar = args
+    if intermediates is None:
+        _, intermediates = _intermediates_separable_2d(active, *args)
+    theta, Z1s, Z2s, alpha, terms, diff = intermediates
 
-    path = ["einsum_path", (0, 1)]
     # --- ℱ(θ) ---
-    # Tr(AB) = Σᵢⱼ aᵢⱼbⱼᵢ
     obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
     # --- ∇ℱ(θ) ---
-    grad = -2 * np.real(np.einsum("ij,ijk->k", diff.conj(), d1, optimize=path))
+    # Σᵢⱼ conj(Dᵢⱼ) u_i v_j = uᵀ conj(D) v
+    grad = _separable_grad_2d(diff, Z1s, Z2s, terms)
+
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        phases = theta[i * m : (i + 1) * m]
+        pv_obj, pv_grad = pv_obj_grad(phases)
+        obj += pv_obj
+        grad[i * m : (i + 1) * m] += pv_grad
+
+    return obj, grad
+
+
+def obj_grad_gauss_newton_hess_separable_2d(
+    active: np.ndarray, *args: args_type, intermediates: Optional[tuple] = None,
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    r"""Compute the objective, gradient and Gauss-Newton Hessian for 2D data,
+    exploiting separability.
+
+    Equivalent to :py:func:`obj_grad_gauss_newton_hess_2d`. As the derivative
+    of the model with respect to any parameter of oscillator :math:`k` is the
+    outer product :math:`c_k \boldsymbol{u}_k \boldsymbol{v}_k^{\mathrm{T}}`,
+    each block of :math:`\boldsymbol{J}^{\mathrm{H}} \boldsymbol{J}` is the
+    elementwise product of an :math:`M \times M` t1 Gram matrix and an
+    :math:`M \times M` t2 Gram matrix. The cost is
+    :math:`\mathcal{O}((N_1 + N_2) M^2 + N_1 N_2 M)`, rather than
+    :math:`\mathcal{O}(N_1 N_2 M^2)`.
+
+    Parameters
+    ----------
+    active
+        Array of active parameters (parameters to be optimised).
+
+    args : list_iterator
+        See :py:func:`obj_grad_gauss_newton_hess_2d`.
+
+    intermediates
+        As returned by :py:func:`_intermediates_separable_2d`. If ``None``,
+        these are computed.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    grad: numpy.ndarray
+        Gradient of the objective.
+
+    hess: numpy.ndarray
+        Gauss-Newton Hessian of the objective.
+    """
+    data, tp, m, passive, idx, phasevar = args
+    if intermediates is None:
+        _, intermediates = _intermediates_separable_2d(active, *args)
+    theta, Z1s, Z2s, alpha, terms, diff = intermediates
+
+    # --- ℱ(θ) ---
+    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
+    # --- ∇ℱ(θ) ---
+    grad = _separable_grad_2d(diff, Z1s, Z2s, terms)
     # --- ∇²ℱ(θ) ---
-    diagonals = -2 * np.real(np.einsum("ijk,ij->k", d2.conj(), diff))
-    p = len(idx)
-    hess_shape = (p * m, p * m)
-    hess = np.zeros(hess_shape)
-    diag_indices = _generate_diagonal_indices(p, m)
-    hess[diag_indices] = diagonals
-    main_diag_indices = _diagonal_indices(hess_shape[0], k=0)
-    # Division by 2 to ensure elements on main diagonal aren't doubled
-    # after transposition.
-    hess[main_diag_indices] /= 2
-    hess += hess.T
-    hess += 2 * np.real(np.einsum("ijk,ijl->kl", d1.conj(), d1, optimize=path))
+    # Gram matrices (Tᵉ Z)ᴴ (Tᶠ Z) for each pair of powers of t1 and t2.
+    G1 = {(e, f): Z1s[e].conj().T @ Z1s[f] for e in (0, 1) for f in (0, 1)}
+    G2 = {(e, f): Z2s[e].conj().T @ Z2s[f] for e in (0, 1) for f in (0, 1)}
+    hess = np.block(
+        [
+            [
+                2 * np.real(
+                    np.outer(cq.conj(), cr) * G1[(e1q, e1r)] * G2[(e2q, e2r)]
+                )
+                for cr, e1r, e2r in terms
+            ]
+            for cq, e1q, e2q in terms
+        ]
+    )
 
     if phasevar:
-        # If 0 in idx, phases will be between m and 2m, as amps
-        # also present if not, phases will be between 0 and m
         i = 1 if 0 in idx else 0
         phases = theta[i * m : (i + 1) * m]
         pv_obj, pv_grad, pv_hess = pv_obj_grad_hess(phases)
@@ -1609,6 +1942,623 @@ def obj_grad_true_hess_2d(active: np.ndarray, *args):
     return obj, grad, hess
 
 
+def obj_grad_gauss_newton_hessp_separable_2d(
+    active: np.ndarray, *args: args_type, intermediates: Optional[tuple] = None,
+) -> Tuple[float, np.ndarray, splinalg.LinearOperator]:
+    r"""Compute the objective, gradient and a matrix-free Gauss-Newton Hessian
+    for 2D data.
+
+    The Hessian is not formed. The product :math:`\boldsymbol{J}
+    \boldsymbol{d}` is a sum of terms :math:`\boldsymbol{Z}_1 \mathrm{diag}
+    (\boldsymbol{w}) \boldsymbol{Z}_2^{\mathrm{T}}`, and
+    :math:`\boldsymbol{J}^{\mathrm{H}}` is applied to this in the same way as
+    the residual is in :py:func:`obj_grad_separable_2d`. Each product costs
+    :math:`\mathcal{O}(N_1 N_2 M)`.
+
+    Parameters
+    ----------
+    active
+        Array of active parameters (parameters to be optimised).
+
+    args : list_iterator
+        See :py:func:`obj_grad_gauss_newton_hess_2d`.
+
+    intermediates
+        As returned by :py:func:`_intermediates_separable_2d`. If ``None``,
+        these are computed.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    grad: numpy.ndarray
+        Gradient of the objective.
+
+    hess: scipy.sparse.linalg.LinearOperator
+        Operator representing the Gauss-Newton Hessian of the objective.
+    """
+    data, tp, m, passive, idx, phasevar = args
+    if intermediates is None:
+        _, intermediates = _intermediates_separable_2d(active, *args)
+    theta, Z1s, Z2s, alpha, terms, diff = intermediates
+
+    # --- ℱ(θ) ---
+    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
+    # --- ∇ℱ(θ) ---
+    grad = _separable_grad_2d(diff, Z1s, Z2s, terms)
+
+    # --- ∇²ℱ(θ) d ---
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        phases = theta[i * m : (i + 1) * m]
+        pv_obj, pv_grad, pv_hess = pv_obj_grad_hess(phases)
+        obj += pv_obj
+        grad[i * m : (i + 1) * m] += pv_grad
+
+    def hessp(d: np.ndarray) -> np.ndarray:
+        d = d.ravel()
+        # J d = Σ Tᵉ¹ Z1 diag(w) (Tᵉ² Z2)ᵀ, grouping terms by powers of t.
+        weights = {}
+        for q, (c, e1, e2) in enumerate(terms):
+            w = c * d[q * m : (q + 1) * m]
+            weights[(e1, e2)] = weights.get((e1, e2), 0) + w
+        jd = sum(
+            (Z1s[e1] * w) @ Z2s[e2].T for (e1, e2), w in weights.items()
+        )
+        # 2 Re(Jᴴ J d)
+        hd = -_separable_grad_2d(jd, Z1s, Z2s, terms)
+        if phasevar:
+            hd[i * m : (i + 1) * m] += pv_hess @ d[i * m : (i + 1) * m]
+        return hd
+
+    hess = splinalg.LinearOperator(
+        (grad.size, grad.size), matvec=hessp, rmatvec=hessp, dtype="float64",
+    )
+
+    return obj, grad, hess
+
+
+def gauss_newton_diagonal(active: np.ndarray, *args: args_type) -> np.ndarray:
+    """Compute the diagonal of the Gauss-Newton Hessian, for 1D or 2D data.
+
+    See :py:func:`gauss_newton_blocks`.
+
+    Parameters
+    ----------
+    active
+        Array of active parameters (parameters to be optimised).
+
+    args : list_iterator
+        See :py:func:`obj_grad_gauss_newton_hess_1d`.
+
+    Returns
+    -------
+    diag: numpy.ndarray
+        Diagonal of the Gauss-Newton Hessian.
+    """
+    blocks = gauss_newton_blocks(active, *args)
+    return np.einsum("kii->ki", blocks).ravel(order="F")
+
+
+def gauss_newton_blocks(active: np.ndarray, *args: args_type) -> np.ndarray:
+    r"""Compute the diagonal blocks of the Gauss-Newton Hessian associated with
+    each oscillator, for 1D or 2D data.
+
+    As the derivative of the model with respect to each parameter is a scaled
+    (outer product of) signal pole vector(s), the element of the block of
+    oscillator :math:`k` for parameters :math:`q` and :math:`r` is
+    :math:`2 \Re\left(c_{qk}^* c_{rk} \sum_n t_n^{e_q + e_r} \lvert Z_{nk}
+    \rvert^2\right)` (with a product of such sums over t1 and t2 for 2D data).
+    Neither the Jacobian nor the Hessian is formed. The phase variance is not
+    considered.
+
+    Parameters
+    ----------
+    active
+        Array of active parameters (parameters to be optimised).
+
+    args : list_iterator
+        See :py:func:`obj_grad_gauss_newton_hess_1d`.
+
+    Returns
+    -------
+    blocks: numpy.ndarray
+        Array of shape ``(M, p, p)``, where ``p`` is the number of active
+        parameter types.
+    """
+    data, tp, m, passive, idx, _ = args
+    theta = _construct_parameters(active, passive, m, idx)
+
+    if len(tp) == 1:
+        Z, _, terms = _terms_1d(theta, tp, m, idx)
+        # Σₙ tₙᵉ |Zₙₖ|²
+        S = [(tp[0] ** e) @ (np.abs(Z) ** 2) for e in (0, 1, 2)]
+        sums = [[S[eq + er] for _, er in terms] for _, eq in terms]
+        coefficients = [c for c, _ in terms]
+    else:
+        Z1s, Z2s, _, terms = _separable_terms_2d(theta, tp, m, idx)
+        absZ1, absZ2 = np.abs(Z1s[0]) ** 2, np.abs(Z2s[0]) ** 2
+        S1 = [(tp[0] ** e) @ absZ1 for e in (0, 1, 2)]
+        S2 = [(tp[1] ** e) @ absZ2 for e in (0, 1, 2)]
+        sums = [
+            [S1[e1q + e1r] * S2[e2q + e2r] for _, e1r, e2r in terms]
+            for _, e1q, e2q in terms
+        ]
+        coefficients = [c for c, _, _ in terms]
+
+    C = np.array(coefficients).T
+    return 2 * np.real(
+        np.einsum("kq,kr,qrk->kqr", C.conj(), C, np.array(sums))
+    )
+
+
+def _intermediates_separable_2d(
+    active: np.ndarray, *args: args_type,
+) -> Tuple[float, tuple]:
+    """Compute the objective for 2D data, along with intermediates which are
+    shared with the separable gradient and Hessian.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    intermediates: tuple
+        The full parameter vector, the outputs of :py:func:`_separable_terms_2d`,
+        and the residual.
+    """
+    data, tp, m, passive, idx, phasevar = args
+    theta = _construct_parameters(active, passive, m, idx)
+    Z1s, Z2s, alpha, terms = _separable_terms_2d(theta, tp, m, idx)
+
+    diff = data - (Z1s[0] * alpha) @ Z2s[0].T
+    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
+
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        obj += pv_obj(theta[i * m : (i + 1) * m])
+
+    return obj, (theta, Z1s, Z2s, alpha, terms, diff)
+
+
+def _purge_intermediates_separable_2d(
+    intermediates: tuple,
+    osc_idx: Iterable[int],
+    active: np.ndarray,
+    *args: args_type,
+) -> Tuple[float, tuple]:
+    """Update the output of :py:func:`_intermediates_separable_2d` after removing
+    oscillators.
+
+    See :py:func:`_purge_intermediates_1d`.
+    """
+    data, tp, m, passive, idx, phasevar = args
+    _, Z1s, Z2s, alpha, terms, diff = intermediates
+    theta = _construct_parameters(active, passive, m, idx)
+
+    diff = diff + (Z1s[0][:, osc_idx] * alpha[osc_idx]) @ Z2s[0][:, osc_idx].T
+    Z1s = tuple(np.delete(Z, osc_idx, axis=1) for Z in Z1s)
+    Z2s = tuple(np.delete(Z, osc_idx, axis=1) for Z in Z2s)
+    alpha = np.delete(alpha, osc_idx)
+    terms = [(np.delete(c, osc_idx), e1, e2) for c, e1, e2 in terms]
+    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
+
+    if phasevar:
+        i = 1 if 0 in idx else 0
+        obj += pv_obj(theta[i * m : (i + 1) * m])
+
+    return obj, (theta, Z1s, Z2s, alpha, terms, diff)
+
+
+def _obj_no_intermediates_2d(
+    active: np.ndarray, *args: args_type,
+) -> Tuple[float, None]:
+    return obj_2d(active, *args), None
+
+
+def _separable_terms_2d(
+    theta: np.ndarray, tp: Iterable[np.ndarray], m: int, idx: list,
+) -> Tuple[
+    Tuple[np.ndarray, np.ndarray],
+    Tuple[np.ndarray, np.ndarray],
+    np.ndarray,
+    Iterable[Tuple[np.ndarray, int, int]],
+]:
+    """Factors of the separable 2D model and its first derivatives.
+
+    Returns
+    -------
+    Z1s
+        ``(Z1, T1 Z1)``, where ``Z1`` is the ``(N1, M)`` t1 signal pole matrix,
+        and ``T1`` is a diagonal matrix of t1 timepoints.
+
+    Z2s
+        ``(Z2, T2 Z2)``, defined analogously for t2.
+
+    alpha
+        Complex amplitudes.
+
+    terms
+        For each active parameter type, ``(c, e1, e2)`` such that the derivative
+        of the model with respect to the parameter of oscillator ``k`` is
+        ``c[k] * outer(Z1s[e1][:, k], Z2s[e2][:, k])``.
+    """
+    Z1 = np.exp(
+        np.outer(tp[0], 2j * np.pi * theta[2 * m : 3 * m] - theta[4 * m : 5 * m])
+    )
+    Z2 = np.exp(
+        np.outer(tp[1], 2j * np.pi * theta[3 * m : 4 * m] - theta[5 * m : 6 * m])
+    )
+    phase_factor = np.exp(1j * theta[m : 2 * m])
+    alpha = theta[:m] * phase_factor
+    all_terms = {
+        0: (phase_factor, 0, 0),  # a
+        1: (1j * alpha, 0, 0),  # φ
+        2: (2j * np.pi * alpha, 1, 0),  # f1
+        3: (2j * np.pi * alpha, 0, 1),  # f2
+        4: (-alpha, 1, 0),  # η1
+        5: (-alpha, 0, 1),  # η2
+    }
+    return (
+        (Z1, tp[0][:, None] * Z1),
+        (Z2, tp[1][:, None] * Z2),
+        alpha,
+        [all_terms[i] for i in idx],
+    )
+
+
+def _separable_grad_2d(
+    diff: np.ndarray,
+    Z1s: Tuple[np.ndarray, np.ndarray],
+    Z2s: Tuple[np.ndarray, np.ndarray],
+    terms: Iterable[Tuple[np.ndarray, int, int]],
+) -> np.ndarray:
+    # conj(D) (Tᵉ Z2): (N1, M)
+    W = [diff.conj() @ Z2 for Z2 in Z2s]
+    return np.hstack(
+        [
+            -2 * np.real(c * np.einsum("ik,ik->k", Z1s[e1], W[e2]))
+            for c, e1, e2 in terms
+        ]
+    )
+
+
+def _tiles_2d(
+    theta: np.ndarray,
+    data: np.ndarray,
+    tp: Iterable[np.ndarray],
+    m: int,
+    idx: list,
+    memory_budget: Optional[float],
+    second_derivatives: bool = False,
+) -> Iterable[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+    """Generate residuals and model derivatives over tiles of the t2 axis.
+
+    Yields ``(diff, d1, d2)`` for each tile, where ``diff`` is the
+    ``(N1, n2)`` residual, ``d1`` the ``(N1, n2, p * M)`` first derivatives, and
+    ``d2`` the second derivatives (``None`` unless ``second_derivatives`` is
+    ``True``). The number of t2 points ``n2`` in each tile is chosen such that
+    these arrays fit in ``memory_budget`` GiB. If ``memory_budget`` is ``None``,
+    a single tile covering the whole signal is generated.
+    """
+    n1, n2 = data.shape
+    p = len(idx)
+    # Number of (N1, n2, M) complex arrays alive at once: the model per
+    # oscillator, the first derivatives, (second derivatives), and a
+    # temporary created when evaluating derivatives.
+    nterms = 2 + p + (p * (p + 1) // 2 if second_derivatives else 0)
+    if memory_budget is None:
+        width = n2
+    else:
+        bytes_per_point = 16 * n1 * m * nterms
+        width = max(1, min(n2, int(memory_budget * (2 ** 30) // bytes_per_point)))
+
+    # Y
+    Y = np.exp(
+        np.outer(
+            tp[0],
+            2j * np.pi * theta[2 * m : 3 * m] - theta[4 * m : 5 * m]
+        ),
+    )
+    # α
+    alpha = theta[:m] * np.exp(1j * theta[m : 2 * m])
+
+    for start in range(0, n2, width):
+        tile = slice(start, start + width)
+        tp2 = tp[1][tile]
+        model_per_osc = np.einsum(
+            "ik,kj->ijk",
+            Y,
+            np.einsum(
+                "ij,i->ij",
+                # Z
+                np.exp(
+                    np.outer(
+                        2j * np.pi * theta[3 * m : 4 * m] - theta[5 * m : 6 * m],
+                        tp2,
+                    )
+                ),
+                alpha,
+            ),
+        )
+
+        deriv_functions = {
+            "a": lambda x: x / theta[:m],
+            "p": lambda x: 1j * x,
+            "f1": lambda x: np.einsum("ijk,i->ijk", x, 2j * np.pi * tp[0]),
+            "f2": lambda x: np.einsum("ijk,j->ijk", x, 2j * np.pi * tp2),
+            "d1": lambda x: np.einsum("ijk,i->ijk", x, -tp[0]),
+            "d2": lambda x: np.einsum("ijk,j->ijk", x, -tp2),
+        }
+
+        d1 = first_derivatives_2d(model_per_osc, idx, deriv_functions)
+        d2 = (
+            second_derivatives_2d(d1, idx, deriv_functions)
+            if second_derivatives else None
+        )
+        diff = data[:, tile] - np.einsum("ijk->ij", model_per_osc)
+        yield diff, d1, d2
+
+
+def varpro_full_active(active: np.ndarray, *args: args_type) -> np.ndarray:
+    """Prepend the least-squares amplitudes and phases to a vector of active
+    nonlinear parameters, as optimised with variable projection.
+
+    Parameters
+    ----------
+    active
+        Array of active nonlinear parameters.
+
+    args
+        See :py:func:`obj_grad_varpro_hess_1d`.
+
+    Returns
+    -------
+    full_active: numpy.ndarray
+        Amplitudes, phases and ``active``, concatenated.
+    """
+    intermediates_fun = (
+        _intermediates_varpro_1d if len(args[1]) == 1 else _intermediates_varpro_2d
+    )
+    m = args[2]
+    theta = intermediates_fun(active, *args)[1][0]
+    return np.hstack((theta[: 2 * m], active))
+
+
+def _intermediates_varpro_1d(
+    active: np.ndarray, *args: args_type,
+) -> Tuple[float, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Compute the variable projection objective for 1D data, along with
+    intermediates in the form returned by :py:func:`_intermediates_1d`.
+
+    The complex amplitudes are determined by linear least squares, given the
+    frequencies and damping factors.
+    """
+    data, tp, m, passive, idx, _ = args
+    nonlinear = _construct_parameters(active, passive, m, [i - 2 for i in idx])
+
+    Z = np.exp(np.outer(tp[0], 2j * np.pi * nonlinear[:m] - nonlinear[m:]))
+    alpha = np.linalg.lstsq(Z, data, rcond=None)[0]
+    theta = np.hstack((np.abs(alpha), np.angle(alpha), nonlinear))
+
+    model_per_osc = Z * alpha
+    diff = data - np.einsum("ij->i", model_per_osc)
+    obj = np.real(diff.conj().T @ diff)
+
+    return obj, (theta, model_per_osc, diff)
+
+
+def _intermediates_varpro_2d(
+    active: np.ndarray, *args: args_type,
+) -> Tuple[float, tuple]:
+    """Compute the variable projection objective for 2D data, along with
+    intermediates in the form returned by :py:func:`_intermediates_separable_2d`.
+
+    The complex amplitudes are determined by solving the normal equations. The
+    Gram matrix of the model basis is the elementwise product of the t1 and t2
+    Gram matrices.
+    """
+    data, tp, m, passive, idx, _ = args
+    nonlinear = _construct_parameters(active, passive, m, [i - 2 for i in idx])
+
+    Z1 = np.exp(np.outer(tp[0], 2j * np.pi * nonlinear[:m] - nonlinear[2 * m : 3 * m]))
+    Z2 = np.exp(np.outer(tp[1], 2j * np.pi * nonlinear[m : 2 * m] - nonlinear[3 * m :]))
+    gram = (Z1.conj().T @ Z1) * (Z2.conj().T @ Z2)
+    proj = np.einsum("ik,ik->k", Z1.conj(), data @ Z2.conj())
+    alpha = np.linalg.lstsq(gram, proj, rcond=None)[0]
+    theta = np.hstack((np.abs(alpha), np.angle(alpha), nonlinear))
+
+    Z1s, Z2s, alpha, terms = _separable_terms_2d(theta, tp, m, [0, 1] + list(idx))
+    diff = data - (Z1s[0] * alpha) @ Z2s[0].T
+    obj = np.real(np.einsum("ij,ij->", diff.conj(), diff))
+
+    return obj, (theta, Z1s, Z2s, alpha, terms, diff)
+
+
+def obj_grad_varpro_hess_1d(
+    active: np.ndarray,
+    *args: args_type,
+    intermediates: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+    hessian: str = "gauss-newton",
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    r"""Compute the variable projection objective, gradient and Hessian for 1D
+    data.
+
+    Only frequencies and damping factors are optimised. The complex amplitudes
+    :math:`\boldsymbol{\alpha}` are eliminated by linear least squares, such
+    that the objective is :math:`\lVert \boldsymbol{y} - \boldsymbol{Z}
+    \boldsymbol{\alpha}^*\rVert^2`. The gradient is the nonlinear component of
+    the gradient of the full objective at :math:`\boldsymbol{\alpha}^*`, and
+    the Hessian is the Schur complement of the amplitude and phase block of
+    the full Hessian (see :py:func:`_eliminate_linear_parameters`).
+
+    Parameters
+    ----------
+    active
+        Array of active nonlinear parameters.
+
+    args : list_iterator
+        As for :py:func:`obj_grad_gauss_newton_hess_1d`. **passive** contains
+        only passive nonlinear parameters, and **idx** only the indices of the
+        active nonlinear parameters (``2`` and/or ``3``). **phase_variance**
+        is ignored.
+
+    intermediates
+        As returned by :py:func:`_intermediates_varpro_1d`. If ``None``, these
+        are computed.
+
+    hessian
+        ``"gauss-newton"`` or ``"exact"``. The full Hessian from which the
+        reduced Hessian is derived.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    grad: numpy.ndarray
+        Gradient of the objective.
+
+    hess: numpy.ndarray
+        Hessian of the objective.
+    """
+    data, tp, m, passive, idx, _ = args
+    if intermediates is None:
+        _, intermediates = _intermediates_varpro_1d(active, *args)
+    theta = intermediates[0]
+
+    fun = (
+        obj_grad_true_hess_1d if hessian == "exact"
+        else obj_grad_gauss_newton_hess_1d
+    )
+    obj, grad, hess = fun(
+        np.hstack((theta[: 2 * m], active)),
+        data, tp, m, passive, [0, 1] + list(idx), False,
+        intermediates=intermediates,
+    )
+
+    return (obj, *_eliminate_linear_parameters(grad, hess, m))
+
+
+def obj_grad_varpro_hess_2d(
+    active: np.ndarray,
+    *args: args_type,
+    intermediates: Optional[tuple] = None,
+    hessian: str = "gauss-newton",
+    memory_budget: Optional[float] = None,
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """Compute the variable projection objective, gradient and Hessian for 2D
+    data.
+
+    See :py:func:`obj_grad_varpro_hess_1d`.
+
+    Parameters
+    ----------
+    active
+        Array of active nonlinear parameters.
+
+    args : list_iterator
+        See :py:func:`obj_grad_varpro_hess_1d`.
+
+    intermediates
+        As returned by :py:func:`_intermediates_varpro_2d`. If ``None``, these
+        are computed.
+
+    hessian
+        ``"gauss-newton"`` or ``"exact"``. The full Hessian from which the
+        reduced Hessian is derived.
+
+    memory_budget
+        See :py:func:`obj_grad_true_hess_2d`. Only used if ``hessian`` is
+        ``"exact"``.
+
+    Returns
+    -------
+    obj: float
+        Value of the objective.
+
+    grad: numpy.ndarray
+        Gradient of the objective.
+
+    hess: numpy.ndarray
+        Hessian of the objective.
+    """
+    data, tp, m, passive, idx, _ = args
+    if intermediates is None:
+        _, intermediates = _intermediates_varpro_2d(active, *args)
+    theta = intermediates[0]
+
+    full_active = np.hstack((theta[: 2 * m], active))
+    full_args = (data, tp, m, passive, [0, 1] + list(idx), False)
+    if hessian == "exact":
+        obj, grad, hess = obj_grad_true_hess_2d(
+            full_active, *full_args, memory_budget=memory_budget,
+        )
+    else:
+        obj, grad, hess = obj_grad_gauss_newton_hess_separable_2d(
+            full_active, *full_args, intermediates=intermediates,
+        )
+
+    return (obj, *_eliminate_linear_parameters(grad, hess, m))
+
+
+def _eliminate_linear_parameters(
+    grad: np.ndarray, hess: np.ndarray, m: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    r"""Reduce the gradient and Hessian with respect to amplitudes, phases and
+    nonlinear parameters to the nonlinear parameters alone.
+
+    With the amplitudes and phases at their least-squares values, their
+    gradient is zero, and the Hessian of the projected objective is the Schur
+    complement
+
+    .. math::
+
+        \boldsymbol{H}_{\mathrm{NN}} - \boldsymbol{H}_{\mathrm{NL}}
+        \boldsymbol{H}_{\mathrm{LL}}^{+} \boldsymbol{H}_{\mathrm{LN}}
+
+    where :math:`\mathrm{L}` denotes the first ``2 * m`` (amplitude and phase)
+    parameters, and :math:`\mathrm{N}` the remainder. For the Gauss-Newton
+    Hessian, this is the Kaufman approximation.
+    """
+    lin = slice(None, 2 * m)
+    nonlin = slice(2 * m, None)
+    coupling = np.linalg.pinv(hess[lin, lin], hermitian=True) @ hess[lin, nonlin]
+    return grad[nonlin], hess[nonlin, nonlin] - hess[nonlin, lin] @ coupling
+
+
+def inverse_diagonal(hess: np.ndarray) -> np.ndarray:
+    r"""Compute the (absolute) diagonal of the inverse of a Hessian.
+
+    If the Hessian is positive definite, as is the case for a Gauss-Newton
+    Hessian of full rank, its Cholesky factorisation
+    :math:`\boldsymbol{H} = \boldsymbol{L} \boldsymbol{L}^{\mathrm{T}}` is
+    used. As :math:`\boldsymbol{H}^{-1} = \boldsymbol{L}^{-\mathrm{T}}
+    \boldsymbol{L}^{-1}`, the diagonal of the inverse is given by the squared
+    column norms of :math:`\boldsymbol{L}^{-1}`, which is obtained with a
+    single triangular solve. Otherwise, the Hessian is inverted explicitly.
+
+    Parameters
+    ----------
+    hess
+        Symmetric Hessian matrix.
+
+    Returns
+    -------
+    diag: numpy.ndarray
+        Absolute values of the diagonal of the inverse Hessian.
+    """
+    try:
+        chol = sp.linalg.cholesky(hess, lower=True, check_finite=False)
+    except np.linalg.LinAlgError:
+        return np.abs(np.diag(np.linalg.inv(hess)))
+    chol_inv = sp.linalg.solve_triangular(
+        chol, np.eye(hess.shape[0]), lower=True, check_finite=False,
+    )
+    return np.einsum("ij,ij->j", chol_inv, chol_inv)
+
+
 def pv_obj(phases: np.ndarray) -> float:
     c_sum = np.sum(np.cos(phases))
     s_sum = np.sum(np.sin(phases))
@@ -1780,6 +2730,51 @@ def _unitvec(n: int, idx: int) -> np.ndarray:
     return vec
 
 
+def _second_derivative_term(
+    diagonals: np.ndarray, p: int, m: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    r"""Assemble the second derivative component of the exact Hessian.
+
+    The component :math:`-2 \Re((y - x)^{\dagger} \partial^2 x / \partial
+    \theta_i \partial \theta_j)` is zero unless :math:`\theta_i` and
+    :math:`\theta_j` correspond to the same oscillator, so only ``p * p``
+    diagonals, each of length ``m``, can be non-zero.
+
+    Parameters
+    ----------
+    diagonals
+        Values in the upper triangle, ordered in accordance with
+        :py:func:`_generate_diagonal_indices`.
+
+    p
+        The number of parameter 'groups'.
+
+    m
+        Number of oscillators in parameter estimate
+
+    Returns
+    -------
+    rows
+        Row indices of the ``p * p * m`` non-zero elements of the (symmetric)
+        ``(p * m, p * m)`` component.
+
+    cols
+        Column indices of the non-zero elements.
+
+    values
+        Values of the non-zero elements. No position occurs more than once, so
+        the component can be added to a dense Hessian with
+        ``hess[rows, cols] += values``.
+    """
+    rows, cols = _generate_diagonal_indices(p, m)
+    off_diag = rows != cols
+    return (
+        np.hstack((rows, cols[off_diag])),
+        np.hstack((cols, rows[off_diag])),
+        np.hstack((diagonals, diagonals[off_diag])),
+    )
+
+
 def _generate_diagonal_indices(p: int, m: int) -> Tuple[np.ndarray, np.ndarray]:
     """Determine Hessian positions with non-zero second-derivatives.
 
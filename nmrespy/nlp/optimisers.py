@@ -6,12 +6,12 @@
 from dataclasses import dataclass
 import math
 import time
-from typing import Any, Iterable, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 
 import numpy as np
 import scipy as sp
 
-from nmrespy.nlp._funcs import FunctionFactory
+from nmrespy.nlp._funcs import FunctionFactory, inverse_diagonal
 from nmrespy._misc import start_end_wrapper
 from nmrespy._timing import timer
 
@@ -21,9 +21,11 @@ result_messages = {
     "maxiter": "Maximum allowed iterations reached.",
     "noimprov": "Improvement could not be predicted.",
     "negamp": "Negative amplitude(s) detected.",
+    "callback": "Terminated by callback.",
 }
 
 TABLE_WIDTHS = (0, 7, 14, 14, 14, 0)
+LBFGS_TABLE_WIDTHS = (0, 7, 14, 14, 0)
 
 
 @dataclass
@@ -34,21 +36,52 @@ class NLPResult:
     result_message: Iterable[str]
     iterations: int
     time: float
+    cg_iterations: int = 0
+    evaluations: Optional[Dict[str, int]] = None
+    errors_time: float = 0.
+    restarts: int = 0
+    trust_radius: Optional[float] = None
+    function_factory: Optional[FunctionFactory] = None
 
 
-def print_title():
-    titles = (
-        "",
-        "Iter.",
-        "Objective",
-        "Grad. Norm",
-        "Trust Radius",
-        "",
-    )
-    title = "│".join(f"{x:^{w}}" for x, w in zip(titles, TABLE_WIDTHS))
-    print("┌" + "┬".join(w * "─" for w in TABLE_WIDTHS[1:-1]) + "┐")
+@dataclass
+class IterationInfo:
+    """Information on an optimiser iteration, passed to callbacks.
+
+    ``trust_radius``, ``rho`` and ``cg_iterations`` are ``None`` for
+    optimisers which do not use a trust region.
+    """
+    iteration: int
+    x: np.ndarray
+    objective: float
+    gradient_norm: float
+    trust_radius: Optional[float]
+    rho: Optional[float]
+    cg_iterations: Optional[int]
+    accepted: bool
+
+
+class _CallbackTermination(Exception):
+    pass
+
+
+def new_evaluations() -> Dict[str, int]:
+    return {"objective": 0, "gradient": 0, "hessian": 0}
+
+
+def tally_evaluations(evaluations: Dict[str, int], m: FunctionFactory) -> None:
+    """Add the evaluations made by a function factory which is about to be
+    discarded to ``evaluations``."""
+    for key, value in m.evaluations.items():
+        evaluations[key] += value
+
+
+def print_title(widths: Iterable[int] = TABLE_WIDTHS) -> None:
+    titles = ("Iter.", "Objective", "Grad. Norm", "Trust Radius")[: len(widths) - 2]
+    title = "│".join(f"{x:^{w}}" for x, w in zip(("", *titles, ""), widths))
+    print("┌" + "┬".join(w * "─" for w in widths[1:-1]) + "┐")
     print(title)
-    print("├" + "┼".join(w * "─" for w in TABLE_WIDTHS[1:-1]) + "┤")
+    print("├" + "┼".join(w * "─" for w in widths[1:-1]) + "┤")
 
 
 def print_entry(k: int, m: FunctionFactory, trust_radius: float) -> None:
@@ -64,10 +97,16 @@ def print_entry(k: int, m: FunctionFactory, trust_radius: float) -> None:
     print(msg)
 
 
+def print_lbfgs_entry(k: int, obj: float, grad_norm: float) -> None:
+    entries = ("", f" {k}", f" {obj:.6g}", f" {grad_norm:.6g}", "")
+    msg = "│".join(f"{x:<{w}}" for x, w in zip(entries, LBFGS_TABLE_WIDTHS))
+    print(msg)
+
+
 @timer
 @start_end_wrapper("TRUST NCG ALGORITHM STARTED", "TRUST NCG ALGORITHM COMPLETE")
 def trust_ncg(
-    x0: Union[np.ndarray, NLPResult],
+    x0: Union[np.ndarray, NLPResult, FunctionFactory],
     function_factory: FunctionFactory,
     args: Iterable[Any] = (),
     eta: float = 0.15,
@@ -79,13 +118,19 @@ def trust_ncg(
     save_trajectory: bool = False,
     monitor_negative_amps: bool = False,
     check_neg_amps_every: int = 10,
+    preconditioner: Optional[str] = None,
+    callback: Optional[callable] = None,
+    compute_errors: bool = True,
 ) -> NLPResult:
     r"""Newton Conjugate Gradient Trust-Region Algorithm.
 
     Parameters
     ----------
     x0
-        The initial guess of parameters.
+        The initial guess of parameters. To warm-start the optimiser, a
+        function factory associated with the initial guess can be given
+        instead, such that any quantities it has already computed are reused.
+        In this case, ``args`` is ignored.
 
     function_factory
         Generator of numerous useful functions (objective, gradient, Hessian, etc.)
@@ -138,13 +183,48 @@ def trust_ncg(
         For every iteration that is a multiple of this, negative amplitudes
         will be checked for and dealt with if found.
 
+    preconditioner
+        Preconditioner for the Steihaug conjugate gradient subproblem. The
+        trust region is defined with respect to the norm induced by the
+        preconditioner, :math:`\lVert \boldsymbol{p} \rVert_{\boldsymbol{M}} =
+        \sqrt{\boldsymbol{p}^{\mathrm{T}} \boldsymbol{M} \boldsymbol{p}}`.
+
+        * ``None`` No preconditioning.
+        * ``"diagonal"`` :math:`\boldsymbol{M}` is the (absolute) diagonal of
+          the Hessian.
+        * ``"block-jacobi"`` :math:`\boldsymbol{M}` comprises the diagonal
+          blocks of the Hessian associated with each oscillator. Blocks which
+          are not positive definite are made so by taking the absolute values
+          of their eigenvalues.
+
+        The preconditioner is updated whenever an iterate is accepted.
+
+    callback
+        Function called after each iteration with an :py:class:`IterationInfo`
+        object as its sole argument. If the callback returns ``True``, the
+        optimiser is terminated.
+
+    compute_errors
+        If ``True``, errors are computed from the diagonal of the inverse of
+        the final Hessian, using its Cholesky factorisation where possible.
+        Errors cannot be computed if the Hessian is matrix-free.
+
     Returns
     -------
-    An object with information about the optimisation.
+    An object with information about the optimisation. The total number of
+    conjugate gradient iterations is given by ``cg_iterations``, and the number
+    of objective, gradient and Hessian evaluations by ``evaluations``. The
+    trust radius following the last accepted step, and the final function
+    factory, are given by ``trust_radius`` and ``function_factory``. These can
+    be used to warm-start a subsequent optimisation.
     """
     start = time.time()
-    x = x0 if isinstance(x0, np.ndarray) else x0.x
-    m = function_factory(x, *args)
+    if isinstance(x0, FunctionFactory):
+        m = x0
+        x = m.theta
+    else:
+        x = x0 if isinstance(x0, np.ndarray) else x0.x
+        m = function_factory(x, *args)
 
     if initial_trust_radius is None:
         # See Gould 2005: Sensitivity of trust-region algorithms and
@@ -153,8 +233,12 @@ def trust_ncg(
     if max_trust_radius is None:
         max_trust_radius = 16 * initial_trust_radius
     trust_radius = min(initial_trust_radius, max_trust_radius)
+    accepted_trust_radius = trust_radius
 
     k = 0
+    cg_iterations = 0
+    evaluations = new_evaluations()
+    metric = precondition = None
 
     if monitor_negative_amps:
         oscs = m.args[2]
@@ -172,20 +256,26 @@ def trust_ncg(
         trajectory = None
 
     while True:
+        if preconditioner is not None and precondition is None:
+            metric, precondition = get_preconditioner(m, preconditioner)
+
         # Solve the subproblem using the Steihaug CG algorithm
         # Required accuracy of the computed solution
         epsi = min(0.5, math.sqrt(m.gradient_norm)) * m.gradient_norm
 
         z = np.zeros_like(x)
         r = m.gradient
-        d = -r
+        y = r if precondition is None else precondition(r)
+        d = -y
+        iteration_cg = 0
 
         while True:
-            Bd = m.hessian @ d
+            iteration_cg += 1
+            Bd = m.hessp(d)
             dBd = d.T @ Bd
 
             if dBd <= 0:
-                ta, tb = get_boundaries(z, d, trust_radius)
+                ta, tb = get_boundaries(z, d, trust_radius, metric)
                 pa = z + ta * d
                 pb = z + tb * d
                 if m.model(pa) < m.model(pb):
@@ -195,51 +285,65 @@ def trust_ncg(
                 hits_boundary = True
                 break
 
-            r_sq = r.T @ r
-            alpha = r_sq / dBd
+            r_y = r.T @ y
+            alpha = r_y / dBd
             z_next = z + alpha * d
 
-            if sp.linalg.norm(z_next) >= trust_radius:
-                ta, tb = get_boundaries(z, d, trust_radius)
+            if get_norm(z_next, metric) >= trust_radius:
+                ta, tb = get_boundaries(z, d, trust_radius, metric)
                 p = z + tb * d
                 hits_boundary = True
                 break
 
             r_next = r + alpha * Bd
-            r_next_sq = r_next.T @ r_next
 
-            if math.sqrt(r_next_sq) < epsi:
+            if sp.linalg.norm(r_next) < epsi:
                 hits_boundary = False
                 p = z_next
                 break
 
-            beta_next = r_next_sq / r_sq
-            d_next = -r_next + beta_next * d
+            y_next = r_next if precondition is None else precondition(r_next)
+            beta_next = (r_next.T @ y_next) / r_y
+            d_next = -y_next + beta_next * d
 
             z = z_next
             r = r_next
+            y = y_next
             d = d_next
 
+        cg_iterations += iteration_cg
         predicted_value = m.model(p)
         x_proposed = x + p
         m_proposed = function_factory(x_proposed, *args)
 
-        actual_reduction = m.objective - m_proposed.objective
+        with np.errstate(over="ignore", invalid="ignore"):
+            actual_reduction = m.objective - m_proposed.objective
         predicted_reduction = m.objective - predicted_value
 
         if predicted_reduction <= 0:
+            tally_evaluations(evaluations, m_proposed)
             result_message = result_messages["noimprov"]
             break
 
         rho = actual_reduction / predicted_reduction
+        # A non-finite objective (e.g. overflow for a large step) is treated
+        # as a rejected step
+        if not np.isfinite(rho):
+            rho = -np.inf
         if rho < 0.25:
             trust_radius *= 0.25
         elif rho > 0.75 and hits_boundary:
             trust_radius = min(2 * trust_radius, max_trust_radius)
 
-        if rho > eta:
+        accepted = rho > eta
+        if accepted:
+            tally_evaluations(evaluations, m)
             x = x_proposed
             m = m_proposed
+            precondition = None
+            accepted_trust_radius = trust_radius
+        else:
+            tally_evaluations(evaluations, m_proposed)
 
         k += 1
 
@@ -247,6 +351,13 @@ def trust_ncg(
         if save_trajectory:
             trajectory.append(np.copy(x))
 
+        terminate = callback is not None and callback(
+            IterationInfo(
+                k, np.copy(x), m.objective, m.gradient_norm, trust_radius, rho,
+                iteration_cg, accepted,
+            )
+        )
+
         # Print output
         if isinstance(output_mode, int) and (k % output_mode == 0):
             print_entry(k, m, trust_radius)
@@ -268,6 +379,10 @@ def trust_ncg(
             result_message = result_messages["maxiter"]
             break
 
+        if terminate:
+            result_message = result_messages["callback"]
+            break
+
     if isinstance(output_mode, int) and output_mode > 0:
         if (k % output_mode != 0):
             print_entry(k, m, trust_radius)
@@ -277,17 +392,239 @@ def trust_ncg(
         print(result_message)
     time_elapsed = time.time() - start
 
-    errors = np.sqrt(m.objective * np.abs(np.diag(np.linalg.inv(m.hessian))))
+    # Errors cannot be obtained from a matrix-free Hessian
+    if compute_errors and isinstance(m.hessian, np.ndarray):
+        errors = np.sqrt(m.objective * inverse_diagonal(m.hessian))
+    else:
+        errors = None
+    tally_evaluations(evaluations, m)
+
+    return NLPResult(
+        x, errors, trajectory, result_message, k, time_elapsed, cg_iterations,
+        evaluations, trust_radius=accepted_trust_radius, function_factory=m,
+    )
+
+
+def get_preconditioner(
+    m: FunctionFactory, kind: str,
+) -> Tuple[callable, callable]:
+    r"""Construct a preconditioner from the Hessian of a function factory.
+
+    Returns
+    -------
+    metric
+        Callable computing :math:`\boldsymbol{M} \boldsymbol{v}`.
+
+    precondition
+        Callable computing :math:`\boldsymbol{M}^{-1} \boldsymbol{v}`.
+    """
+    blocks = m.hessian_blocks()
+    oscs, p, _ = blocks.shape
+
+    if kind == "diagonal":
+        diag = np.abs(np.einsum("kii->ki", blocks).ravel(order="F"))
+        diag = np.maximum(diag, 1e-10 * diag.max())
+        return (lambda v: diag * v), (lambda v: v / diag)
+
+    # Symmetric positive definite versions of each oscillator's block, and
+    # their inverses
+    eigvals, eigvecs = np.linalg.eigh(blocks)
+    eigvals = np.abs(eigvals)
+    eigvals = np.maximum(eigvals, 1e-10 * eigvals.max())
+    spd = np.einsum("kij,kj,klj->kil", eigvecs, eigvals, eigvecs)
+    spd_inv = np.einsum("kij,kj,klj->kil", eigvecs, 1 / eigvals, eigvecs)
+
+    def apply(blocks: np.ndarray, v: np.ndarray) -> np.ndarray:
+        v = v.reshape((oscs, p), order="F")
+        return np.einsum("kij,kj->ki", blocks, v).ravel(order="F")
+
+    return (lambda v: apply(spd, v)), (lambda v: apply(spd_inv, v))
 
-    return NLPResult(x, errors, trajectory, result_message, k, time_elapsed)
 
+def get_norm(z: np.ndarray, metric: Optional[callable] = None) -> float:
+    if metric is None:
+        return sp.linalg.norm(z)
+    return math.sqrt(z.T @ metric(z))
 
-def get_boundaries(z, d, trust_radius):
-    a = d.T @ d
-    b = 2 * z.T @ d
-    c = (z.T @ z) - (trust_radius ** 2)
+
+def get_boundaries(z, d, trust_radius, metric=None):
+    Mz = z if metric is None else metric(z)
+    Md = d if metric is None else metric(d)
+    a = d.T @ Md
+    b = 2 * z.T @ Md
+    c = (z.T @ Mz) - (trust_radius ** 2)
     aux = b + math.copysign(
         math.sqrt(b * b - 4 * a * c),
         b,
     )
     return sorted([-aux / (2 * a), -(2 * c) / aux])
+
+
+@timer
+@start_end_wrapper("L-BFGS ALGORITHM STARTED", "L-BFGS ALGORITHM COMPLETE")
+def lbfgs(
+    x0: np.ndarray,
+    function: callable,
+    args: Iterable[Any] = (),
+    bounds: Optional[Iterable[Tuple[Optional[float], Optional[float]]]] = None,
+    epsilon: float = 1.e-8,
+    output_mode: Optional[int] = 5,
+    max_iterations: int = 500,
+    save_trajectory: bool = False,
+    memory: int = 10,
+    scale: Optional[np.ndarray] = None,
+    callback: Optional[callable] = None,
+) -> NLPResult:
+    r"""Limited-memory BFGS algorithm, with optional bounds (L-BFGS-B).
+
+    The Hessian is approximated using the ``memory`` most recent updates of the
+    parameters and gradient, such that only the objective and gradient are
+    required, and memory requirements scale linearly with the number of
+    parameters. The scipy implementation of L-BFGS-B is used.
+
+    Parameters
+    ----------
+    x0
+        The initial guess of parameters.
+
+    function
+        Callable which returns the objective and gradient, given the parameters
+        and ``args``.
+
+    bounds
+        ``(min, max)`` pairs for each parameter. ``None`` indicates no bound.
+        If ``None``, the parameters are not bounded.
+
+    epsilon
+        Sets the convergence criterion. Convergence will occur when the largest
+        component of the (projected) gradient satisfies
+        :math:`\lVert \boldsymbol{g}_k \rVert_{\infty} < \epsilon`.
+
+    output_mode
+        Should be an integer greater than or equal to ``0`` or ``None``. If ``None``,
+        no output will be given. If ``0``, only a message on the outcome of the
+        optimisation will be printed. If an integer greater than ``0``, information
+        for each iteration ``k`` which satisfies ``k % output_mode == 0`` will be
+        printed.
+
+    max_iterations
+        The greaterest number of iterations allowed before the optimiser is
+        terminated.
+
+    save_trajectory
+        If ``True``, a list of parameters at each iteration will be saved, and
+        accessible via the ``trajectory`` attribute of the ``NLPResult`` object.
+
+    memory
+        The number of updates used to approximate the Hessian.
+
+    scale
+        Positive scaling factors for each parameter. The optimisation is
+        carried out with respect to ``x * scale``. Setting ``scale`` as the
+        square root of the Hessian diagonal improves the conditioning of
+        problems in which parameters have very different sensitivities. If
+        ``None``, no scaling is applied.
+
+    callback
+        Function called after each iteration with an :py:class:`IterationInfo`
+        object as its sole argument. If the callback returns ``True``, the
+        optimiser is terminated.
+
+    Returns
+    -------
+    An object with information about the optimisation.
+    """
+    start = time.time()
+    if scale is None:
+        scale = np.ones_like(x0)
+    if bounds is not None:
+        bounds = [
+            tuple(None if b is None else b * s for b in bound)
+            for bound, s in zip(bounds, scale)
+        ]
+    # Most recent evaluation, so that the objective and gradient at each
+    # iterate can be output without being recomputed.
+    latest = {}
+    evaluations = new_evaluations()
+
+    def fun(x: np.ndarray) -> Tuple[float, np.ndarray]:
+        obj, grad = function(x, *args)
+        evaluations["objective"] += 1
+        evaluations["gradient"] += 1
+        latest.update(x=np.copy(x), obj=obj, grad=grad)
+        return obj, grad
+
+    def scaled_fun(y: np.ndarray) -> Tuple[float, np.ndarray]:
+        obj, grad = fun(y / scale)
+        return obj, grad / scale
+
+    def evaluate(x: np.ndarray) -> None:
+        if "x" not in latest or not np.array_equal(x, latest["x"]):
+            fun(x)
+
+    def output(k: int, x: np.ndarray) -> None:
+        evaluate(x)
+        print_lbfgs_entry(k, latest["obj"], sp.linalg.norm(latest["grad"]))
+
+    trajectory = [np.copy(x0)] if save_trajectory else None
+    k = 0
+
+    if isinstance(output_mode, int) and output_mode > 0:
+        print_title(LBFGS_TABLE_WIDTHS)
+        output(k, x0)
+
+    def iteration(y: np.ndarray) -> None:
+        nonlocal k, x
+        k += 1
+        x = y / scale
+        if save_trajectory:
+            trajectory.append(np.copy(x))
+        if isinstance(output_mode, int) and output_mode > 0 and k % output_mode == 0:
+            output(k, x)
+        if callback is not None:
+            evaluate(x)
+            info = IterationInfo(
+                k, np.copy(x), latest["obj"], sp.linalg.norm(latest["grad"]),
+                None, None, None, True,
+            )
+            if callback(info):
+                raise _CallbackTermination
+
+    x = x0
+    try:
+        result = sp.optimize.minimize(
+            scaled_fun,
+            x0 * scale,
+            jac=True,
+            method="L-BFGS-B",
+            bounds=bounds,
+            callback=iteration,
+            options={
+                "maxiter": max_iterations,
+                "maxcor": memory,
+                "gtol": epsilon,
+                "ftol": 0.,
+            },
+        )
+    except _CallbackTermination:
+        result_message = result_messages["callback"]
+    else:
+        x = result.x / scale
+        if result.status == 0:
+            result_message = result_messages["success"]
+        elif result.status == 1:
+            result_message = result_messages["maxiter"]
+        else:
+            result_message = result_messages["noimprov"]
+    if isinstance(output_mode, int) and output_mode > 0:
+        if (k % output_mode != 0):
+            output(k, x)
+        print("└" + "┴".join(w * "─" for w in LBFGS_TABLE_WIDTHS[1:-1]) + "┘")
+
+    if isinstance(output_mode, int):
+        print(result_message)
+    time_elapsed = time.time() - start
+
+    return NLPResult(
+        x, None, trajectory, result_message, k, time_elapsed, 0, evaluations,
+    )
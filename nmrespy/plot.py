@@ -266,11 +266,9 @@ class ResultPlotter1D(ExpInfo):
         datacopy[0] /= 2
         self.spectrum = sig.ft(datacopy)[self.slice_].real
 
-        self.peaks = []
-        for osc in self.result:
-            fid = self.make_fid(np.expand_dims(osc, axis=0))
-            fid[0] /= 2
-            self.peaks.append(sig.ft(fid).real[self.slice_])
+        self.peaks = list(
+            self.oscillator_spectra(self.result, slices=self.slice_).real
+        )
 
         self.model = sum(self.peaks, np.zeros(self.spectrum.shape)) + (
             0.1 * np.amax(self.spectrum) if self.model_shift is None
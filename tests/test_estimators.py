@@ -0,0 +1,142 @@
+# test_estimators.py
+# Simon Hulse
+# simon.hulse@chem.ox.ac.uk
+# Last Edited: Sun 18 Oct 2026 12:00:00 BST
+
+import copy
+
+import nmrespy as ne
+import numpy as np
+import pytest
+
+
+PARAMS = np.array(
+    [
+        [1., 0., -240., 5.],
+        [2., 0., -200., 5.],
+        [1., 0., -192., 5.],
+        [3., 0., 300., 4.],
+    ],
+    dtype="float64",
+)
+REGIONS = ((-260., -180.), (280., 320.))
+NOISE_REGION = (800., 900.)
+
+
+def make_estimator():
+    np.random.seed(0)
+    return ne.Estimator1D.new_from_parameters(PARAMS, 4096, 2000., 0., snr=40.)
+
+
+def test_estimate_regions():
+    estimator = make_estimator()
+    serial = estimator.estimate_regions(
+        REGIONS, NOISE_REGION, workers=1, seed=1, output_mode=None, _log=False,
+    )
+    parallel = estimator.estimate_regions(
+        REGIONS, NOISE_REGION, workers=2, seed=1, output_mode=None,
+    )
+    assert len(estimator.get_results()) == 4
+    for s, p in zip(serial, parallel):
+        assert np.array_equal(s.get_params(), p.get_params())
+
+
+def make_subband_estimator():
+    # Signals throughout the spectrum, so that no sub-band contains only noise
+    params = np.array(
+        [[1., 0., f, 5.] for f in np.arange(-900., 900., 150.)],
+        dtype="float64",
+    )
+    np.random.seed(0)
+    return ne.Estimator1D.new_from_parameters(params, 2048, 2000., 0., snr=40.)
+
+
+def test_subband_estimate():
+    estimator = make_subband_estimator()
+    kwargs = {"nsubbands": 4, "seed": 1, "output_mode": None}
+    estimator.subband_estimate((950., 990.), **kwargs)
+    estimator.subband_estimate((950., 990.), workers=2, **kwargs)
+    serial, parallel = estimator.get_params(merge=False)
+    assert np.array_equal(serial, parallel)
+
+
+def test_global_random_state():
+    # With `seed=None`, results are reproducible using NumPy's global state
+    estimator = make_estimator()
+    kwargs = {"output_mode": None, "_log": False}
+    for workers in (1, 2):
+        results = []
+        for _ in range(2):
+            np.random.seed(10)
+            results.append(
+                estimator.estimate_regions(
+                    REGIONS, NOISE_REGION, workers=workers, **kwargs,
+                )
+            )
+        for a, b in zip(*results):
+            assert np.array_equal(a.get_params(), b.get_params())
+
+    # Serially, each region draws from the global state as `estimate` does
+    np.random.seed(10)
+    (result,) = estimator.estimate_regions(
+        REGIONS[:1], NOISE_REGION, workers=1, **kwargs,
+    )
+    np.random.seed(10)
+    estimator.estimate(REGIONS[0], NOISE_REGION, **kwargs)
+    assert np.array_equal(result.get_params(), estimator.get_params([-1]))
+
+    estimator = make_subband_estimator()
+    for _ in range(2):
+        np.random.seed(10)
+        estimator.subband_estimate((950., 990.), nsubbands=4, output_mode=None)
+    first, second = estimator.get_params(merge=False)
+    assert np.array_equal(first, second)
+
+
+def test_decimate():
+    estimator = make_estimator()
+    region = REGIONS[0]
+    kwargs = {"seed": 1, "output_mode": None, "_log": False}
+    # Polishing on the uncut signal should recover the decimation loss
+    for polish_iterations, atol in (
+        (None, (0.05, 0.05, 0.25, 0.25)),
+        (20, (0.01, 0.01, 0.01, 0.05)),
+    ):
+        estimator.estimate(
+            region, NOISE_REGION, decimate=True,
+            polish_iterations=polish_iterations, **kwargs,
+        )
+        params = estimator.get_params([-1])
+        assert params.shape == (3, 4)
+        assert np.allclose(params, PARAMS[:3], rtol=0, atol=atol)
+
+    with pytest.raises(ValueError):
+        estimator.estimate(region, NOISE_REGION, polish_iterations=20, **kwargs)
+
+
+def test_filter_workspace():
+    estimator = make_estimator()
+    kwargs = {"seed": 1, "output_mode": None, "_log": False}
+    estimator.estimate(REGIONS[0], NOISE_REGION, **kwargs)
+    workspace = estimator._filter_workspace
+    assert workspace is not None
+    # A second region reuses the workspace
+    estimator.estimate(REGIONS[1], NOISE_REGION, **kwargs)
+    assert estimator._filter_workspace is workspace
+
+    # Modifying the data discards the workspace, so the modified data is filtered
+    for method, args in (
+        ("phase_data", (0.1,)),
+        ("exp_apodisation", (1.,)),
+        ("baseline_correction", ()),
+    ):
+        getattr(estimator, method)(*args)
+        assert estimator._filter_workspace is None
+        # Copies do not carry a workspace, and so filter the data from scratch
+        fresh = copy.deepcopy(estimator)
+        estimator.estimate(REGIONS[0], NOISE_REGION, **kwargs)
+        fresh.estimate(REGIONS[0], NOISE_REGION, **kwargs)
+        assert estimator._filter_workspace is not workspace
+        assert estimator._filter_workspace.fid is estimator.data
+        assert np.array_equal(estimator.get_params([-1]), fresh.get_params([-1]))
+        workspace = estimator._filter_workspace
@@ -0,0 +1,102 @@
+# test_expinfo.py
+# Simon Hulse
+# simon.hulse@chem.ox.ac.uk
+# Last Edited: Sun 18 Oct 2026 12:00:00 BST
+
+import nmrespy as ne
+from nmrespy import sig
+import numpy as np
+
+
+def test_oscillator_integrals():
+    # Oscillators which have/have not fully decayed, undamped oscillators
+    # on and off the frequency grid
+    expinfo = ne.ExpInfo(dim=1, sw=1000., offset=100., default_pts=4096)
+    params = np.array(
+        [
+            [1.3, 0.4, 150.3, 10.],
+            [0.7, -1., -300., 0.5],
+            [2., 0.2, 220.7, 0.],
+            [0.5, 0.1, 100. + 7000. / 4096, 0.],
+        ],
+        dtype="float64",
+    )
+    spectra = [sig.ft(expinfo.make_fid(p[None, :])) for p in params]
+    analytic = expinfo.oscillator_integrals(params)
+    assert np.allclose(analytic, [np.sum(np.abs(s)) for s in spectra], rtol=1e-10)
+    analytic = expinfo.oscillator_integrals(params, absolute=False)
+    assert np.allclose(analytic, [np.sum(s) for s in spectra], rtol=1e-10)
+
+    # Well-resolved peaks: Simpson's rule agrees with the analytic integrals
+    expinfo = ne.ExpInfo(dim=2, sw=(50., 1000.), offset=(0., 100.))
+    params = np.array(
+        [
+            [1., 0.3, 3., 150., 3., 5.],
+            [2., 0.1, -10., -200., 2., 10.],
+        ],
+        dtype="float64",
+    )
+    analytic = expinfo.oscillator_integrals(params, (128, 4096))
+    numeric = expinfo.oscillator_integrals(params, (128, 4096), method="numeric")
+    assert np.allclose(analytic, numeric, rtol=2e-3)
+    spectra = [sig.ft(expinfo.make_fid(p[None, :], (128, 4096))) for p in params]
+    assert np.allclose(analytic, [np.sum(np.abs(s)) for s in spectra], rtol=1e-10)
+    scaled = expinfo.oscillator_integrals(params, (128, 4096), scale_relative_to=0)
+    assert np.allclose(scaled, np.array(analytic) / analytic[0])
+
+
+def test_make_fids_per_oscillator():
+    params = np.array(
+        [
+            [1., 0.3, 3., 150., 3., 5.],
+            [2., 0.1, -10., -200., 2., 10.],
+            [1., 0., 5., 20., 3., 3.],
+        ],
+        dtype="float64",
+    )
+    expinfo = ne.ExpInfo(
+        dim=2, sw=(50., 1000.), offset=(0., 100.), default_pts=(64, 513),
+    )
+    fids = expinfo.make_fids_per_oscillator(params, chunk_size=2)
+    assert fids.shape == (3, 64, 513)
+    for fid, p in zip(fids, params):
+        assert np.allclose(fid, expinfo.make_fid(p[None, :]), rtol=0, atol=1e-12)
+
+    groups = [[0, 2], [1]]
+    spectra = expinfo.make_fids_per_oscillator(params, groups=groups, spectra=True)
+    for spectrum, group in zip(spectra, groups):
+        fid = expinfo.make_fid(params[group])
+        fid[0, 0] *= 0.5
+        assert np.allclose(spectrum, sig.ft(fid), rtol=0, atol=1e-9)
+
+
+def test_oscillator_spectra():
+    # Includes an undamped oscillator lying on the frequency grid
+    params = np.array(
+        [
+            [1., 0.3, 3., 150., 3., 5.],
+            [2., 0.1, -10., -200., 2., 10.],
+            [1., 0., 5., 100. + 4000. / 512, 3., 0.],
+        ],
+        dtype="float64",
+    )
+    for pts in ((64, 512), (63, 513)):
+        expinfo = ne.ExpInfo(
+            dim=2, sw=(50., 1000.), offset=(0., 100.), default_pts=pts,
+        )
+        reference = expinfo.make_fids_per_oscillator(params, spectra=True)
+        spectra = expinfo.oscillator_spectra(params)
+        assert np.allclose(spectra, reference, rtol=0, atol=1e-9)
+
+        slices = (slice(10, 20), slice(100, 400))
+        spectra = expinfo.oscillator_spectra(params, slices=slices)
+        assert np.allclose(
+            spectra, reference[(slice(None), *slices)], rtol=0, atol=1e-9,
+        )
+
+        groups = [[0, 2], [1]]
+        spectra = expinfo.oscillator_spectra(params, groups=groups)
+        for spectrum, group in zip(spectra, groups):
+            assert np.allclose(
+                spectrum, np.sum(reference[group], axis=0), rtol=0, atol=1e-9,
+            )
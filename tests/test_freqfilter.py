@@ -0,0 +1,73 @@
+# test_freqfilter.py
+# Simon Hulse
+# simon.hulse@chem.ox.ac.uk
+# Last Edited: Sun 18 Oct 2026 12:00:00 BST
+
+import nmrespy as ne
+from nmrespy import sig
+from nmrespy.freqfilter import Filter, FilterWorkspace
+import numpy as np
+
+
+PARAMS = np.array(
+    [
+        [1., 0., -240., 5.],
+        [2., 0., -200., 5.],
+        [1., 0., -192., 5.],
+    ],
+    dtype="float64",
+)
+EXPINFO = ne.ExpInfo(dim=1, sw=2000., offset=0., sfo=500., default_pts=4096)
+
+
+def make_fid():
+    np.random.seed(0)
+    return EXPINFO.make_fid(PARAMS, snr=40.)
+
+
+def make_filter():
+    # With this region, the exact cut for `cut_ratio=1.1` is already a fast length
+    return Filter(make_fid(), EXPINFO, (-255., -175.), (800., 900.), seed=1)
+
+
+def test_get_filtered_fids():
+    filt = make_filter()
+    cut_ratio = 1.1
+    assert filt._cut_shape(cut_ratio) == filt._cut_shape(cut_ratio, fast_len=True)
+
+    (cut_fid, cut_expinfo), (uncut_fid, uncut_expinfo) = \
+        filt.get_filtered_fids(cut_ratio)
+    for (fid, expinfo), (ref_fid, ref_expinfo) in zip(
+        ((cut_fid, cut_expinfo), (uncut_fid, uncut_expinfo)),
+        (filt.get_filtered_fid(cut_ratio), filt.get_filtered_fid(None)),
+    ):
+        assert fid.shape == ref_fid.shape
+        assert np.allclose(fid, ref_fid, rtol=1e-12, atol=0)
+        assert expinfo.default_pts == ref_expinfo.default_pts
+        assert np.allclose(expinfo.sw(), ref_expinfo.sw())
+        assert np.allclose(expinfo.offset(), ref_expinfo.offset())
+
+
+def test_ift_and_slice():
+    # scipy.fft and numpy.fft only agree to rounding
+    filt = make_filter()
+    spectrum, _ = filt.get_filtered_spectrum(cut_ratio=None)
+    fid = filt._ift_and_slice(spectrum)
+    ref = sig.ift(spectrum)[:spectrum.shape[0] // 2]
+    assert np.allclose(fid, ref, rtol=0, atol=1e-12 * np.abs(ref).max())
+
+
+def test_workspace():
+    fid = make_fid()
+    workspace = FilterWorkspace(fid)
+    for region in ((-255., -175.), (-100., 100.)):
+        shared = Filter(fid, EXPINFO, region, (800., 900.), seed=1, workspace=workspace)
+        unshared = Filter(fid, EXPINFO, region, (800., 900.), seed=1)
+        # The spectrum is computed once, and reused for the second region
+        assert shared.spectrum is workspace.spectrum(shared.axes)
+        assert len(workspace._spectra) == 1
+        for cut_ratio in (1.1, None):
+            assert np.array_equal(
+                shared.get_filtered_fid(cut_ratio)[0],
+                unshared.get_filtered_fid(cut_ratio)[0],
+            )
@@ -171,6 +171,61 @@ def test_shifts():
     assert utils.aequal(shifts[1], np.linspace(0., 2., 2049)[:-1])
 
 
+def test_spectrum_cache():
+    estimator = DefaultEstimator.before_estimation()
+    for attr in ("spectrum", "spectrum_sinebell", "spectrum_tilt"):
+        spectrum = getattr(estimator, attr)
+        assert getattr(estimator, attr) is spectrum
+        assert not spectrum.flags.writeable
+    shifts = estimator.get_shifts(unit="ppm")
+    assert estimator.get_shifts(unit="ppm") is shifts
+    assert estimator.get_shifts() is not shifts
+
+    # Processing the data invalidates the cache
+    spectrum = estimator.spectrum
+    estimator.exp_apodisation(5.)
+    assert estimator.spectrum is not spectrum
+    data = copy.deepcopy(estimator.data)
+    data[0, 0] *= 0.5
+    assert utils.aequal(estimator.spectrum, ne.sig.ft(data))
+
+
+def test_spectrum_tilt():
+    # Tilt factor of 2: integer and exact modes coincide
+    params = np.array(
+        [[1., 0., 5., 105., 3., 3.], [1., 0., -5., 95., 3., 3.]],
+        dtype="float64",
+    )
+    expinfo = ne.ExpInfo(
+        dim=2, sw=(40., 200.), offset=(0., 100.), default_pts=(64, 640),
+    )
+    estimator = ne.Estimator2DJ(expinfo.make_fid(params), expinfo)
+    tilt = estimator.spectrum_tilt
+    assert tilt is estimator.get_spectrum_tilt("integer")
+    exact = estimator.get_spectrum_tilt("exact")
+    assert utils.aequal(tilt, exact)
+
+    # Both components of the multiplet are aligned in the direct dimension
+    rows, cols = np.unravel_index(np.argsort(exact.ravel())[-2:], exact.shape)
+    assert rows[0] != rows[1]
+    assert cols[0] == cols[1]
+
+    with pytest.raises(ValueError):
+        estimator.get_spectrum_tilt("nearest")
+
+    # Tilt factor of 1.9375: the multiplet components need shifts of 15.5 points
+    expinfo = ne.ExpInfo(
+        dim=2, sw=(40., 200.), offset=(0., 100.), default_pts=(64, 620),
+    )
+    estimator = ne.Estimator2DJ(expinfo.make_fid(params), expinfo)
+    exact = estimator.get_spectrum_tilt("exact")
+    rows, cols = np.unravel_index(np.argsort(exact.ravel())[-2:], exact.shape)
+    assert rows[0] != rows[1]
+    # Both components should sit at the chemical shift of the multiplet (100Hz)
+    shifts = expinfo.get_shifts(meshgrid=False)[1]
+    assert cols[0] == cols[1] == np.argmin(np.abs(shifts - 100.))
+
+
 def test_estimate():
     # `after_estimation` will run estimate on three different regions.
     # Afterwards, estimate is tested with `region` set to `None`, and with different
@@ -198,6 +253,44 @@ def test_spurious_oscillators():
     assert np.allclose(estimator.get_params(), init_params)
 
 
+def test_predict_multiplets():
+    estimator = DefaultEstimator.after_estimation()
+    params = estimator.get_params()
+    multiplets = estimator.predict_multiplets()
+    assert list(multiplets) == sorted(multiplets)
+    assert sorted(sum(multiplets.values(), [])) == list(range(params.shape[0]))
+    for freq, oscs in multiplets.items():
+        assert np.isclose(freq, np.mean(params[oscs, 3] - params[oscs, 2]))
+
+    # Assignment doesn't depend on the order of the oscillators
+    perm = np.random.default_rng(0).permutation(params.shape[0])
+    thold = estimator.default_multiplet_thold
+    clusters = ne.estimators.jres._cluster_multiplets(
+        params[perm, 3] - params[perm, 2], thold,
+    )
+    assert [sorted(perm[oscs]) for _, oscs in clusters] == [
+        sorted(oscs) for oscs in multiplets.values()
+    ]
+
+    # Closely spaced frequencies are not chained into a single multiplet
+    clusters = ne.estimators.jres._cluster_multiplets(
+        np.array([0., 0.6, 1.2, 1.8, 2.4]), 1.,
+    )
+    assert [oscs for _, oscs in clusters] == [[0, 1], [2, 3], [4]]
+    assert np.allclose([freq for freq, _ in clusters], [0.3, 1.5, 2.4])
+
+    locations = estimator._get_osc_locations()
+    for osc, (res_idx, osc_idx) in zip(params, locations):
+        assert estimator.find_osc(osc) == (res_idx, osc_idx)
+
+    # Assignments are memoised, but not pickled
+    key = (tuple(range(len(estimator.get_results()))), thold)
+    entry = estimator._multiplet_cache[key]
+    estimator.predict_multiplets()
+    assert estimator._multiplet_cache[key] is entry
+    assert copy.deepcopy(estimator)._multiplet_cache == {}
+
+
 def test_negative_45_signal(monkeypatch):
     if not VIEW_CONTENT:
         monkeypatch.setattr(plt, 'show', lambda: None)
@@ -0,0 +1,113 @@
+# test_mpm.py
+# Simon Hulse
+# simon.hulse@chem.ox.ac.uk
+# Last Edited: Sun 18 Oct 2026 12:00:00 BST
+
+import nmrespy as ne
+from nmrespy.mpm import BlockHankelOperator, HankelOperator, MatrixPencil
+import numpy as np
+import scipy.linalg as slinalg
+import scipy.sparse.linalg as splinalg
+
+
+PARAMS = np.array(
+    [
+        [1., 0.3, -300., 5.],
+        [2., -0.5, -120., 7.],
+        [1.5, 0., 50., 4.],
+        [0.5, 1., 210., 6.],
+    ],
+    dtype="float64",
+)
+EXPINFO = ne.ExpInfo(dim=1, sw=1000., offset=0., sfo=500., default_pts=1536)
+PARAMS_2D = np.array(
+    [
+        [1., 0.3, 5., -300., 3., 5.],
+        [2., -0.5, -5., -120., 3., 7.],
+        [1.5, 0., 0., 50., 2., 4.],
+    ],
+    dtype="float64",
+)
+EXPINFO_2D = ne.ExpInfo(
+    dim=2, sw=(40., 1000.), offset=(0., 0.), sfo=(None, 500.), default_pts=(32, 256),
+)
+
+
+def _random_signal(shape):
+    rng = np.random.default_rng(0)
+    return rng.standard_normal(shape) + 1j * rng.standard_normal(shape)
+
+
+def _check_operator(op, dense):
+    rng = np.random.default_rng(1)
+    v = rng.standard_normal(dense.shape[1]) + 1j * rng.standard_normal(dense.shape[1])
+    u = rng.standard_normal(dense.shape[0]) + 1j * rng.standard_normal(dense.shape[0])
+    V = rng.standard_normal((dense.shape[1], 3))
+    assert np.allclose(op.matvec(v), dense @ v, rtol=0, atol=1e-10)
+    assert np.allclose(op.rmatvec(u), dense.conj().T @ u, rtol=0, atol=1e-10)
+    assert np.allclose(op.matmat(V), dense @ V, rtol=0, atol=1e-10)
+    assert np.allclose(op.H.matvec(u), dense.conj().T @ u, rtol=0, atol=1e-10)
+
+
+def test_partial_svd():
+    np.random.seed(0)
+    fid = EXPINFO.make_fid(PARAMS, snr=40.)
+    reference = MatrixPencil(EXPINFO, fid, output_mode=False).get_params()
+    assert reference.shape == PARAMS.shape
+
+    # Known number of oscillators
+    partial = MatrixPencil(
+        EXPINFO, fid, oscillators=4, output_mode=False, svd_method="partial",
+    ).get_params()
+    assert np.allclose(partial, reference, rtol=0, atol=1e-6)
+
+    # Bounded number of oscillators: MDL applied to the approximated
+    # singular values.
+    partial = MatrixPencil(
+        EXPINFO, fid, output_mode=False, svd_method="partial", max_oscillators=10,
+    ).get_params()
+    assert partial.shape == reference.shape
+    assert np.allclose(partial, reference, rtol=0, atol=1e-6)
+
+
+def test_hankel_operator():
+    x = _random_signal(50)
+    for rows in (1, 20, 26, 50):
+        op = HankelOperator(x, rows)
+        dense = slinalg.hankel(x[:rows], x[rows - 1:])
+        assert op.shape == dense.shape
+        assert np.array_equal(op.todense(), dense)
+        assert np.isclose(op.squared_norm, np.sum(np.abs(dense) ** 2))
+        _check_operator(op, dense)
+
+
+def test_block_hankel_operator():
+    x = _random_signal((7, 9))
+    L1, L2 = 3, 4
+    C1, C2 = 7 - L1 + 1, 9 - L2 + 1
+    dense = np.zeros((L1 * L2, C1 * C2), dtype="complex")
+    for r, l2, c, k2 in np.ndindex(L1, L2, C1, C2):
+        dense[r * L2 + l2, c * C2 + k2] = x[r + c, l2 + k2]
+    op = BlockHankelOperator(x, (L1, L2))
+    assert op.shape == dense.shape
+    assert np.array_equal(op.todense(), dense)
+    _check_operator(op, dense)
+
+
+def test_mmemp(monkeypatch):
+    np.random.seed(0)
+    fid = EXPINFO_2D.make_fid(PARAMS_2D, snr=40.)
+    implicit = MatrixPencil(EXPINFO_2D, fid, oscillators=3, output_mode=False)
+    implicit = implicit.get_params()
+
+    # Dense enhanced matrix, with a full SVD
+    def svds(A, k):
+        U, s, Vh = np.linalg.svd(A.todense())
+        return U[:, :k], s[:k], Vh[:k]
+
+    monkeypatch.setattr(splinalg, "svds", svds)
+    dense = MatrixPencil(EXPINFO_2D, fid, oscillators=3, output_mode=False)
+    dense = dense.get_params()
+    assert np.allclose(implicit, dense, rtol=0, atol=1e-6)
+    true = PARAMS_2D[np.argsort(PARAMS_2D[:, 3])]
+    assert np.allclose(implicit[:, 2:4], true[:, 2:4], rtol=0, atol=0.5)
@@ -0,0 +1,211 @@
+# test_nlp.py
+# Simon Hulse
+# simon.hulse@chem.ox.ac.uk
+# Last Edited: Sun 18 Oct 2026 12:00:00 BST
+
+import nmrespy as ne
+from nmrespy.nlp import nonlinear_programming, _funcs as funcs
+import numpy as np
+
+
+M = 4
+THETA = np.array(
+    [
+        1., 0.8, 0.6, 0.9,
+        0.1, -0.4, 0.7, 0.,
+        -10., 5., 2., 12.,
+        -50., 20., 35., -5.,
+        3., 2., 4., 2.5,
+        4., 6., 5., 3.,
+    ],
+    dtype="float64",
+)
+TP = [np.arange(24) / 40., np.arange(256) / 200.]
+
+PARAMS_1D = np.array(
+    [
+        [1., 0.1, -30., 5.],
+        [2., -0.3, -20., 6.],
+        [1.5, 0.2, -12., 4.],
+        [0.8, 0.5, 8., 7.],
+    ],
+    dtype="float64",
+)
+EXPINFO_1D = ne.ExpInfo(dim=1, sw=200., offset=0., default_pts=2048)
+KWARGS_1D = {"phase_variance": False, "output_mode": None}
+
+
+def _args(idx):
+    rng = np.random.default_rng(0)
+    data = (
+        rng.standard_normal((24, 256)) + 1j * rng.standard_normal((24, 256))
+    )
+    active = np.hstack([THETA[i * M : (i + 1) * M] for i in idx])
+    passive = np.hstack(
+        [np.array([])] +
+        [THETA[i * M : (i + 1) * M] for i in range(6) if i not in idx]
+    )
+    return active, (data, TP, M, passive, idx, True)
+
+
+def _signal_1d(m=4):
+    """Noisy FID comprising the first ``m`` oscillators of ``PARAMS_1D``, and a
+    perturbed initial guess."""
+    params = PARAMS_1D[:m]
+    np.random.seed(0)
+    fid = EXPINFO_1D.make_fid(params, snr=30.)
+    x0 = params + np.array([-0.3, -0.2, 0.8, 1.])
+    return params, fid, x0
+
+
+def test_separable_2d():
+    for idx in ([0, 1, 2, 3, 4, 5], [0, 2, 3], [1, 4, 5]):
+        active, args = _args(idx)
+        dense = funcs.obj_grad_gauss_newton_hess_2d(active, *args)
+        separable = funcs.obj_grad_gauss_newton_hess_separable_2d(active, *args)
+        for d, s in zip(dense, separable):
+            assert np.allclose(d, s, rtol=0, atol=1e-10 * np.abs(d).max())
+        for d, s in zip(
+            funcs.obj_grad_2d(active, *args),
+            funcs.obj_grad_separable_2d(active, *args),
+        ):
+            assert np.allclose(d, s, rtol=0, atol=1e-10 * np.abs(d).max())
+
+
+def test_memory_budget():
+    # Small budget, such that the t2 axis is split into several tiles of
+    # unequal size
+    active, args = _args([0, 1, 2, 3, 4, 5])
+    for func in (
+        funcs.obj_grad_2d,
+        funcs.obj_grad_gauss_newton_hess_2d,
+        funcs.obj_grad_true_hess_2d,
+    ):
+        untiled = func(active, *args)
+        tiled = func(active, *args, memory_budget=4e-4)
+        for u, t in zip(untiled, tiled):
+            assert np.allclose(u, t, rtol=0, atol=1e-12 * np.abs(u).max())
+
+
+def test_matrix_free_2d():
+    active, args = _args([0, 1, 2, 3, 4, 5])
+    _, _, hess = funcs.obj_grad_gauss_newton_hess_2d(active, *args)
+    factory = funcs.FunctionFactory2DMatrixFree(active, *args)
+    d = np.random.default_rng(1).standard_normal(active.size)
+    assert np.allclose(
+        factory.hessp(d), hess @ d, rtol=0, atol=1e-10 * np.abs(hess).max(),
+    )
+
+
+def test_varpro():
+    params, fid, x0 = _signal_1d()
+    reference = nonlinear_programming(EXPINFO_1D, fid, x0, **KWARGS_1D)
+    varpro = nonlinear_programming(EXPINFO_1D, fid, x0, method="varpro", **KWARGS_1D)
+    assert varpro.iterations < reference.iterations
+    assert np.allclose(varpro.x, reference.x, rtol=0, atol=1e-5)
+    assert np.allclose(varpro.errors, reference.errors, rtol=1e-3, atol=0)
+
+    # Only frequencies optimised: errors are not given for damping factors
+    varpro = nonlinear_programming(
+        EXPINFO_1D, fid, x0, method="varpro", mode="apf", **KWARGS_1D,
+    )
+    assert np.all(np.isnan(varpro.errors[:, 3]))
+    assert np.allclose(varpro.x[:, 3], x0[:, 3])
+
+
+def test_lbfgs():
+    params, fid, x0 = _signal_1d(3)
+    reference = nonlinear_programming(EXPINFO_1D, fid, x0, **KWARGS_1D)
+    for bound in (False, True):
+        lbfgs = nonlinear_programming(
+            EXPINFO_1D, fid, x0, method="lbfgs", bound=bound, **KWARGS_1D,
+        )
+        assert np.allclose(lbfgs.x, reference.x, rtol=0, atol=1e-3)
+
+
+def test_preconditioner():
+    _, fid, x0 = _signal_1d()
+    for hessian in ("gauss-newton", "exact", "matrix-free"):
+        reference = nonlinear_programming(
+            EXPINFO_1D, fid, x0, hessian=hessian, **KWARGS_1D,
+        )
+        for preconditioner in ("diagonal", "block-jacobi"):
+            result = nonlinear_programming(
+                EXPINFO_1D, fid, x0, hessian=hessian, preconditioner=preconditioner,
+                **KWARGS_1D,
+            )
+            assert result.cg_iterations < reference.cg_iterations
+            assert np.allclose(result.x, reference.x, rtol=0, atol=1e-5)
+
+
+def test_callback():
+    params, fid, x0 = _signal_1d(3)
+    for method in ("trust-ncg", "lbfgs"):
+        infos = []
+        result = nonlinear_programming(
+            EXPINFO_1D, fid, x0, method=method, callback=infos.append, **KWARGS_1D,
+        )
+        assert [info.iteration for info in infos] == \
+            list(range(1, result.iterations + 1))
+        assert result.evaluations["objective"] >= result.iterations
+        assert result.evaluations["gradient"] > 0
+        if method == "trust-ncg":
+            assert sum(info.cg_iterations for info in infos) == \
+                result.cg_iterations
+            assert result.evaluations["hessian"] == \
+                sum(info.accepted for info in infos) + 1
+
+        # Request termination after 3 iterations
+        result = nonlinear_programming(
+            EXPINFO_1D, fid, x0, method=method,
+            callback=lambda info: info.iteration == 3, **KWARGS_1D,
+        )
+        assert result.iterations == 3
+        assert result.result_message == ["Terminated by callback."]
+
+
+def test_error_method():
+    params, fid, _ = _signal_1d(3)
+    exact = nonlinear_programming(EXPINFO_1D, fid, params, **KWARGS_1D)
+    gn = nonlinear_programming(
+        EXPINFO_1D, fid, params, error_method="gauss-newton", **KWARGS_1D,
+    )
+    assert np.allclose(gn.x, exact.x)
+    assert np.allclose(gn.errors, exact.errors, rtol=0.05, atol=0)
+    skipped = nonlinear_programming(
+        EXPINFO_1D, fid, params, error_method=None, **KWARGS_1D,
+    )
+    assert np.allclose(skipped.x, exact.x)
+    assert np.all(np.isnan(skipped.errors))
+
+
+def test_warm_start():
+    # Objective and intermediates updated after removing oscillators match
+    # those computed from scratch
+    removed = [1, 3]
+    keep = [0, 2]
+    for idx in ([0, 1, 2, 3, 4, 5], [0, 2, 3]):
+        active, args = _args(idx)
+        passive = args[3].reshape(-1, M)[:, keep].ravel()
+        purged_args = (args[0], args[1], M - 2, passive, idx, True)
+        purged = active.reshape(-1, M)[:, keep].ravel()
+        for factory in (
+            funcs.FunctionFactory2DGaussNewton, funcs.FunctionFactory2DMatrixFree,
+        ):
+            m = factory(active, *args)
+            m.objective
+            warm = m.remove_oscillators(removed, purged, *purged_args)
+            assert warm.evaluations["objective"] == 0
+            cold = factory(purged, *purged_args)
+            assert np.isclose(warm.objective, cold.objective)
+            assert np.allclose(warm.gradient, cold.gradient)
+            assert np.allclose(warm.hessp(purged), cold.hessp(purged))
+
+    # An oscillator which gains a negative amplitude is purged
+    params, fid, _ = _signal_1d(3)
+    x0 = np.vstack((params, [[0.05, 0., 45., 5.]]))
+    cold = nonlinear_programming(EXPINFO_1D, fid, x0, warm_start=False, **KWARGS_1D)
+    warm = nonlinear_programming(EXPINFO_1D, fid, x0, **KWARGS_1D)
+    assert warm.restarts == cold.restarts > 0
+    assert warm.x.shape == cold.x.shape == params.shape
+    assert np.allclose(warm.x, cold.x, rtol=0, atol=1e-6)